@@ -8,15 +8,14 @@ import konstrukteur.Konstrukteur as Konstrukteur
 import jasy.asset.Manager
 
 
-@share
-def build(profile):
-	""" Build static website """
+def addCommands(profile):
+	""" Registers the commands used by Konstrukteur templates """
 
 	def getPartUrl(part, type):
 		folder = ""
 		if type == "css":
 			folder = profile.getCssOutputFolder()
-		elif type == "css":
+		elif type == "js":
 			folder = profile.getJsOutputFolder()
 		elif type == "template":
 			folder = profile.getTemplateOutputFolder()
@@ -30,5 +29,22 @@ def build(profile):
 
 	profile.addCommand("part.url", getPartUrl, "url")
 
+
+@share
+def build(profile, regenerate=False):
+	""" Build static website, keeps regenerating on file changes when regenerate is enabled """
+
+	addCommands(profile)
+
+	site = Konstrukteur.Konstrukteur(profile)
+	site.build(regenerate)
+
+
+@share
+def serve(profile, host="localhost", port=8000):
+	""" Serve website on a local development server, changed pages are rendered on demand and reloaded in the browser """
+
+	addCommands(profile)
+
 	site = Konstrukteur.Konstrukteur(profile)
-	site.build()
+	site.serve(host, int(port))
@@ -0,0 +1,76 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["paginate", "getSignature"]
+
+import hashlib
+
+import konstrukteur.Util as Util
+
+
+def paginate(posts, itemsPerPage, title, language, fields=None, stable=False):
+    """
+    {List} Splits @posts {List} into archive pages of @itemsPerPage {Integer} entries.
+    The page @title {String} may use `{{pageno}}`, `{{language}}` and all keys of the
+    additional @fields {Map?null} which are copied to every page.
+
+    By default @posts are expected newest first and page 1 lists the newest posts. In @stable {Boolean}
+    mode @posts are expected oldest first and pages are anchored at the oldest post: page 1 lists the
+    oldest posts and the last page the newest ones. Every page lists its posts newest first. Stable pages
+    have no `pagecount` so that publishing a new post only changes the last page.
+    """
+
+    pages = []
+    pageCount = (len(posts) + itemsPerPage - 1) // itemsPerPage
+
+    for pos in range(0, len(posts), itemsPerPage):
+        pageno = pos // itemsPerPage + 1
+
+        page = dict(fields) if fields else {}
+        page.update({
+            "pageno" : pageno,
+            "language" : language
+        })
+
+        if not stable:
+            page["pagecount"] = pageCount
+
+        pagePosts = posts[pos:pos + itemsPerPage]
+        if stable:
+            pagePosts.reverse()
+
+        prefix = page.get("slug", "archive")
+        page.update({
+            "id" : "archive.%s.%s-%d" % (language, prefix, pageno),
+            "slug" : "%s-%d" % (prefix, pageno),
+            "title" : Util.replaceFields(title, page),
+            "posts" : pagePosts,
+            "mtime" : None  # Fully generated content
+        })
+
+        pages.append(page)
+
+    return pages
+
+
+def getSignature(page, salt=""):
+    """
+    {String} Returns a checksum of everything an archive @page {Map} is rendered from: the page
+    fields and the ID, content hash and URL of every listed post. The @salt {String} should
+    identify everything else used for rendering: templates, configuration, command results
+    and the site languages.
+    """
+
+    checksum = hashlib.sha1(salt.encode("utf-8"))
+
+    for key in sorted(page):
+        if key != "posts":
+            checksum.update(("%s=%s\n" % (key, page[key])).encode("utf-8"))
+
+    for post in page["posts"]:
+        checksum.update(("%s\n%s\n%s\n" % (post["id"], post.get("hash"), post.get("relativeUrl"))).encode("utf-8"))
+
+    return checksum.hexdigest()
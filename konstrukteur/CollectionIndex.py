@@ -0,0 +1,169 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["CollectionIndex"]
+
+import bisect
+import heapq
+
+
+class CollectionIndex:
+
+    """
+    Sorted views on a collection of content items grouped by language and status.
+
+    Items are ordered by @sortKey {Function} (ascending) with the item ID breaking ties so that
+    the order is stable and every item has a unique position. The index is built once after
+    parsing and kept up to date through {#add} and {#remove} which use binary search instead
+    of sorting the whole collection again.
+
+    Translations share the same ID, so items are identified by their ID and language.
+
+    Sorting keys are kept in separate lists next to the items as `bisect` does not support
+    key functions on older Python versions.
+    """
+
+    def __init__(self, sortKey, items=None):
+        self.__sortKey = sortKey
+
+        # (language, status) => [keys, items], status `None` holds all items of a language
+        self.__buckets = {}
+
+        # (id, language) => (key, status)
+        self.__keys = {}
+
+        if items:
+            for item in items:
+                self.add(item)
+
+
+    def __getKey(self, item):
+        return (self.__sortKey(item), item["id"])
+
+
+    def __getIdentity(self, item):
+        return (item["id"], item["language"])
+
+
+    def __getBucket(self, language, status):
+        bucket = self.__buckets.get((language, status))
+        if bucket is None:
+            bucket = self.__buckets[(language, status)] = ([], [])
+
+        return bucket
+
+
+    def add(self, item):
+        """Adds @item {Map} to the index. Re-adding an already known item updates its position."""
+
+        identity = self.__getIdentity(item)
+        if identity in self.__keys:
+            self.remove(item)
+
+        key = self.__getKey(item)
+        self.__keys[identity] = (key, item["status"])
+
+        for status in (None, item["status"]):
+            keys, items = self.__getBucket(item["language"], status)
+            pos = bisect.bisect_right(keys, key)
+            keys.insert(pos, key)
+            items.insert(pos, item)
+
+
+    def remove(self, item):
+        """Removes @item {Map} from the index. Returns whether the item was part of the index."""
+
+        entry = self.__keys.pop(self.__getIdentity(item), None)
+        if entry is None:
+            return False
+
+        key, status = entry
+        for status in (None, status):
+            keys, items = self.__buckets[(item["language"], status)]
+            pos = bisect.bisect_left(keys, key)
+            del keys[pos]
+            del items[pos]
+
+        return True
+
+
+    def update(self, item):
+        """
+        Re-positions @item {Map} after its date, position or status changed. Items changing
+        their language have to be removed under their previous language first.
+        """
+
+        self.add(item)
+
+
+    def __contains__(self, item):
+        return self.__getIdentity(item) in self.__keys
+
+
+    def __len__(self):
+        return len(self.__keys)
+
+
+    def getLanguages(self):
+        """{Set} Returns all languages with at least one item."""
+
+        return set([language for language, status in self.__buckets if status is None and self.__buckets[(language, status)][1]])
+
+
+    def get(self, language, status=None):
+        """
+        {List} Returns the sorted items of @language {String} optionally limited to the given @status {String}.
+        The returned list is owned by the index and must not be modified.
+        """
+
+        bucket = self.__buckets.get((language, status))
+        return bucket[1] if bucket else []
+
+
+    def select(self, language, statuses=None, exclude=None):
+        """
+        {List} Returns the sorted items of @language {String} with one of the given @statuses {List?null}
+        or all statuses except @exclude {List?null}. Items of multiple statuses are merged without re-sorting.
+        """
+
+        if statuses is None:
+            if not exclude:
+                return self.get(language)
+
+            statuses = [status for bucketLanguage, status in self.__buckets if bucketLanguage == language and status is not None and status not in exclude]
+
+        if len(statuses) == 1:
+            return list(self.get(language, statuses[0]))
+
+        buckets = [self.__buckets[(language, status)] for status in statuses if (language, status) in self.__buckets]
+        merged = heapq.merge(*[zip(keys, items) for keys, items in buckets])
+
+        return [item for key, item in merged]
+
+
+    def getPosition(self, item, status=None):
+        """{Integer} Returns the position of @item {Map} in its language list (optionally of the given @status {String}) or `-1`."""
+
+        entry = self.__keys.get(self.__getIdentity(item))
+        if entry is None or (status is not None and entry[1] != status):
+            return -1
+
+        keys = self.__buckets[(item["language"], status)][0]
+        return bisect.bisect_left(keys, entry[0])
+
+
+    def getNeighbors(self, item, status=None):
+        """{Tuple} Returns the previous and next item of @item {Map} in its language (and @status {String?null}) list."""
+
+        pos = self.getPosition(item, status)
+        if pos == -1:
+            return None, None
+
+        items = self.get(item["language"], status)
+        previous = items[pos - 1] if pos > 0 else None
+        following = items[pos + 1] if pos + 1 < len(items) else None
+
+        return previous, following
@@ -0,0 +1,143 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["CommandCache", "forProfile"]
+
+import os
+import re
+import hashlib
+import weakref
+
+import jasy.core.Console as Console
+
+COMMAND_REGEX = re.compile(r"{{\s*@([a-zA-Z][a-zA-Z0-9\.]*(?:\s+[^{}]*?)?)\s*}}")
+
+# One command cache per profile instance
+profileCaches = weakref.WeakKeyDictionary()
+
+
+def forProfile(profile):
+    """Returns the shared command cache for the given @profile {jasy.core.Profile}."""
+
+    cache = profileCaches.get(profile)
+    if cache is None:
+        cache = profileCaches[profile] = CommandCache(profile)
+
+    return cache
+
+
+class CommandCache:
+
+    """
+    Resolves Jasy template commands like `{{@part.url main css}}` with constant arguments.
+
+    Every distinct command invocation is executed only once for the current profile state.
+    The results are dropped as soon as the profile ID changes (e.g. on a new permutation
+    or modified parts), the revision of the main project changes (part of the `{{id}}`
+    placeholder inside file names), an asset changes while asset hashing is enabled
+    (part of asset URLs) or when invalidated explicitly.
+    """
+
+    def __init__(self, profile):
+        self.__profile = profile
+        self.__fingerprint = None
+        self.__revision = None
+        self.__assets = None
+        self.__results = {}
+
+
+    def refresh(self):
+        """Reads the revision of the main project and the state of hashed assets again, e.g. before regenerating after changes."""
+
+        session = self.__profile.getSession()
+        self.__revision = session.getMain().getRevision()
+        self.__assets = self.__getAssetState(session) if self.__profile.getHashAssets() else None
+
+
+    def __getAssetState(self, session):
+        """{String} Returns a checksum of modification time and size of all assets of the @session {jasy.env.Session}."""
+
+        checksum = hashlib.sha1()
+        for project in session.getProjects():
+            assets = project.getAssets()
+            for fileId in sorted(assets):
+                try:
+                    stat = os.stat(assets[fileId].getPath())
+                    state = "%s:%s" % (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    state = "missing"
+
+                checksum.update(("%s=%s\n" % (fileId, state)).encode("utf-8"))
+
+        return checksum.hexdigest()
+
+
+    def getFingerprint(self):
+        """
+        {Tuple} Returns the state of the profile all command results depend on. Results baked
+        into compiled templates are outdated as soon as it differs from the one at compile time.
+        """
+
+        if self.__revision is None:
+            self.refresh()
+
+        profile = self.__profile
+        return (profile.getId(), profile.getHashAssets(), self.__revision, self.__assets)
+
+
+    def getChecksum(self):
+        """
+        {String} Returns a checksum of the profile state and all command results cached so far.
+        Identifies the URLs and other command results baked into templates and content.
+        """
+
+        checksum = hashlib.sha1(("%s\n" % (self.getFingerprint(), )).encode("utf-8"))
+        for command in sorted(self.__results):
+            checksum.update(("%s=%s\n" % (command, self.__results[command])).encode("utf-8"))
+
+        return checksum.hexdigest()
+
+
+    def invalidate(self):
+        """Removes all cached command results."""
+
+        self.__results = {}
+        self.__fingerprint = None
+
+
+    def execute(self, command):
+        """
+        {String} Returns the result of the given @command {String} e.g. "asset.url mysite/logo.png".
+        Arguments are separated by white space and passed to the command as strings.
+        """
+
+        fingerprint = self.getFingerprint()
+        if fingerprint != self.__fingerprint:
+            if self.__fingerprint is not None:
+                Console.debug("Profile changed, dropping %s cached command results", len(self.__results))
+
+            self.__results = {}
+            self.__fingerprint = fingerprint
+
+        results = self.__results
+        if command in results:
+            return results[command]
+
+        splits = command.split()
+        result, resultType = self.__profile.executeCommand(splits[0], splits[1:])
+        result = "" if result is None else str(result)
+
+        results[command] = result
+        return result
+
+
+    def expand(self, text):
+        """{String} Replaces all command invocations inside @text {String} with their results."""
+
+        if "{{" not in text:
+            return text
+
+        return COMMAND_REGEX.sub(lambda match: self.execute(match.group(1)), text)
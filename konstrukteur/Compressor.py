@@ -0,0 +1,114 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["Compressor"]
+
+import io
+import os
+import gzip
+import hashlib
+import threading
+
+import jasy.core.Console as Console
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def gzipCompress(data, level):
+    # Fixed mtime keeps the output stable for unchanged content
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=level, mtime=0) as handle:
+        handle.write(data)
+
+    return buffer.getvalue()
+
+
+def brotliCompress(data, level):
+    # Brotli supports quality levels from 0 to 11
+    return brotli.compress(data, quality=min(11, level + 2))
+
+
+# Codec name => file extension of sidecars, independent of the codec being available
+EXTENSIONS = {
+    "gzip" : ".gz",
+    "brotli" : ".br"
+}
+
+# Codec name => (file extension, compressor)
+CODECS = {
+    "gzip" : (EXTENSIONS["gzip"], gzipCompress)
+}
+
+if brotli is not None:
+    CODECS["brotli"] = (EXTENSIONS["brotli"], brotliCompress)
+
+
+class Compressor:
+
+    """
+    Output stage which writes pre-compressed sidecar files (e.g. `index.html.gz`) next to
+    every generated file so that web servers can deliver them without compressing on the fly.
+
+    Sidecars are only re-generated when the checksum of the original file, the compression
+    level or the codec changed or the sidecar is missing. Sidecars which are not generated
+    anymore (disabled codec, file too small) are removed. Codecs which are not available
+    (e.g. brotli without the module being installed) are skipped.
+    """
+
+    def __init__(self, level=9, codecs=None, extensions=None, minSize=256):
+        self.__level = level
+        self.__extensions = extensions
+        self.__minSize = minSize
+
+        self.__codecs = []
+        for name in codecs or ["gzip"]:
+            if name in CODECS:
+                self.__codecs.append((name, ) + CODECS[name])
+            else:
+                Console.warn("Compression codec %s is not available", name)
+
+        self.__lock = threading.Lock()
+        self.__compressed = 0
+        self.__skipped = 0
+
+
+    def process(self, writer, fileName, data, changed):
+        """Output stage callback, see {OutputWriter#addStage}."""
+
+        codecs = self.__codecs
+        if len(data) < self.__minSize:
+            codecs = []
+        elif self.__extensions is not None and os.path.splitext(fileName)[1][1:] not in self.__extensions:
+            codecs = []
+
+        checksum = hashlib.sha1(data).hexdigest()
+
+        for name, extension, compress in codecs:
+            sidecarName = fileName + extension
+            if writer.isUnchanged(sidecarName, "%s:%s:%s" % (name, self.__level, checksum)):
+                with self.__lock:
+                    self.__skipped += 1
+
+                continue
+
+            writer.storeFile(sidecarName, compress(data, self.__level))
+
+            with self.__lock:
+                self.__compressed += 1
+
+        # Outdated sidecars would otherwise be delivered instead of the original
+        enabled = [entry[0] for entry in codecs]
+        for name, extension in EXTENSIONS.items():
+            if name not in enabled and os.path.exists(fileName + extension):
+                os.remove(fileName + extension)
+                Console.debug("Removed sidecar %s", fileName + extension)
+
+
+    def report(self):
+        Console.info("Compressed %s files, %s unchanged", self.__compressed, self.__skipped)
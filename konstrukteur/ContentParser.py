@@ -13,6 +13,7 @@ import re
 import jasy.core.Console as Console
 import jasy.core.File as File
 
+import konstrukteur
 import konstrukteur.Language
 import konstrukteur.Util as Util
 import konstrukteur.MarkdownParser
@@ -41,7 +42,12 @@ class ContentParser:
         return self.__languages
 
 
-    def parse(self, path, namespace):
+    def parse(self, path, namespace, required=None):
+        """
+        Parses all content files in @path {String} and returns their models. Raises a
+        {konstrukteur.UserError} naming the file when one of the @required {List?null} fields is missing.
+        """
+
         Console.info("Processing %s..." % path)
         Console.indent()
 
@@ -76,6 +82,10 @@ class ContentParser:
                 elif fileLanguage and fileLanguage != model["language"]:
                     raise Exception("Different language definitions at file name / file content level in: %s" % fileName)
 
+                for field in required or []:
+                    if not field in model:
+                        raise konstrukteur.UserError("Missing %s in %s" % (field, fileName))
+
                 # Cleanup and extend model data
                 self.__postProcess(model, fileName)
 
@@ -122,6 +132,7 @@ class ContentParser:
             model["date"] = dateutil.parser.parse(model["date"]).replace(tzinfo=dateutil.tz.tzlocal())
             model["date-daily"] = model["date"].strftime("%y-%m-%d")
             model["date-monthly"] = model["date"].strftime("%y-%m")
+            model["date-yearly"] = model["date"].strftime("%Y")
 
         return model
 
@@ -0,0 +1,237 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["DevServer"]
+
+import os
+import mimetypes
+import threading
+import socketserver
+import http.server
+import urllib.parse
+
+import jasy.core.Console as Console
+
+# Server sent events channel used by the reload script
+EVENTS_PATH = "/__konstrukteur/events"
+
+# Files served for folder requests, same order as SimpleHTTPRequestHandler
+INDEX_FILES = ("index.html", "index.htm")
+
+# Seconds between keep alive comments on idle event streams
+HEARTBEAT = 15.0
+
+RELOAD_SCRIPT = (
+    "<script>(function(){var s=new EventSource(\"%s\");"
+    "s.addEventListener(\"reload\",function(){location.reload();});})();</script>" % EVENTS_PATH
+).encode("utf-8")
+
+
+def injectReloadScript(content):
+    """{bytes} Adds the reload script to the HTML @content {bytes} in front of the closing body tag or at the end."""
+
+    pos = content.lower().rfind(b"</body>")
+    if pos == -1:
+        return content + RELOAD_SCRIPT
+
+    return content[:pos] + RELOAD_SCRIPT + content[pos:]
+
+
+def resolvePath(root, url):
+    """{String} Returns the file name of @url {String} inside @root {String} or `None` when it points outside of it."""
+
+    relativePath = urllib.parse.unquote(urllib.parse.urlsplit(url).path).lstrip("/")
+    fileName = os.path.normpath(os.path.join(root, relativePath))
+    if fileName != root and not fileName.startswith(root + os.sep):
+        return None
+
+    return fileName
+
+
+class ThreadingServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class DevServer:
+
+    """
+    Local HTTP server for editing a website.
+
+    Files are served from @root {String}. For every request the @render {Function} is asked first:
+    it is called with the requested path (relative to @root) and returns the generated content
+    {String} when the page is outdated on disk and has been rendered from memory instead, `None` otherwise.
+
+    HTML pages get a small script attached which listens to a server sent events channel and reloads
+    the page whenever {#notify} is called.
+    """
+
+    def __init__(self, root, render, host="localhost", port=8000):
+        self.__root = os.path.abspath(root)
+        self.__render = render
+        self.__host = host
+        self.__port = port
+
+        self.__condition = threading.Condition()
+        self.__generation = 0
+        self.__closed = False
+
+        self.__server = None
+        self.__thread = None
+
+
+    def getUrl(self):
+        """{String} Returns the base URL of the server."""
+
+        return "http://%s:%s/" % (self.__host, self.__server.server_address[1] if self.__server else self.__port)
+
+
+    def start(self):
+        """Starts serving in a background thread."""
+
+        self.__server = ThreadingServer((self.__host, self.__port), self.__createHandler())
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name="konstrukteur-serve")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+        Console.info("Serving %s at %s", self.__root, self.getUrl())
+
+
+    def notify(self):
+        """Asks all connected browsers to reload."""
+
+        with self.__condition:
+            self.__generation += 1
+            self.__condition.notify_all()
+
+
+    def close(self):
+        """Disconnects all event streams and stops the server."""
+
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+        if self.__server:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__thread.join()
+
+
+    def __waitForReload(self, generation):
+        """Returns the new generation after a reload, the same @generation {Integer} on timeout or `None` when closed."""
+
+        with self.__condition:
+            if self.__generation == generation and not self.__closed:
+                self.__condition.wait(HEARTBEAT)
+
+            if self.__closed:
+                return None
+
+            return self.__generation
+
+
+    def __createHandler(self):
+        root = self.__root
+        render = self.__render
+        waitForReload = self.__waitForReload
+
+        def resolveIndex(directory):
+            """Returns file name and rendered content of the index file of @directory {String}, (`None`, `None`) without one."""
+
+            for indexName in INDEX_FILES:
+                fileName = os.path.join(directory, indexName)
+                content = render(os.path.relpath(fileName, root))
+                if content is not None or os.path.isfile(fileName):
+                    return fileName, content
+
+            return None, None
+
+        class RequestHandler(http.server.SimpleHTTPRequestHandler):
+
+            def do_GET(self):
+                path = urllib.parse.urlsplit(self.path).path
+                if path == EVENTS_PATH:
+                    self.streamEvents()
+                    return
+
+                fileName = resolvePath(root, self.path)
+                if fileName is None:
+                    self.send_error(403)
+                    return
+
+                # Folder requests serve the index file, which might only exist in memory yet
+                if path.endswith("/"):
+                    fileName, content = resolveIndex(fileName)
+                elif os.path.isdir(fileName):
+                    fileName, content = None, None
+                else:
+                    content = render(os.path.relpath(fileName, root))
+
+                if fileName is None:
+                    # Redirects folders to the trailing slash, lists folders without index file
+                    http.server.SimpleHTTPRequestHandler.do_GET(self)
+                    return
+
+                if content is None:
+                    if not fileName.endswith((".html", ".htm")):
+                        http.server.SimpleHTTPRequestHandler.do_GET(self)
+                        return
+
+                    try:
+                        with open(fileName, "rb") as handle:
+                            content = handle.read()
+                    except OSError:
+                        self.send_error(404)
+                        return
+
+                if isinstance(content, str):
+                    content = content.encode("utf-8")
+
+                contentType = mimetypes.guess_type(fileName)[0] or "application/octet-stream"
+                if contentType == "text/html":
+                    content = injectReloadScript(content)
+                    contentType += "; charset=utf-8"
+
+                self.send_response(200)
+                self.send_header("Content-Type", contentType)
+                self.send_header("Content-Length", str(len(content)))
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                self.wfile.write(content)
+
+            def translate_path(self, path):
+                return resolvePath(root, path) or root
+
+            def streamEvents(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+
+                generation = waitForReload(-1)
+                try:
+                    while generation is not None:
+                        current = waitForReload(generation)
+                        if current is None:
+                            break
+
+                        if current != generation:
+                            self.wfile.write(b"event: reload\ndata: %d\n\n" % current)
+                            generation = current
+                        else:
+                            self.wfile.write(b": keep-alive\n\n")
+
+                        self.wfile.flush()
+
+                except OSError:
+                    # Browser disconnected
+                    pass
+
+            def log_message(self, format, *args):
+                Console.debug("%s - %s", self.address_string(), format % args)
+
+        return RequestHandler
@@ -0,0 +1,164 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["Feed"]
+
+import hashlib
+import datetime
+import concurrent.futures
+
+from xml.sax.saxutils import escape, quoteattr
+
+import jasy.core.Console as Console
+
+import konstrukteur.Template as Template
+
+HEADER = '<?xml version="1.0" encoding="utf-8"?>\n'
+NAMESPACE = 'xmlns="http://www.w3.org/2005/Atom"'
+
+
+class Feed:
+
+    """
+    Generates one Atom feed per language from the latest posts.
+
+    Feeds are rendered in parallel on a small thread pool and passed to the @writer {OutputWriter}.
+    For every feed a signature of the contained posts (ID, content hash and URL) is kept in the
+    state (see {#getState}). When the signature did not change and the file still exists the feed
+    is neither rendered nor written again.
+
+    Themes can replace the built-in Atom output with a @template {Template?null}, which is rendered
+    with `feedUrl`, `updated`, `author`, `language` and `posts` (each with `absoluteUrl` and `updated`)
+    on top of the given @scope {Template.Scope?null}. The @salt {String?null} identifies the template
+    and settings for the feed signatures.
+    """
+
+    def __init__(self, writer, baseUrl, siteName, author=None, threads=4, state=None, template=None, scope=None, salt=None):
+        self.__writer = writer
+        self.__baseUrl = baseUrl.rstrip("/") + "/"
+        self.__siteName = siteName
+        self.__author = author
+        self.__threads = max(1, threads)
+        self.__template = template
+        self.__scope = scope
+        self.__salt = salt
+
+        self.__previousSignatures = state or {}
+        self.__signatures = {}
+        self.__generated = 0
+        self.__skipped = 0
+
+
+    def getState(self):
+        """{Map} Returns the signatures of all feeds handled by this generator."""
+
+        return dict(self.__signatures)
+
+
+    def getSignature(self, entries):
+        """{String} Returns a checksum of the feed settings and the given @entries {List} of (post, url) tuples."""
+
+        checksum = hashlib.sha1()
+        checksum.update(("%s\n%s\n%s\n%s\n" % (self.__baseUrl, self.__siteName, self.__author, self.__salt)).encode("utf-8"))
+
+        for post, url in entries:
+            checksum.update(("%s\n%s\n%s\n" % (post["id"], post.get("hash"), url)).encode("utf-8"))
+
+        return checksum.hexdigest()
+
+
+    def generate(self, feeds):
+        """
+        Writes the given @feeds {List} of (fileName, feedUrl, entries) tuples. Entries are
+        (post, url) tuples with the newest post first and URLs relative to the site root.
+        """
+
+        pending = []
+        for fileName, feedUrl, entries in feeds:
+            signature = self.getSignature(entries)
+            self.__signatures[fileName] = signature
+
+            if self.__previousSignatures.get(fileName) == signature and self.__writer.keep(fileName):
+                Console.debug("Unchanged feed %s", fileName)
+                self.__skipped += 1
+                continue
+
+            pending.append((fileName, feedUrl, entries))
+
+        if not pending:
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.__threads, len(pending))) as executor:
+            futures = [(fileName, executor.submit(self.render, feedUrl, entries)) for fileName, feedUrl, entries in pending]
+
+            for fileName, future in futures:
+                self.__writer.write(fileName, future.result())
+                self.__generated += 1
+
+
+    def getUpdated(self, post):
+        """{datetime} Returns the last update of @post {Map}, the modification time of its file when it has no date."""
+
+        if "date" in post:
+            return post["date"]
+
+        return datetime.datetime.fromtimestamp(post["mtime"], datetime.timezone.utc).replace(microsecond=0)
+
+
+    def render(self, feedUrl, entries):
+        """{String} Returns the Atom feed for the given @entries {List} published under @feedUrl {String}."""
+
+        absoluteFeedUrl = self.__baseUrl + feedUrl
+
+        # Use the latest post to keep the feed stable between builds
+        updated = max([self.getUpdated(post) for post, url in entries]).isoformat()
+
+        # Atom requires an author for the feed unless every entry has one
+        author = self.__author or self.__siteName
+
+        if self.__template:
+            return self.__template.render(Template.Scope({
+                "feedUrl" : absoluteFeedUrl,
+                "updated" : updated,
+                "author" : author,
+                "language" : entries[0][0]["language"],
+                "posts" : [dict(post, absoluteUrl=self.__baseUrl + url, updated=self.getUpdated(post).isoformat()) for post, url in entries]
+            }, self.__scope))
+
+        result = [HEADER, "<feed %s>\n" % NAMESPACE]
+        append = result.append
+
+        append("<title>%s</title>\n" % escape(self.__siteName))
+        append("<id>%s</id>\n" % escape(absoluteFeedUrl))
+        append("<link rel=\"self\" href=%s/>\n" % quoteattr(absoluteFeedUrl))
+        append("<link href=%s/>\n" % quoteattr(self.__baseUrl))
+        append("<updated>%s</updated>\n" % updated)
+        append("<author><name>%s</name></author>\n" % escape(author))
+
+        for post, url in entries:
+            absoluteUrl = self.__baseUrl + url
+
+            append("<entry>\n")
+            append("<id>%s</id>\n" % escape(absoluteUrl))
+            append("<title>%s</title>\n" % escape(post.get("title", "")))
+            append("<link href=%s/>\n" % quoteattr(absoluteUrl))
+            append("<updated>%s</updated>\n" % self.getUpdated(post).isoformat())
+
+            if "author" in post:
+                append("<author><name>%s</name></author>\n" % escape(post["author"]))
+
+            if post.get("summary"):
+                append("<summary>%s</summary>\n" % escape(post["summary"]))
+
+            append("</entry>\n")
+
+        append("</feed>\n")
+
+        return "".join(result)
+
+
+    def report(self):
+        Console.info("Generated %s feeds, %s unchanged", self.__generated, self.__skipped)
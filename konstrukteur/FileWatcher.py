@@ -4,14 +4,247 @@
 # Copyright 2014 Sebastian Werner
 #
 
+import os
+import time
+import asyncio
+import threading
+
 import watchdog.events
+import watchdog.observers
+
+from watchdog.utils.unicode_paths import decode
+
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+# Editor swap/backup files, version control data and system files
+IGNORE_PATTERNS = [
+    "*.swp", "*.swx", "*.swpx", "*~", "*.tmp", "*/4913", "*/.#*", "*/#*#",
+    "*/.git", "*/.git/*", "*/.hg/*", "*/.svn/*", "*/.DS_Store", "*/Thumbs.db"
+]
+
+
+def getIgnorePatterns(ignorePaths=None):
+    """{List} Returns the default ignore patterns extended by all files inside the given @ignorePaths {List?null}."""
+
+    patterns = list(IGNORE_PATTERNS)
+    for path in ignorePaths or []:
+        path = os.path.abspath(path)
+        patterns.append(path)
+        patterns.append(os.path.join(path, "*"))
+
+    return patterns
+
+
+def mergeKind(previous, kind):
+    """
+    {String} Returns the effective kind of change when a path with the @previous {String?null} kind
+    of change changes again by @kind {String}, `None` when both cancel out each other.
+    """
+
+    if previous is None:
+        return kind
+
+    if previous == CREATED:
+        return None if kind == DELETED else CREATED
+
+    if previous == DELETED:
+        return DELETED if kind == DELETED else MODIFIED
+
+    return kind
+
+
+def mergeChanges(changes, newer):
+    """{Map} Merges the @newer {Map} changes into @changes {Map} and returns it."""
+
+    for path, kind in newer.items():
+        merged = mergeKind(changes.get(path), kind)
+        if merged is None:
+            changes.pop(path, None)
+        else:
+            changes[path] = merged
+
+    return changes
+
+
+def createObserver(events="all", polling=False, interval=1.0, maxInterval=None):
+    """
+    Returns the best observer for the current platform. The inotify observer only registers
+    for the given @events {String} preset: `all` or `settled` (closed after writing, moves,
+    creation and deletion) which lets the kernel drop intermediate writes.
+
+    Enable @polling {Boolean} for file systems without change notifications (e.g. NFS or
+    container bind mounts). Snapshots are taken every @interval {Float} seconds, the interval
+    grows up to @maxInterval {Float?null} seconds while nothing changes.
+    """
+
+    if polling:
+        from watchdog.observers.polling import PollingObserver
+        return PollingObserver(timeout=interval, max_timeout=maxInterval)
+
+    try:
+        from watchdog.observers.inotify import InotifyObserver
+    except ImportError:
+        InotifyObserver = None
+
+    if InotifyObserver is not None and watchdog.observers.Observer is InotifyObserver:
+        return InotifyObserver(event_mask=events)
+
+    return watchdog.observers.Observer()
+
+
+class ChangeCollector:
+
+    """
+    Thread safe collector which coalesces file system events into batches.
+
+    Every path is recorded once with the effective kind of change (e.g. created and modified
+    afterwards is still `created`, created and deleted again is dropped). {#wait} returns
+    one batch as soon as no further event arrived for @debounce {Float} seconds, but
+    not later than @maxDelay {Float} seconds after the first event of the batch.
+    """
+
+    def __init__(self, debounce=0.3, maxDelay=5.0):
+        self.__debounce = debounce
+        self.__maxDelay = maxDelay
+
+        self.__condition = threading.Condition()
+        self.__changes = {}
+        self.__first = None
+        self.__last = None
+        self.__closed = False
+
+
+    def add(self, path, kind):
+        """Records a change of @kind {String} (`created`, `modified` or `deleted`) of @path {String}."""
+
+        with self.__condition:
+            mergeChanges(self.__changes, {path : kind})
 
-class FileChangeEventHandler(watchdog.events.FileSystemEventHandler):
+            now = time.time()
+            if self.__first is None:
+                self.__first = now
 
-    def __init__(self):
-        self.dirty = False
+            self.__last = now
+            self.__condition.notify_all()
+
+
+    def pending(self):
+        """{Integer} Returns the number of currently collected paths."""
+
+        with self.__condition:
+            return len(self.__changes)
+
+
+    def wait(self, timeout=None):
+        """
+        {Map} Blocks until a batch of changes settled and returns it as a map of path to kind of change.
+        Returns `None` when the @timeout {Float?null} expired or the collector was closed.
+        """
+
+        end = None if timeout is None else time.time() + timeout
+
+        with self.__condition:
+            while True:
+                if self.__closed:
+                    return None
+
+                now = time.time()
+                remaining = None
+
+                if self.__changes:
+                    deadline = min(self.__last + self.__debounce, self.__first + self.__maxDelay)
+                    if now >= deadline:
+                        changes = self.__changes
+                        self.__changes = {}
+                        self.__first = None
+                        self.__last = None
+                        return changes
+
+                    remaining = deadline - now
+
+                if end is not None:
+                    if now >= end:
+                        return None
+
+                    remaining = end - now if remaining is None else min(remaining, end - now)
+
+                self.__condition.wait(remaining)
+
+
+    def close(self):
+        """Wakes up all waiting threads, further calls to {#wait} return `None`."""
+
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+
+class ChangeBridge:
+
+    """
+    Thread safe bridge which forwards every batch of the @collector {ChangeCollector} into the asyncio
+    event @loop {asyncio.AbstractEventLoop}. Has to be created while the loop is running.
+    """
+
+    def __init__(self, collector, loop):
+        self.__collector = collector
+        self.__loop = loop
+        self.__queue = asyncio.Queue()
+
+        self.__thread = threading.Thread(target=self.__forward, name="konstrukteur-changes")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+
+    def __forward(self):
+        while True:
+            changes = self.__collector.wait()
+
+            try:
+                self.__loop.call_soon_threadsafe(self.__queue.put_nowait, changes)
+            except RuntimeError:
+                # Event loop has been closed
+                return
+
+            if changes is None:
+                return
+
+
+    async def get(self):
+        """{Map} Returns the next batch of changes or `None` when the collector has been closed."""
+
+        return await self.__queue.get()
+
+
+class FileChangeEventHandler(watchdog.events.PatternMatchingEventHandler):
+
+    """
+    Forwards file system events matching @patterns {List?null} and not matching @ignorePatterns {List?null}
+    to a {ChangeCollector}. Moves are recorded as deletion and creation. Pass {#match_event} as event filter
+    when scheduling a watch to drop ignored events before they are queued.
+    """
+
+    def __init__(self, collector, patterns=None, ignorePatterns=None):
+        super(FileChangeEventHandler, self).__init__(patterns=patterns, ignore_patterns=ignorePatterns, case_sensitive=True)
+        self.collector = collector
 
     def on_any_event(self, event):
         super(FileChangeEventHandler, self).on_any_event(event)
 
-        self.dirty = True
+        if event.is_directory and event.event_type == watchdog.events.EVENT_TYPE_MODIFIED:
+            return
+
+        # Some emitters (e.g. inotify) report paths as bytes
+        srcPath = decode(event.src_path)
+
+        if event.event_type == watchdog.events.EVENT_TYPE_MOVED:
+            self.collector.add(srcPath, DELETED)
+            self.collector.add(decode(event.dest_path), CREATED)
+        elif event.event_type == watchdog.events.EVENT_TYPE_CREATED:
+            self.collector.add(srcPath, CREATED)
+        elif event.event_type == watchdog.events.EVENT_TYPE_DELETED:
+            self.collector.add(srcPath, DELETED)
+        else:
+            self.collector.add(srcPath, MODIFIED)
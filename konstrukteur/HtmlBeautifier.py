@@ -4,18 +4,198 @@
 # Copyright 2014 Sebastian Werner
 #
 
-__all__ = ["beautify"]
+__all__ = ["tokenize", "minify", "beautify", "Formatter"]
 
+import os
 import re
-import bs4
-
-# Allow custom indenting for BS4
-# Via: http://stackoverflow.com/questions/15509397/custom-indent-width-for-beautifulsoup-prettify
-orig_prettify = bs4.BeautifulSoup.prettify
-r = re.compile(r'^(\s*)', re.MULTILINE)
-def prettify(self, encoding=None, formatter="minimal", indent_width=2):
-    return r.sub(r'\1' * indent_width, orig_prettify(self, encoding, formatter))
-bs4.BeautifulSoup.prettify = prettify
-
-def beautify(html):
-    return bs4.BeautifulSoup(html).prettify(indent_width=2)
+import threading
+
+import jasy.core.Console as Console
+
+# Comments, doctypes/CDATA, processing instructions, tags and text
+TOKEN_REGEX = re.compile(r"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<![^>]*>|<\?.*?\?>|</?[a-zA-Z][^>]*>|[^<]+|<", re.DOTALL)
+TAGNAME_REGEX = re.compile(r"</?([a-zA-Z][a-zA-Z0-9\-:]*)")
+TAG_WHITESPACE_REGEX = re.compile(r"(\"[^\"]*\"|'[^']*')|\s+")
+WHITESPACE_REGEX = re.compile(r"\s+")
+
+# Elements which content is kept as is
+RAW_ELEMENTS = set(["pre", "script", "style", "textarea"])
+
+# Elements without closing tag
+VOID_ELEMENTS = set(["area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "meta", "param", "source", "track", "wbr"])
+
+# Elements where surrounding white space is not significant for rendering
+BLOCK_ELEMENTS = set([
+    "address", "article", "aside", "blockquote", "body", "dd", "div", "dl", "dt", "fieldset", "figcaption", "figure",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "head", "header", "hr", "html", "li", "link", "main", "meta",
+    "nav", "navigation", "ol", "p", "section", "table", "tbody", "td", "tfoot", "th", "thead", "title", "tr", "ul",
+    "base", "script", "style", "noscript", "option", "select", "!doctype"
+])
+
+
+def tokenize(html):
+    """
+    Generator splitting @html {String} into (type, name, text) tuples. Types are `text`, `comment`,
+    `doctype`, `open`, `close` and `raw`. The content of raw elements (pre, script, style, textarea)
+    is returned as a single `raw` token including the surrounding tags.
+    """
+
+    pos = 0
+    length = len(html)
+    lowered = None
+
+    while pos < length:
+        match = TOKEN_REGEX.match(html, pos)
+        text = match.group(0)
+        pos = match.end()
+
+        if text.startswith("<!--"):
+            yield "comment", None, text
+        elif text.startswith("<!") or text.startswith("<?"):
+            yield "doctype", "!doctype", text
+        elif text.startswith("</"):
+            yield "close", TAGNAME_REGEX.match(text).group(1).lower(), text
+        elif len(text) > 1 and text.startswith("<"):
+            name = TAGNAME_REGEX.match(text).group(1).lower()
+
+            if name in RAW_ELEMENTS and not text.endswith("/>"):
+                if lowered is None:
+                    lowered = html.lower()
+
+                end = lowered.find("</%s" % name, pos)
+                if end != -1:
+                    end = html.find(">", end)
+
+                end = length if end == -1 else end + 1
+                yield "raw", name, text + html[pos:end]
+                pos = end
+            else:
+                yield "open", name, text
+        else:
+            yield "text", None, text
+
+
+def compactTag(text):
+    """Collapses white space inside a tag while keeping quoted attribute values intact."""
+
+    text = TAG_WHITESPACE_REGEX.sub(lambda match: match.group(1) or " ", text).replace(" >", ">")
+
+    # The slash would become part of an unquoted attribute value otherwise
+    if text.endswith(" />"):
+        head = text[:-3]
+        if head.endswith(("\"", "'")) or TAGNAME_REGEX.fullmatch(head):
+            text = head + "/>"
+
+    return text
+
+
+def minify(html):
+    """{String} Returns @html {String} with comments and insignificant white space removed."""
+
+    result = []
+    pending = None
+    previous = None
+
+    for kind, name, text in tokenize(html):
+        if kind == "text":
+            text = WHITESPACE_REGEX.sub(" ", text)
+            if text == " ":
+                pending = text
+                continue
+
+            if pending is not None:
+                result.append(pending)
+                pending = None
+
+            result.append(text)
+            previous = None
+            continue
+
+        if kind == "comment":
+            # Keep conditional comments for old IE versions
+            if not text.startswith("<!--[if"):
+                continue
+
+        elif kind in ("open", "close"):
+            text = compactTag(text)
+
+        # White space next to block level elements is not significant
+        if pending is not None:
+            if previous not in BLOCK_ELEMENTS and name not in BLOCK_ELEMENTS:
+                result.append(pending)
+
+            pending = None
+
+        result.append(text)
+        previous = name
+
+    return "".join(result).strip()
+
+
+def beautify(html, indent="  "):
+    """{String} Returns @html {String} re-indented with every tag on its own line."""
+
+    result = []
+    depth = 0
+
+    for kind, name, text in tokenize(html):
+        if kind == "text":
+            text = WHITESPACE_REGEX.sub(" ", text).strip()
+            if not text:
+                continue
+
+        elif kind in ("open", "close"):
+            text = compactTag(text)
+
+            if kind == "close":
+                depth = max(0, depth - 1)
+
+        result.append(indent * depth + text)
+
+        if kind == "open" and name not in VOID_ELEMENTS and not text.endswith("/>"):
+            depth += 1
+
+    return "\n".join(result) + "\n"
+
+
+class Formatter:
+
+    """
+    Output stage which minifies or beautifies generated HTML pages depending
+    on @mode {String} (`minify` or `pretty`). Runs per file on the writer threads.
+    """
+
+    def __init__(self, mode):
+        if mode == "minify":
+            self.__format = minify
+        elif mode == "pretty":
+            self.__format = beautify
+        else:
+            raise ValueError("Unsupported HTML output mode: %s" % mode)
+
+        self.__mode = mode
+        self.__lock = threading.Lock()
+        self.__files = 0
+        self.__saved = 0
+
+
+    def process(self, fileName, content):
+        """Output filter callback, see {OutputWriter#addFilter}."""
+
+        if os.path.splitext(fileName)[1] not in ("", ".html", ".htm") or not content.lstrip().startswith("<"):
+            return content
+
+        formatted = self.__format(content)
+        saved = len(content.encode("utf-8")) - len(formatted.encode("utf-8"))
+
+        Console.debug("Formatted %s: %s bytes saved", fileName, saved)
+
+        with self.__lock:
+            self.__files += 1
+            self.__saved += saved
+
+        return formatted
+
+
+    def report(self):
+        Console.info("Applied %s to %s pages, %s bytes saved", self.__mode, self.__files, self.__saved)
@@ -9,7 +9,6 @@ import sys
 import os.path
 import inspect
 import json
-import copy
 filename = inspect.getframeinfo(inspect.currentframe()).filename
 path = os.path.join(os.path.dirname(os.path.abspath(filename)), "..", "konstrukteurlibs", "watchdog", "src")
 sys.path.insert(0, path)
@@ -20,28 +19,42 @@ __all__ = ["build"]
 import re
 import os.path
 import dateutil.parser
-import dateutil.tz
 import datetime
 import time
 import pystache
 import itertools
+import hashlib
+import asyncio
+import threading
+import concurrent.futures
 
 from jasy.env.State import session
 
 import jasy.core.Console as Console
-import jasy.core.FileManager as FileManager
 import jasy.core.Cache as Cache
 import jasy.core.Util as JasyUtil
 import jasy.template.Parser as TemplateParser
 
+import konstrukteur
 import konstrukteur.HtmlParser
 import konstrukteur.HtmlBeautifier
 import konstrukteur.Language
 import konstrukteur.FileWatcher
 import konstrukteur.ContentParser as ContentParser
+import konstrukteur.CommandCache as CommandCache
 import konstrukteur.Util as Util
 import konstrukteur.TemplateCompiler as TemplateCompiler
 import konstrukteur.Template as Template
+import konstrukteur.OutputWriter as OutputWriter
+import konstrukteur.Compressor as Compressor
+import konstrukteur.Sitemap as Sitemap
+import konstrukteur.CollectionIndex as CollectionIndex
+import konstrukteur.Feed as Feed
+import konstrukteur.Archive as Archive
+import konstrukteur.Taxonomy as Taxonomy
+import konstrukteur.SearchIndex as SearchIndex
+import konstrukteur.RelatedPosts as RelatedPosts
+import konstrukteur.DevServer as DevServer
 
 
 class JsonEncoder(json.JSONEncoder):
@@ -78,7 +91,7 @@ class Konstrukteur:
     __archiveUrl = None  # Template String
 
     __renderer = None
-    __fileManager = None
+    __writer = None
 
 
     def __init__(self, profile, project=None):
@@ -89,36 +102,114 @@ class Konstrukteur:
         self.__profile = profile
         self.__session = session
         self.__locales = {}
-        self.__commandReplacer = []
-        self.__id = 0
+        self.__commands = CommandCache.forProfile(profile)
         self.__cache = main.getCache()
 
+        # Documents rendered on demand by the development server, see serve()
+        self.__routeLock = threading.Lock()
+        self.__routes = {}
+        self.__rendered = {}
+        self.__collecting = None
+
+        # Set while watching when newer changes should stop the running build, see __checkCancelled()
+        self.__cancelled = threading.Event()
+
         # Importing configuration from project
         self.config = main.getConfigValue("konstrukteur")
 
         self.__siteName = main.getConfigValue("konstrukteur.site.name", "Test website")
         self.__siteUrl = main.getConfigValue("konstrukteur.site.url", "//localhost")
+        self.__siteScheme = main.getConfigValue("konstrukteur.site.scheme", "http")
 
         self.__pageUrl = main.getConfigValue("konstrukteur.pageUrl", "{{slug}}.{{language}}.html")
         self.__postUrl = main.getConfigValue("konstrukteur.blog.postUrl", "blog/{{date-monthly}}/{{slug}}.{{language}}.html")
         self.__archiveUrl = main.getConfigValue("konstrukteur.blog.archiveUrl", "blog/archive-{{pageno}}.{{language}}.html")
+        self.__archiveLatestUrl = main.getConfigValue("konstrukteur.blog.archiveLatestUrl", "blog/archive-latest.{{language}}.html")
+        self.__archiveStable = main.getConfigValue("konstrukteur.blog.archive.stable", False)
         self.__feedUrl = main.getConfigValue("konstrukteur.blog.feedUrl", "feed.{{language}}.xml")
 
         self.__feedLength = main.getConfigValue("konstrukteur.blog.itemsInFeed", 10)
+        self.__feedAuthor = main.getConfigValue("konstrukteur.blog.defaultAuthor")
         self.__archivePageLength = main.getConfigValue("konstrukteur.blog.postsPerArchivePage", 10)
+        self.__taxonomies = main.getConfigValue("konstrukteur.blog.taxonomies", {})
+        self.__relatedEnabled = main.getConfigValue("konstrukteur.blog.related.enabled", False)
+        self.__relatedCount = main.getConfigValue("konstrukteur.blog.related.count", 5)
+        self.__relatedMaxFeatures = main.getConfigValue("konstrukteur.blog.related.maxFeatures", 1024)
 
         self.__extensions = main.getConfigValue("konstrukteur.extensions", ["markdown", "html"])
         self.__theme = main.getConfigValue("konstrukteur.theme", main.getName())
         self.__defaultLanguage = main.getConfigValue("konstrukteur.defaultLanguage", "en")
-        self.__fileManager = FileManager.FileManager(self.__profile)
+        self.__compactTemplates = main.getConfigValue("konstrukteur.compactTemplates", False)
+        self.__profileTemplates = main.getConfigValue("konstrukteur.profileTemplates", False)
+        self.__outputFsync = main.getConfigValue("konstrukteur.output.fsync", "none")
+        self.__outputThreads = main.getConfigValue("konstrukteur.output.threads", 4)
+        self.__sitemap = None
+        self.__sitemapEnabled = main.getConfigValue("konstrukteur.sitemap.enabled", True)
+        self.__sitemapFileName = main.getConfigValue("konstrukteur.sitemap.fileName", "sitemap.xml")
+
+        self.__searchEnabled = main.getConfigValue("konstrukteur.search.enabled", False)
+        self.__searchPath = main.getConfigValue("konstrukteur.search.path", "search/{{language}}")
+        self.__searchPrefixLength = main.getConfigValue("konstrukteur.search.prefixLength", 2)
+        self.__searchMinLength = main.getConfigValue("konstrukteur.search.minLength", 2)
+
+        self.__watchDebounce = main.getConfigValue("konstrukteur.watch.debounce", 0.3)
+        self.__watchMaxDelay = main.getConfigValue("konstrukteur.watch.maxDelay", 5.0)
+        self.__watchEvents = main.getConfigValue("konstrukteur.watch.events", "settled")
+        self.__watchPolling = main.getConfigValue("konstrukteur.watch.polling", False)
+        self.__watchInterval = main.getConfigValue("konstrukteur.watch.interval", 1.0)
+        self.__watchMaxInterval = main.getConfigValue("konstrukteur.watch.maxInterval", 4.0)
+
+        self.__outputManifest = main.getConfigValue("konstrukteur.output.manifest", "konstrukteur-manifest.json")
+        self.__outputHtml = main.getConfigValue("konstrukteur.output.html", "none")
+        self.__outputCompress = main.getConfigValue("konstrukteur.output.compress", False)
+        self.__outputCompressLevel = main.getConfigValue("konstrukteur.output.compressLevel", 9)
+        self.__outputCompressCodecs = main.getConfigValue("konstrukteur.output.compressCodecs", ["gzip"])
+
+
+    def build(self, regenerate=False):
+        """Build static website. Keeps watching for changes and regenerates the website when @regenerate {Boolean} is enabled."""
+
+        Console.info("Intializing Konstrukteur...")
+        Console.indent()
 
+        self.__prepare()
+        self.__initializeTemplates()
+        self.__generateOutput()
 
-    def build(self):
-        """Build static website."""
+        Console.outdent()
+
+        if regenerate:
+            self.__watch()
+
+
+    def serve(self, host="localhost", port=8000):
+        """
+        Serves the website on a local development server at @host {String} and @port {Integer} until interrupted.
+
+        After every change the content is parsed again and the browser is asked to reload. Requested pages
+        are rendered on demand from memory while the output folder is regenerated in the background.
+        """
 
         Console.info("Intializing Konstrukteur...")
         Console.indent()
 
+        self.__prepare()
+        self.__initializeTemplates()
+
+        Console.outdent()
+
+        server = DevServer.DevServer(self.__profile.getDestinationPath(), self.__renderOnDemand, host, int(port))
+        server.start()
+
+        try:
+            self.__watch(server, True)
+        finally:
+            server.close()
+
+
+    def __prepare(self):
+        """Configures paths and looks up the theme project."""
+
         # Path configuration
         # TODO: Use Jasy configuration instead
         self.__templatePath = os.path.join("source", "template")
@@ -134,13 +225,176 @@ class Konstrukteur:
             raise RuntimeError("Path to content not found : %s" % self.__contentPath)
 
         # A theme could be any project registered in the current session
+        self.__themeProject = None
         if self.__theme:
-            themeProject = session.getProjectByName(self.__theme)
-            if not themeProject:
+            self.__themeProject = session.getProjectByName(self.__theme)
+            if not self.__themeProject:
                 raise RuntimeError("Theme '%s' not found" % self.__theme)
 
-        self.__initializeTemplates()
-        self.__generateOutput()
+
+    def __watch(self, server=None, initial=False):
+        """
+        Regenerates the website for every batch of file changes until interrupted. See {#__regenerate} for @server {DevServer?null}.
+        Builds the website once before the first change when @initial {Boolean} is enabled.
+        """
+
+        collector = konstrukteur.FileWatcher.ChangeCollector(self.__watchDebounce, self.__watchMaxDelay)
+
+        # Generated files must never trigger a rebuild
+        ignorePatterns = konstrukteur.FileWatcher.getIgnorePatterns([self.__profile.getDestinationPath()])
+        eventHandler = konstrukteur.FileWatcher.FileChangeEventHandler(collector, ignorePatterns=ignorePatterns)
+        configHandler = konstrukteur.FileWatcher.FileChangeEventHandler(collector, patterns=["*/jasyproject.yaml", "*/jasyproject.json"])
+
+        observer = konstrukteur.FileWatcher.createObserver(self.__watchEvents, self.__watchPolling, self.__watchInterval, self.__watchMaxInterval)
+        for path in self.__getWatchedPaths():
+            Console.debug("Watching %s", path)
+            observer.schedule(eventHandler, path, recursive=True, event_filter=eventHandler.match_event)
+
+        observer.schedule(configHandler, os.path.abspath(session.getMain().getPath()), recursive=False, event_filter=configHandler.match_event)
+        observer.start()
+
+        Console.info("Waiting for file changes (abort with CTRL-C)")
+
+        # Builds run one at a time outside of the event loop which keeps receiving changes meanwhile
+        loop = asyncio.new_event_loop()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        try:
+            loop.run_until_complete(self.__runWatchLoop(loop, executor, collector, server, initial))
+
+        except KeyboardInterrupt:
+            Console.info("Stopped watching")
+
+        finally:
+            self.__cancelled.set()
+            collector.close()
+            observer.stop()
+            observer.join()
+
+            # The watch loop is still pending when interrupted
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            executor.shutdown(wait=True)
+            loop.close()
+
+
+    async def __runWatchLoop(self, loop, executor, collector, server, initial):
+        """
+        Receives batches of changes from the @collector {ChangeCollector} and runs a build in the @executor
+        {concurrent.futures.Executor} whenever changes are pending. A running build is cancelled as soon as
+        newer changes arrive and restarted with the merged changes of both.
+        """
+
+        bridge = konstrukteur.FileWatcher.ChangeBridge(collector, loop)
+        nextChanges = asyncio.ensure_future(bridge.get())
+
+        pending = {}
+        building = None
+        build = None
+
+        if initial:
+            building = {}
+            build = loop.run_in_executor(executor, self.__generateLazily, server)
+
+        try:
+            while True:
+                done, _ = await asyncio.wait([nextChanges] + ([build] if build else []), return_when=asyncio.FIRST_COMPLETED)
+
+                if build in done:
+                    try:
+                        build.result()
+
+                    except konstrukteur.BuildCancelled:
+                        Console.outdent(True)
+                        Console.info("Build cancelled, restarting with newer changes...")
+                        pending = konstrukteur.FileWatcher.mergeChanges(building, pending)
+
+                    except Exception as error:
+                        Console.outdent(True)
+                        Console.error("Regenerating failed: %s", error)
+
+                    build = None
+                    building = None
+
+                if nextChanges in done:
+                    changes = nextChanges.result()
+                    if changes is None:
+                        break
+
+                    konstrukteur.FileWatcher.mergeChanges(pending, changes)
+                    nextChanges = asyncio.ensure_future(bridge.get())
+
+                    if build and not self.__cancelled.is_set():
+                        self.__cancelled.set()
+
+                if build is None and pending:
+                    building = pending
+                    pending = {}
+
+                    self.__cancelled.clear()
+                    build = loop.run_in_executor(executor, self.__regenerate, building, server)
+
+        finally:
+            nextChanges.cancel()
+            if build:
+                self.__cancelled.set()
+
+
+    def __getWatchedPaths(self):
+        """Returns the folders of content, templates and theme templates. Nested folders are omitted."""
+
+        paths = set([os.path.abspath(self.__contentPath), os.path.abspath(self.__templatePath)])
+
+        if self.__themeProject:
+            templates = self.__themeProject.getItems("jasy.Template")
+            for name, item in (templates or {}).items():
+                itemPath = item.getPath()
+                for fileName in itemPath if isinstance(itemPath, list) else [itemPath]:
+                    if fileName:
+                        paths.add(os.path.dirname(os.path.abspath(fileName)))
+
+        result = []
+        for path in sorted(paths):
+            if not result or not path.startswith(result[-1] + os.sep):
+                result.append(path)
+
+        return result
+
+
+    def __regenerate(self, changes, server=None):
+        """
+        Rebuilds the website after the given @changes {Map} of file name to kind of change.
+        With a development @server {DevServer?null} pages are rendered on demand and written lazily.
+        """
+
+        Console.info("Regenerating after %s changed files...", len(changes))
+        Console.indent()
+
+        for fileName in sorted(changes):
+            Console.debug("%s: %s", changes[fileName], fileName)
+
+        if any([os.path.basename(fileName).startswith("jasyproject.") for fileName in changes]):
+            Console.warn("Project configuration changed, restart to apply it")
+
+        # Content changes only require parsing and output, templates are compiled again otherwise.
+        # Command results (e.g. hashed asset urls) are baked into templates as well.
+        self.__commands.refresh()
+        contentPath = os.path.abspath(self.__contentPath) + os.sep
+        if not all([os.path.abspath(fileName).startswith(contentPath) for fileName in changes]):
+            self.__initializeTemplates()
+        elif self.__commands.getFingerprint() != self.__templateFingerprint:
+            Console.info("Profile changed, compiling templates again...")
+            self.__initializeTemplates()
+
+        if server:
+            self.__generateLazily(server)
+        else:
+            self.__generateOutput()
+
+        Console.outdent()
 
 
     def __generateOutput(self):
@@ -150,15 +404,131 @@ class Konstrukteur:
         Console.indent()
 
         self.__parseContent()
+        self.__checkCancelled()
+        self.__computeRelatedPosts()
+        self.__checkCancelled()
         self.__outputContent()
 
+        if Template.profiler is not None:
+            Template.profiler.report()
+
+        Console.outdent()
         Console.info("Website successfully build!")
 
 
 
+    def __generateLazily(self, server):
+        """
+        Parses all content and publishes the documents for rendering on demand through the development
+        @server {DevServer}, which is asked to reload. The output folder is generated afterwards.
+        """
+
+        Console.info("Building website....")
+        Console.indent()
+
+        self.__parseContent()
+        self.__checkCancelled()
+        self.__computeRelatedPosts()
+        self.__checkCancelled()
+        routes = self.__collectRoutes()
+
+        Console.outdent()
+
+        with self.__routeLock:
+            self.__routes = routes
+            self.__rendered = {}
+
+        server.notify()
+
+        # Routes are kept when cancelled until the restarted build publishes new ones
+        self.__outputContent()
+        Console.info("Website successfully build!")
+
+        # Requests are served from disk again
+        with self.__routeLock:
+            self.__routes = {}
+            self.__rendered = {}
+
+
+    def __checkCancelled(self):
+        """Raises {konstrukteur.BuildCancelled} when newer changes arrived while watching."""
+
+        if self.__cancelled.is_set():
+            raise konstrukteur.BuildCancelled()
+
+
+    def __collectRoutes(self):
+        """{Map} Returns (template, render model) of every generated document keyed by its absolute file name."""
+
+        self.__collecting = {}
+        try:
+            self.__generateDocuments()
+            return self.__collecting
+
+        finally:
+            self.__collecting = None
+
+
+    def __getRouteKey(self, outputFilename):
+        return os.path.abspath(self.__profile.expandFileName(outputFilename))
+
+
+    def __renderOnDemand(self, relativePath):
+        """
+        Returns the content of the document at @relativePath {String} inside the destination folder when it
+        has not been written since the last change, `None` otherwise. Rendered documents are kept in memory
+        and reused when the background generation reaches them.
+        """
+
+        key = os.path.abspath(os.path.join(self.__profile.getDestinationPath(), relativePath))
+
+        with self.__routeLock:
+            routes = self.__routes
+            route = routes.get(key)
+            content = self.__rendered.get(key)
+
+        if route is None or content is not None:
+            return content
+
+        Console.debug("Rendering %s on demand", relativePath)
+        template, renderModel = route
+        content = template.render(renderModel)
+
+        with self.__routeLock:
+            if self.__routes is routes:
+                self.__rendered[key] = content
+
+        return content
+
+
+    def __emit(self, outputFilename, template, renderModel, source):
+        """Renders and writes a document or records it while collecting routes."""
+
+        if self.__collecting is not None:
+            self.__collecting[self.__getRouteKey(outputFilename)] = (template, renderModel)
+            return
+
+        content = None
+        if self.__rendered:
+            with self.__routeLock:
+                content = self.__rendered.get(self.__getRouteKey(outputFilename))
+
+        if content is None:
+            content = template.render(renderModel)
+
+        self.__writer.write(outputFilename, content, source)
+
+
     def __initializeTemplates(self):
         """Process all templates to support jasy commands."""
 
+        # Profiling needs instrumented templates so it has to be enabled before compiling
+        if self.__profileTemplates:
+            Template.enableProfiling()
+
+        # Command results baked into the templates are resolved again
+        self.__commands.invalidate()
+
         # Build a map of all known templates
         self.__templates = {}
         for project in session.getProjects():
@@ -167,9 +537,23 @@ class Konstrukteur:
                 for name, item in templates.items():
                     self.__templates[name] = item.getText()
 
+        # Configuration is constant for the whole build and is folded into the templates
+        constants = {
+            "config" : self.config
+        }
+
+        # Identifies templates and configuration for skipping unchanged generated pages
+        checksum = hashlib.sha1(json.dumps(self.config, sort_keys=True, default=str).encode("utf-8"))
+        for name in sorted(self.__templates):
+            checksum.update(("%s\n%s\n" % (name, self.__templates[name])).encode("utf-8"))
+
+        self.__templateChecksum = checksum.hexdigest()
+
+        self.__templateFingerprint = self.__commands.getFingerprint()
+
         for name in self.__templates:
             content = self.__templates[name]
-            compiled = TemplateCompiler.compile(content)
+            compiled = TemplateCompiler.compile(content, name=name, constants=constants, compact=self.__compactTemplates, commands=self.__commands.execute)
             self.__templates[name] = compiled
 
 
@@ -182,9 +566,22 @@ class Konstrukteur:
         Console.indent()
 
         self.__pages = contentParser.parse(self.__pagePath, "page")
-        self.__posts = contentParser.parse(self.__postPath, "post")
+        self.__posts = contentParser.parse(self.__postPath, "post", ["date"])
         self.__languages = contentParser.getLanguages()
 
+        # Sorted views per language and status are computed once and shared by all listings
+        self.__postIndex = CollectionIndex.CollectionIndex(self.__postSorter, self.__posts)
+        self.__pageIndex = CollectionIndex.CollectionIndex(self.__pageSorter, self.__pages)
+
+        # Resolve Jasy commands used inside content e.g. asset urls
+        for item in itertools.chain(self.__pages, self.__posts):
+            if "content" in item:
+                item["content"] = self.__commands.expand(item["content"])
+
+        # Relative urls of posts are used by all listings
+        for post in self.__posts:
+            post["relativeUrl"] = Util.replaceFields(self.__postUrl, post)
+
         Console.outdent()
         Console.info("Processing locales...")
         Console.indent()
@@ -200,57 +597,88 @@ class Konstrukteur:
 
 
 
+    def __computeRelatedPosts(self):
+        """Adds a list of similar posts of the same language as `related` to every published post."""
+
+        if not self.__relatedEnabled:
+            return
+
+        if not RelatedPosts.isSupported():
+            Console.warn("Related posts require NumPy, skipping")
+            return
+
+        Console.info("Computing related posts...")
+        Console.indent()
+
+        stateKey = "konstrukteur.related.state"
+        relatedPosts = RelatedPosts.RelatedPosts(self.__relatedCount, self.__relatedMaxFeatures, state=self.__cache.read(stateKey))
+
+        for language in sorted(self.__languages):
+            relatedPosts.compute(language, self.__postIndex.get(language, "published"))
+
+        self.__cache.store(stateKey, relatedPosts.getState())
+
+        Console.outdent()
+
+
     def __generateArchiveData(self):
         pages = []
 
-
         main = session.getMain()
 
         itemsPerPage = main.getConfigValue("konstrukteur.blog.archiveItemsPerPage", 10)
         title = main.getConfigValue("konstrukteur.blog.archive.title", "Index {{pageno}}")
 
-        # If there is just one title, map the title for each language
-        # This is mainly for simplified access later on
-        if not isinstance(title, dict):
-            titleMap = {}
-            for language in self.__languages:
-                titleMap[language] = title
-            title = titleMap
-
         # Produce archive pages for each language
-        for language in self.__languages:
-
-            archiveTitle = title[language]
+        for language in sorted(self.__languages):
             sortedPosts = self.__getSortedPosts(language)
+            pages.extend(self.__paginate(sortedPosts, itemsPerPage, self.__getLocalizedValue(title, language), language, {
+                "latestUrl" : Util.replaceFields(self.__archiveLatestUrl, {"language" : language})
+            } if self.__archiveStable else None))
+
+        return pages
 
-            pos = 0
-            pageno = 1
 
-            while pos < len(sortedPosts):
-                archiveTitle = Util.replaceFields(archiveTitle, {
-                    "pageno" : pageno,
-                    "lang" : language
-                })
+    def __generateTaxonomyData(self, name, taxonomyIndex):
+        """Returns the paginated archive pages of all terms of the taxonomy @name {String}."""
 
-                archivePage = {
-                    "slug" : "archive-%d" % pageno,
-                    "title" : archiveTitle,
-                    "posts" : sortedPosts[pos:itemsPerPage + pos],
-                    "pageno" : pageno,
-                    "mtime" : None,  # Fully generated content
-                    "lang" : language
-                }
+        pages = []
+        config = self.__taxonomies[name]
 
-                pages.append(archivePage)
-                pageno += 1
+        itemsPerPage = config.get("itemsPerPage", session.getMain().getConfigValue("konstrukteur.blog.archiveItemsPerPage", 10))
+        title = config.get("title", "{{term}}")
 
-                pos += itemsPerPage
+        for language in sorted(self.__languages):
+            for slug, term, posts in taxonomyIndex.getTerms(name, language):
+                pages.extend(self.__paginate(posts, itemsPerPage, self.__getLocalizedValue(title, language), language, {
+                    "taxonomy" : name,
+                    "term" : term,
+                    "slug" : slug
+                }))
 
         return pages
 
 
+    def __paginate(self, posts, itemsPerPage, title, language, fields=None):
+        """Paginates the date sorted @posts {List} newest first or anchored at the oldest post in stable mode."""
+
+        if not self.__archiveStable:
+            posts = list(reversed(posts))
+
+        return Archive.paginate(posts, itemsPerPage, title, language, fields, self.__archiveStable)
+
+
+    def __getLocalizedValue(self, value, language):
+        """Returns the entry of @language {String} when @value is a map of languages."""
+
+        if isinstance(value, dict):
+            return value.get(language, value.get(self.__defaultLanguage))
+
+        return value
+
+
     def __getSortedPosts(self, language):
-        return sorted([post for post in self.__posts if post["lang"] == language], key=self.__postSorter)
+        return self.__postIndex.get(language)
 
 
     def __outputContent(self):
@@ -259,16 +687,166 @@ class Konstrukteur:
         Console.info("Generating public files...")
         Console.indent()
 
-        # self.__generatePosts()
-        # self.__generateArchives()
-        self.__generatePages()
-        # self.__generateFeed()
+        # Checksums of the previous build allow skipping unchanged files
+        stateKey = "konstrukteur.output.state[%s]" % self.__profile.getDestinationPath()
+        previousState = self.__cache.read(stateKey)
+
+        archiveStateKey = "konstrukteur.archive.state[%s]" % self.__profile.getDestinationPath()
+        self.__previousArchiveSignatures = self.__cache.read(archiveStateKey) or {}
+        self.__archiveSignatures = {}
+        self.__renderChecksum = self.__getRenderChecksum()
+        self.__writer = OutputWriter.OutputWriter(self.__profile, self.__outputFsync, self.__outputThreads, previousState)
+
+        formatter = None
+        if self.__outputHtml != "none":
+            formatter = konstrukteur.HtmlBeautifier.Formatter(self.__outputHtml)
+            self.__writer.addFilter(formatter.process)
+
+        compressor = None
+        if self.__outputCompress:
+            compressor = Compressor.Compressor(self.__outputCompressLevel, self.__outputCompressCodecs)
+            self.__writer.addStage(compressor.process)
+
+        if self.__sitemapEnabled:
+            self.__sitemap = Sitemap.Sitemap(self.__writer, self.__getAbsoluteSiteUrl(), self.__profile.getDestinationPath(), self.__sitemapFileName)
+
+        cancelled = False
+
+        try:
+            self.__generateDocuments()
+            self.__checkCancelled()
+            self.__generateFeed()
+            self.__checkCancelled()
+            self.__generateSearchIndex()
+
+            if self.__sitemap:
+                self.__sitemap.close()
+
+        except konstrukteur.BuildCancelled:
+            cancelled = True
+            raise
+
+        finally:
+            self.__writer.close()
+
+            # Files written so far are skipped by the restarted build, nothing is removed until a build completes
+            if cancelled:
+                self.__storePartialState(stateKey, previousState, archiveStateKey)
+
+        state = self.__writer.getState()
+        self.__cache.store(stateKey, state)
+        self.__cache.store(archiveStateKey, self.__archiveSignatures)
+
+        self.__writeManifest(previousState, state)
+
+        if formatter:
+            formatter.report()
+
+        if compressor:
+            compressor.report()
 
         Console.outdent()
 
 
 
-    def __interateItems(self, items, urlTemplate, itemType):
+    def __getRenderChecksum(self):
+        """
+        Returns a checksum of everything generated listings depend on besides their items: templates and configuration,
+        the command results (e.g. asset URLs and the `{{id}}` revision) baked into templates and content and the site languages.
+        """
+
+        checksum = hashlib.sha1(("%s\n%s\n" % (self.__templateChecksum, self.__commands.getChecksum())).encode("utf-8"))
+        checksum.update(",".join(sorted(self.__languages)).encode("utf-8"))
+
+        return checksum.hexdigest()
+
+
+
+    def __storePartialState(self, stateKey, previousState, archiveStateKey):
+        """Stores the state of the previous build updated by all files written by the cancelled build."""
+
+        state = self.__writer.getState()
+        previousState = previousState or {}
+        merged = {
+            "hashes" : dict(previousState.get("hashes", {})),
+            "sources" : dict(previousState.get("sources", {}))
+        }
+
+        merged["hashes"].update(state["hashes"])
+        merged["sources"].update(state["sources"])
+        self.__cache.store(stateKey, merged)
+
+        archiveSignatures = dict(self.__previousArchiveSignatures)
+        archiveSignatures.update(self.__archiveSignatures)
+        self.__cache.store(archiveStateKey, archiveSignatures)
+
+
+
+    def __generateDocuments(self):
+        """Generates all documents rendered from templates."""
+
+        # Blog templates are only required by sites with posts
+        if self.__posts:
+            self.__generatePosts()
+            self.__generateArchives()
+
+        self.__generatePages()
+        self.__generateTaxonomies()
+
+
+
+    def __writeManifest(self, previousState, state):
+        """
+        Removes outputs of the previous build which were not generated again and writes
+        a manifest of all created, modified and deleted files for delta deployments.
+        Deleted files whose source item does not exist anymore are additionally listed as stale.
+        """
+
+        destinationPath = self.__profile.getDestinationPath()
+        previousSources = previousState["sources"] if previousState else {}
+        currentSources = state["sources"]
+        itemIds = set([item["id"] for item in itertools.chain(self.__pages, self.__posts)])
+
+        deleted = []
+        stale = []
+
+        for fileName in sorted(set(previousSources) - set(currentSources)):
+            source = previousSources[fileName]
+            isStale = source is not None and source not in itemIds
+
+            # Remove output together with its compressed sidecars
+            for candidate in [fileName] + [fileName + extension for extension in Compressor.EXTENSIONS.values()]:
+                if os.path.exists(candidate):
+                    os.remove(candidate)
+                    deleted.append(candidate)
+
+                    if isStale:
+                        stale.append(candidate)
+
+        if deleted:
+            Console.info("Removed %s outdated files", len(deleted))
+
+        def relative(fileNames):
+            return sorted([os.path.relpath(fileName, destinationPath).replace(os.sep, "/") for fileName in fileNames])
+
+        changes = self.__writer.getChanges()
+        manifest = {
+            "destination" : destinationPath,
+            "created" : relative([fileName for fileName in changes if changes[fileName] == "created"]),
+            "modified" : relative([fileName for fileName in changes if changes[fileName] == "modified"]),
+            "deleted" : relative(deleted),
+            "stale" : relative(stale)
+        }
+
+        Console.info("Output changes: %s created, %s modified, %s deleted", len(manifest["created"]), len(manifest["modified"]), len(manifest["deleted"]))
+
+        if self.__outputManifest:
+            with open(self.__outputManifest, "w", encoding="utf-8") as handle:
+                json.dump(manifest, handle, indent=2, sort_keys=True)
+
+
+
+    def __interateItems(self, items, urlTemplate, itemType, sitemap=True):
         length = len(items)
         padding = len(str(length))
 
@@ -276,28 +854,26 @@ class Konstrukteur:
         profileId = self.__profile.getId()
         destinationPath = self.__profile.getDestinationPath()
 
-        for pos, item in enumerate(items):
-            # The render model is used for rendering the actual template into HTML
-            renderModel = copy.copy(item)
-            renderModel["languages"] = self.__languages
-            renderModel["config"] = self.config
+        # Site wide data is shared by all items through the scope chain: item -> site globals -> config
+        globalScope = self.__getGlobalScope()
 
-            if itemType is "archive":
-                # Add type information
-                renderModel["type"] = "archive"
+        for pos, item in enumerate(items):
+            self.__checkCancelled()
 
-                # Add generated title
-                renderModel["title"] = "Archive %s" % item["pageno"]
+            # The render model is used for rendering the actual template into HTML
+            renderModel = Template.Scope(item, globalScope)
 
-                # Add relative urls for each post
-                for post in item["posts"]:
-                    postPath = Util.replaceFields(self.__postUrl, post)
-                    post["relativeUrl"] = postPath
+            if itemType == "archive":
+                # Add type information and fallback title on top of the item
+                renderModel = Template.Scope({
+                    "type" : "archive",
+                    "title" : item.get("title") or "Archive %s" % item["pageno"]
+                }, renderModel)
 
-            elif itemType is "page":
+            elif itemType == "page":
                 pass
 
-            elif itemType is "post":
+            elif itemType == "post":
                 pass
 
             else:
@@ -309,38 +885,120 @@ class Konstrukteur:
             filePath = Util.replaceFields(urlTemplate, item)
             outputFilename = os.path.join(destinationPath, filePath)
 
+            # Collecting routes does not produce any output yet
+            if self.__collecting is None:
+                if self.__sitemap and sitemap:
+                    self.__sitemap.add(filePath, item["mtime"])
+
+                Console.info("Generating %s/%s: %s@%s...", str(pos + 1).zfill(padding), length, item["id"], item["language"])
+
+            # Generated listings have no source item
+            source = None if itemType == "archive" else item["id"]
+
+            yield renderModel, outputFilename, source
+
+
+
+    def __getAbsoluteSiteUrl(self):
+        """Returns the site URL including the scheme as protocol relative URLs are not allowed inside sitemaps and feeds."""
 
+        siteUrl = self.__siteUrl
+        if siteUrl.startswith("//"):
+            siteUrl = "%s:%s" % (self.__siteScheme, siteUrl)
 
-            Console.info("Generating %s/%s: %s@%s...", str(pos + 1).zfill(padding), length, item["id"], item["language"])
+        return siteUrl
 
-            yield renderModel, outputFilename
+
+
+    def __getGlobalScope(self):
+        """Returns the scope chain of site wide render data which is identical for all items."""
+
+        configScope = Template.Scope({
+            "config" : self.config
+        })
+
+        return Template.Scope({
+            "languages" : self.__languages,
+            "site" : {
+                "name" : self.__siteName,
+                "url" : self.__siteUrl
+            }
+        }, configScope)
 
 
 
     def __generatePosts(self):
         template = self.__getTemplateByBasename("Post")
 
-        for renderModel, outputFilename in self.__interateItems(self.__posts, self.__postUrl, "post"):
-            resultContent = template.render(renderModel)
-            self.__fileManager.writeFile(outputFilename, resultContent)
+        for renderModel, outputFilename, source in self.__interateItems(self.__posts, self.__postUrl, "post"):
+            self.__emit(outputFilename, template, renderModel, source)
 
 
 
     def __generateArchives(self):
         template = self.__getTemplateByBasename("Archive")
+        pages = self.__generateArchiveData()
+        self.__renderArchivePages(template, pages, self.__archiveUrl)
+
+        # Stable page numbers change the URL of the newest posts, add an alias with a fixed URL.
+        # The alias duplicates the last numbered page and is therefore not listed in the sitemap.
+        if self.__archiveStable:
+            latestPages = {}
+            for page in pages:
+                latestPages[page["language"]] = page
 
-        for renderModel, outputFilename in self.__interateItems(self.__generateArchiveData(), self.__archiveUrl, "archive"):
-            resultContent = template.render(renderModel)
-            self.__fileManager.writeFile(outputFilename, resultContent)
+            self.__renderArchivePages(template, [latestPages[language] for language in sorted(latestPages)], self.__archiveLatestUrl, False)
+
+
+
+    def __generateTaxonomies(self):
+        if not self.__taxonomies:
+            return
+
+        Console.info("Generating taxonomies...")
+        Console.indent()
+
+        # Single pass over all published posts in listing order
+        taxonomyIndex = Taxonomy.TaxonomyIndex(dict([(name, config.get("field", name)) for name, config in self.__taxonomies.items()]))
+        for language in sorted(self.__languages):
+            taxonomyIndex.build(self.__postIndex.get(language, "published"))
+
+        # Themes may provide a special taxonomy template, the archive template is used otherwise
+        templateName = "%s.Taxonomy" % self.__theme
+        template = self.__templates[templateName] if templateName in self.__templates else self.__getTemplateByBasename("Archive")
+
+        for name in taxonomyIndex.getTaxonomies():
+            urlTemplate = self.__taxonomies[name].get("url", "blog/%s/{{slug}}.{{language}}.html" % name)
+            self.__renderArchivePages(template, self.__generateTaxonomyData(name, taxonomyIndex), urlTemplate)
+
+        Console.outdent()
+
+
+
+    def __renderArchivePages(self, template, pages, urlTemplate, sitemap=True):
+        """
+        Renders all archive @pages {List}. Pages whose posts and settings did not change since the previous build are skipped.
+        Aliases of other pages pass `False` for @sitemap {Boolean} to be left out of the sitemap.
+        """
+
+        for page, (renderModel, outputFilename, source) in zip(pages, self.__interateItems(pages, urlTemplate, "archive", sitemap)):
+            if self.__collecting is None:
+                signature = Archive.getSignature(page, self.__renderChecksum)
+                self.__archiveSignatures[outputFilename] = signature
+
+                if self.__previousArchiveSignatures.get(outputFilename) == signature and self.__writer.keep(outputFilename, source):
+                    Console.debug("Unchanged archive page %s", outputFilename)
+                    continue
+
+            self.__emit(outputFilename, template, renderModel, source)
 
 
 
     def __generatePages(self):
         template = self.__getTemplateByBasename("Page")
 
-        for renderModel, outputFilename in self.__interateItems(self.__pages, self.__pageUrl, "page"):
-            resultContent = template.render(renderModel)
-            self.__fileManager.writeFile(outputFilename, resultContent)
+        for renderModel, outputFilename, source in self.__interateItems(self.__pages, self.__pageUrl, "page"):
+            self.__emit(outputFilename, template, renderModel, source)
 
 
 
@@ -357,37 +1015,61 @@ class Konstrukteur:
 
 
     def __generateFeed(self):
-        if not self.__posts:
+        if not self.__posts or self.__feedLength <= 0:
             return
 
-        Console.info("Generating feed...")
+        Console.info("Generating feeds...")
         Console.indent()
 
-        itemsInFeed = self.config["blog"]["itemsInFeed"]
         destinationPath = self.__profile.getDestinationPath()
+        stateKey = "konstrukteur.feed.state[%s]" % destinationPath
 
-        for language in self.__languages:
-            sortedPosts = self.__getSortedPosts(language)
+        # Themes may override the built-in Atom output with a feed template
+        template = self.__templates.get("%s.Feed" % self.__theme)
 
-            # Feed Render Model
-            renderModel = {
-                'config' : self.config,
-                'site' : {
-                    'name' : self.__siteName,
-                    'url' : self.__siteUrl
-                },
-                "current" : {
-                    "lang" : language
-                },
-                "feedUrl" : self.__feedUrl,
-                "now" : datetime.datetime.now(tz=dateutil.tz.tzlocal()).replace(microsecond=0).isoformat(),
-                "posts" : sortedPosts[0:itemsInFeed]
-            }
+        feed = Feed.Feed(self.__writer, self.__getAbsoluteSiteUrl(), self.__siteName, self.__feedAuthor, self.__outputThreads, self.__cache.read(stateKey),
+            template, self.__getGlobalScope(), self.__renderChecksum)
+        feeds = []
+
+        for language in sorted(self.__languages):
+            # Index is sorted by date so the latest posts are at the end
+            latestPosts = self.__postIndex.get(language, "published")[-self.__feedLength:]
+            if not latestPosts:
+                continue
+
+            entries = [(post, post["relativeUrl"]) for post in reversed(latestPosts)]
+            feedUrl = Util.replaceFields(self.__feedUrl, {"language" : language})
+            feeds.append((os.path.join(destinationPath, feedUrl), feedUrl, entries))
+
+        feed.generate(feeds)
+        feed.report()
+
+        self.__cache.store(stateKey, feed.getState())
 
-            template = self.__templates["%s.Feed" % self.__theme]
-            outputContent = template.render(renderModel)
-            outputFilename = os.path.join(destinationPath, self.__feedUrl)
-            self.__fileManager.writeFile(outputFilename, outputContent)
+        Console.outdent()
+
+
+    def __generateSearchIndex(self):
+        if not self.__searchEnabled:
+            return
+
+        Console.info("Generating search index...")
+        Console.indent()
+
+        destinationPath = self.__profile.getDestinationPath()
+        cacheKey = "konstrukteur.search.tokens[%s]" % destinationPath
+
+        searchIndex = SearchIndex.SearchIndex(self.__writer, destinationPath, self.__searchPath, self.__searchPrefixLength, self.__searchMinLength, self.__cache.read(cacheKey))
+
+        for language in sorted(self.__languages):
+            for page in self.__pageIndex.get(language, "published"):
+                searchIndex.add(page, Util.replaceFields(self.__pageUrl, page))
+
+            for post in self.__postIndex.get(language, "published"):
+                searchIndex.add(post, post["relativeUrl"])
+
+        searchIndex.close()
+        self.__cache.store(cacheKey, searchIndex.getCache())
 
         Console.outdent()
 
@@ -396,6 +1078,10 @@ class Konstrukteur:
         return item["date"]
 
 
+    def __pageSorter(self, item):
+        return JasyUtil.getKey(item, "pos", 1000000)
+
+
 
 
 
@@ -411,7 +1097,7 @@ class Konstrukteur:
         languages = self.__languages
 
         def languageMap(value):
-            isCurrent = value == item["lang"]
+            isCurrent = value == item["language"]
             localizedName = self.__locales[value].getName(value)
             relativeUrl = "." if isCurrent else item["translations"][value]
 
@@ -428,10 +1114,6 @@ class Konstrukteur:
     def __getFilteredPages(self, currentItem):
         """Return sorted list of only pages of same language and not hidden."""
 
-        pages = self.__pages
-        currentLang = currentItem["lang"]
-        pageList = [pageItem for pageItem in pages if pageItem["lang"] == currentLang and not pageItem["status"] == "hidden"]
-
-        return sorted(pageList, key=lambda pageItem: JasyUtil.getKey(pageItem, "pos", 1000000))
+        return self.__pageIndex.select(currentItem["language"], exclude=["hidden"])
 
 
@@ -0,0 +1,333 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["OutputWriter"]
+
+import os
+import hashlib
+import threading
+import concurrent.futures
+
+import jasy.core.Console as Console
+
+# Atomic replace of existing files (Python 3.3+), rename is atomic on POSIX as well
+replaceFile = getattr(os, "replace", os.rename)
+
+FSYNC_MODES = ("none", "build", "file")
+
+
+def syncFile(fileName):
+    """Flushes the content of @fileName {String} to disk."""
+
+    try:
+        handle = os.open(fileName, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except OSError:
+        # Removed in the meantime
+        return
+
+    try:
+        os.fsync(handle)
+    finally:
+        os.close(handle)
+
+
+def syncDirectory(dirname):
+    """Flushes the entries of the folder @dirname {String} to disk, where supported (not on Windows)."""
+
+    try:
+        handle = os.open(dirname or os.curdir, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(handle)
+    except OSError:
+        pass
+    finally:
+        os.close(handle)
+
+
+class OutputWriter:
+
+    """
+    Writes generated files into the destination folder.
+
+    Files are written to a temporary file first which is then atomically renamed to the
+    final name so that a crash never leaves half written pages behind. Existing directories
+    are remembered to omit redundant checks and writes are executed on a small thread pool.
+
+    Syncing to disk is controlled by @fsync {String}:
+
+    - `none`: leave it to the operating system
+    - `build`: sync all written files and their folders when closing the writer
+    - `file`: sync every file before renaming it and its folder afterwards
+
+    Folders are synced as well to make the renames durable.
+
+    The state of the previous build (see {#getState}) can be passed in as @state {Map?null}.
+    Files whose checksum did not change and which still exist are not written again.
+    Registered stages are executed on the thread pool after every written or kept file.
+    """
+
+    def __init__(self, profile=None, fsync="none", threads=4, state=None):
+        if fsync not in FSYNC_MODES:
+            raise ValueError("Unsupported fsync mode: %s" % fsync)
+
+        self.__profile = profile
+        self.__fsync = fsync
+        self.__previousHashes = state["hashes"] if state else {}
+        self.__hashes = {}
+        self.__sources = {}
+        self.__changes = {}
+        self.__stages = []
+        self.__filters = []
+
+        self.__directories = set()
+        self.__syncDirectories = set()
+        self.__written = []
+        self.__pending = []
+        self.__lock = threading.Lock()
+
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, threads))
+
+
+    def addStage(self, stage):
+        """
+        Registers a post processing @stage {Function} which is called with the writer,
+        the file name, the written data {bytes} and whether the file has been changed.
+        """
+
+        self.__stages.append(stage)
+
+
+    def addFilter(self, filter):
+        """
+        Registers a content @filter {Function} which is called with the file name and the
+        generated content {String} and returns the content to write. Filters are
+        executed on the thread pool before the checksum is computed.
+        """
+
+        self.__filters.append(filter)
+
+
+    def getState(self):
+        """
+        {Map} Returns the checksums (`hashes`) and source item IDs (`sources`) of all files
+        written or confirmed unchanged by this writer.
+        """
+
+        with self.__lock:
+            return {
+                "hashes" : dict(self.__hashes),
+                "sources" : dict(self.__sources)
+            }
+
+
+    def getChanges(self):
+        """{Map} Returns all files actually written by this writer mapped to either `created` or `modified`."""
+
+        with self.__lock:
+            return dict(self.__changes)
+
+
+    def write(self, fileName, content, source=None):
+        """
+        {concurrent.futures.Future} Schedules writing @content {String} to @fileName {String}.
+        The optional @source {String?null} is the ID of the item the file was generated from.
+        The future resolves to the final file name.
+        """
+
+        if self.__profile:
+            fileName = self.__profile.expandFileName(fileName)
+
+        with self.__lock:
+            self.__sources[fileName] = source
+
+        future = self.__executor.submit(self.__write, fileName, content)
+
+        with self.__lock:
+            self.__pending.append(future)
+
+        return future
+
+
+    def keep(self, fileName, source=None):
+        """
+        Marks the previously generated @fileName {String} as still being part of the output without
+        writing it again. Returns whether the file is known from the previous build and still exists.
+        """
+
+        if self.__profile:
+            fileName = self.__profile.expandFileName(fileName)
+
+        checksum = self.__previousHashes.get(fileName)
+        if checksum is None or not os.path.exists(fileName):
+            return False
+
+        with self.__lock:
+            self.__hashes[fileName] = checksum
+            self.__sources[fileName] = source
+
+        # Stages keep track of their own derived files
+        if self.__stages:
+            future = self.__executor.submit(self.__runStages, fileName)
+
+            with self.__lock:
+                self.__pending.append(future)
+
+        return True
+
+
+    def isUnchanged(self, fileName, checksum):
+        """
+        Returns whether @fileName {String} has been written with the same @checksum {String}
+        by the previous build and still exists. Used by stages writing derived files through
+        {#storeFile}. The checksum is remembered for the next build in both cases.
+        """
+
+        unchanged = self.__previousHashes.get(fileName) == checksum and os.path.exists(fileName)
+
+        with self.__lock:
+            self.__hashes[fileName] = checksum
+
+        return unchanged
+
+
+    def flush(self):
+        """Waits for all scheduled writes. Raises the first error which occurred."""
+
+        with self.__lock:
+            pending = self.__pending
+            self.__pending = []
+
+        error = None
+        for future in pending:
+            exception = future.exception()
+            if exception is not None and error is None:
+                error = exception
+
+        if error is not None:
+            raise error
+
+
+    def close(self):
+        """Waits for all pending writes, syncs them to disk (depending on fsync mode) and stops the thread pool."""
+
+        try:
+            self.flush()
+
+            if self.__fsync == "build" and self.__written:
+                self.__syncAll()
+
+        finally:
+            self.__executor.shutdown(wait=True)
+
+
+    def __makeDir(self, dirname):
+        if dirname in self.__directories:
+            return
+
+        # Entries of newly created folders live in their parent folders
+        missing = []
+        if self.__fsync != "none":
+            current = dirname
+            while current and not os.path.isdir(current):
+                missing.append(current)
+                current = os.path.dirname(current)
+
+        os.makedirs(dirname, exist_ok=True)
+
+        for created in missing:
+            self.__syncDirectory(os.path.dirname(created))
+
+        self.__directories.add(dirname)
+
+
+    def __syncDirectory(self, dirname):
+        """Syncs @dirname {String} right away in `file` mode, collects it for {#close} in `build` mode."""
+
+        if self.__fsync == "file":
+            syncDirectory(dirname)
+        elif self.__fsync == "build":
+            with self.__lock:
+                self.__syncDirectories.add(dirname)
+
+
+    def __write(self, fileName, content):
+        for filter in self.__filters:
+            content = filter(fileName, content)
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        checksum = hashlib.sha1(content).hexdigest()
+        changed = self.__previousHashes.get(fileName) != checksum or not os.path.exists(fileName)
+
+        if changed:
+            self.storeFile(fileName, content)
+        else:
+            Console.debug("Unchanged %s", fileName)
+
+        with self.__lock:
+            self.__hashes[fileName] = checksum
+
+        for stage in self.__stages:
+            stage(self, fileName, content, changed)
+
+        return fileName
+
+
+    def __runStages(self, fileName):
+        with open(fileName, "rb") as handle:
+            content = handle.read()
+
+        for stage in self.__stages:
+            stage(self, fileName, content, False)
+
+
+    def storeFile(self, fileName, content):
+        """Atomically writes @content {bytes} to @fileName {String} in the current thread."""
+
+        dirname = os.path.dirname(fileName)
+        if dirname:
+            self.__makeDir(dirname)
+
+        existed = os.path.exists(fileName)
+        tempName = os.path.join(dirname, ".%s.%s-%s.tmp" % (os.path.basename(fileName), os.getpid(), threading.get_ident()))
+        handle = os.open(tempName, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+
+        try:
+            view = memoryview(content)
+            while view:
+                view = view[os.write(handle, view):]
+
+            if self.__fsync == "file":
+                os.fsync(handle)
+
+        except:
+            os.close(handle)
+            os.remove(tempName)
+            raise
+
+        os.close(handle)
+        replaceFile(tempName, fileName)
+        self.__syncDirectory(dirname)
+
+        with self.__lock:
+            self.__written.append(fileName)
+            self.__changes[fileName] = "modified" if existed else "created"
+
+        Console.debug("Wrote %s", fileName)
+
+
+    def __syncAll(self):
+        """Syncs all written files on the thread pool, then the folders containing them."""
+
+        for future in [self.__executor.submit(syncFile, fileName) for fileName in self.__written]:
+            future.result()
+
+        for dirname in sorted(self.__syncDirectories, key=len, reverse=True):
+            syncDirectory(dirname)
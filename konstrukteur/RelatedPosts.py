@@ -0,0 +1,318 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["RelatedPosts", "isSupported"]
+
+import math
+import hashlib
+
+import jasy.core.Console as Console
+import konstrukteur.SearchIndex as SearchIndex
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import scipy.sparse as sparse
+except ImportError:
+    sparse = None
+
+# Fields used for similarity
+FIELDS = ("title", "summary", "content")
+
+# Share of changed posts up to which the previous vocabulary is reused
+INCREMENTAL_LIMIT = 0.1
+
+
+def isSupported():
+    """{Boolean} Whether NumPy is available."""
+
+    return numpy is not None
+
+
+class RelatedPosts:
+
+    """
+    Computes the @count {Integer} most similar posts of every post using cosine similarity of
+    TF-IDF vectors over title, summary and content.
+
+    Similarities are computed block wise (@blockSize {Integer} rows at once) through matrix
+    products. With SciPy available the term matrix is sparse, otherwise a dense matrix of the
+    @maxFeatures {Integer} most useful terms is used.
+
+    Term counts are cached per post (ID and language) and checksum. When only a small share of the
+    posts changed, the vocabulary of the previous run is kept and only the rows of changed posts plus
+    the lists which referenced them are recomputed. Unchanged lists are merged with the changed rows.
+    """
+
+    def __init__(self, count=5, maxFeatures=1024, blockSize=512, state=None):
+        if numpy is None:
+            raise RuntimeError("Related posts require NumPy")
+
+        self.__count = count
+        self.__maxFeatures = maxFeatures
+        self.__blockSize = blockSize
+
+        state = state or {}
+        self.__previousTerms = state.get("terms", {})
+        self.__previousLanguages = state.get("languages", {})
+
+        self.__terms = {}
+        self.__languages = {}
+
+
+    def getState(self):
+        """{Map} Returns cached term counts and related lists for the next run."""
+
+        return {
+            "terms" : self.__terms,
+            "languages" : self.__languages
+        }
+
+
+    def __getTermCounts(self, post):
+        checksum = hashlib.sha1()
+        for field in FIELDS:
+            checksum.update(("%s\n" % post.get(field, "")).encode("utf-8"))
+
+        checksum = checksum.hexdigest()
+        # Translations share their ID
+        key = (post["id"], post["language"])
+        cached = self.__previousTerms.get(key)
+
+        if cached is not None and cached[0] == checksum:
+            counts = cached[1]
+        else:
+            counts = {}
+            for field in FIELDS:
+                value = post.get(field)
+                if value:
+                    for token in SearchIndex.tokenize(str(value)):
+                        counts[token] = counts.get(token, 0) + 1
+
+        self.__terms[key] = (checksum, counts)
+        return checksum, counts
+
+
+    def compute(self, language, posts):
+        """
+        Stores the most similar posts of the same @language {String} as `related` list in every
+        post of @posts {List}.
+        """
+
+        ids = [post["id"] for post in posts]
+        checksums = []
+        documents = []
+
+        for post in posts:
+            checksum, counts = self.__getTermCounts(post)
+            checksums.append(checksum)
+            documents.append(counts)
+
+        previous = self.__previousLanguages.get(language)
+        changed = self.__getChanged(previous, ids, checksums)
+
+        if changed is None:
+            vocabulary = self.__buildVocabulary(documents)
+            related = self.__computeRows(documents, vocabulary, ids)
+            Console.info("Related posts %s: computed %s posts", language, len(ids))
+        else:
+            vocabulary = previous["vocabulary"]
+            related = self.__updateRows(documents, vocabulary, ids, changed, previous["related"])
+
+        self.__languages[language] = {
+            "ids" : ids,
+            "checksums" : checksums,
+            "vocabulary" : vocabulary,
+            "related" : related
+        }
+
+        byId = dict(zip(ids, posts))
+        for post in posts:
+            post["related"] = [byId[relatedId] for relatedId, score in related.get(post["id"], []) if relatedId in byId]
+
+
+    def __getChanged(self, previous, ids, checksums):
+        """Returns the positions of new or modified posts or `None` when a full computation is required."""
+
+        if not previous:
+            return None
+
+        previousChecksums = dict(zip(previous["ids"], previous["checksums"]))
+        changed = [pos for pos, postId in enumerate(ids) if previousChecksums.get(postId) != checksums[pos]]
+        removed = len(previousChecksums) - (len(ids) - len(changed))
+
+        if len(changed) + removed > len(ids) * INCREMENTAL_LIMIT:
+            return None
+
+        return changed
+
+
+    def __buildVocabulary(self, documents):
+        """Returns a map of term to (column, idf). Terms only used once or in most posts do not help finding similar posts."""
+
+        frequencies = {}
+        for counts in documents:
+            for term in counts:
+                frequencies[term] = frequencies.get(term, 0) + 1
+
+        total = len(documents)
+        candidates = [term for term, frequency in frequencies.items() if 1 < frequency <= max(2, total // 2)]
+
+        # Dense matrices are limited to the most frequently used of the remaining terms
+        if sparse is None and len(candidates) > self.__maxFeatures:
+            candidates = sorted(candidates, key=lambda term: (-frequencies[term], term))[:self.__maxFeatures]
+
+        vocabulary = {}
+        for column, term in enumerate(sorted(candidates)):
+            vocabulary[term] = (column, math.log(total / frequencies[term]) + 1.0)
+
+        return vocabulary
+
+
+    def __buildMatrix(self, documents, vocabulary):
+        """Returns the row normalized TF-IDF matrix of all @documents."""
+
+        indptr = [0]
+        indices = []
+        values = []
+
+        for counts in documents:
+            for term, count in counts.items():
+                entry = vocabulary.get(term)
+                if entry is not None:
+                    indices.append(entry[0])
+                    values.append((1.0 + math.log(count)) * entry[1])
+
+            indptr.append(len(indices))
+
+        indptr = numpy.array(indptr, dtype=numpy.int64)
+        indices = numpy.array(indices, dtype=numpy.int64)
+        values = numpy.array(values, dtype=numpy.float32)
+
+        # Normalize rows to unit length so the dot product is the cosine similarity
+        rows = numpy.repeat(numpy.arange(len(documents)), numpy.diff(indptr))
+        norms = numpy.zeros(len(documents), dtype=numpy.float32)
+        numpy.add.at(norms, rows, values * values)
+        norms = numpy.sqrt(norms)
+        norms[norms == 0] = 1.0
+        values /= norms[rows]
+
+        shape = (len(documents), max(1, len(vocabulary)))
+        if sparse is not None:
+            return sparse.csr_matrix((values, indices, indptr), shape=shape)
+
+        matrix = numpy.zeros(shape, dtype=numpy.float32)
+        matrix[rows, indices] = values
+        return matrix
+
+
+    def __iterateSimilarities(self, matrix, positions):
+        """Yields (positions, similarities) blocks of the given rows against all rows."""
+
+        transposed = matrix.T
+        positions = list(positions)
+
+        for start in range(0, len(positions), self.__blockSize):
+            block = numpy.array(positions[start:start + self.__blockSize], dtype=numpy.int64)
+            similarities = matrix[block].dot(transposed)
+            if sparse is not None:
+                similarities = similarities.toarray()
+
+            # Posts are never related to themselves
+            similarities[numpy.arange(len(block)), block] = 0.0
+
+            yield block, similarities
+
+
+    def __selectTop(self, ids, similarities):
+        """Returns lists of [id, score] of the best matches sorted by score for every row of @similarities."""
+
+        count = min(self.__count, similarities.shape[1])
+        if count <= 0:
+            return [[] for row in similarities]
+
+        # Partial selection of the best columns per row, only these are sorted
+        top = numpy.argpartition(-similarities, count - 1, axis=1)[:, :count]
+        scores = numpy.take_along_axis(similarities, top, axis=1)
+        order = numpy.argsort(-scores, axis=1, kind="stable")
+        top = numpy.take_along_axis(top, order, axis=1).tolist()
+        scores = numpy.take_along_axis(scores, order, axis=1).tolist()
+
+        return [[[ids[pos], score] for pos, score in zip(positions, values) if score > 0] for positions, values in zip(top, scores)]
+
+
+    def __computeRows(self, documents, vocabulary, ids):
+        """Computes the lists of all posts."""
+
+        related = {}
+        matrix = self.__buildMatrix(documents, vocabulary)
+
+        for block, similarities in self.__iterateSimilarities(matrix, range(len(ids))):
+            for pos, entries in zip(block, self.__selectTop(ids, similarities)):
+                related[ids[pos]] = entries
+
+        return related
+
+
+    def __updateRows(self, documents, vocabulary, ids, changed, previousRelated):
+        """Recomputes the rows of @changed posts and merges them into the previous lists of all others."""
+
+        known = set(ids)
+        changedIds = set([ids[pos] for pos in changed])
+
+        # Lists referencing changed or removed posts have to be computed again
+        dirty = set(changed)
+        for pos, postId in enumerate(ids):
+            entries = previousRelated.get(postId)
+            if entries is None or any([relatedId in changedIds or relatedId not in known for relatedId, score in entries]):
+                dirty.add(pos)
+
+        related = {}
+        for pos, postId in enumerate(ids):
+            if pos not in dirty:
+                related[postId] = previousRelated[postId]
+
+        matrix = self.__buildMatrix(documents, vocabulary)
+
+        # Threshold every unchanged list has to beat to be affected by a changed post
+        thresholds = numpy.zeros(len(ids), dtype=numpy.float32)
+        for pos, postId in enumerate(ids):
+            entries = related.get(postId)
+            if entries is not None and len(entries) >= self.__count:
+                thresholds[pos] = entries[-1][1]
+
+        merged = 0
+        for block, similarities in self.__iterateSimilarities(matrix, sorted(dirty)):
+            for pos, entries in zip(block, self.__selectTop(ids, similarities)):
+                related[ids[pos]] = entries
+
+            # Similarity is symmetric: rows of changed posts are columns of all others
+            isChanged = numpy.array([ids[pos] in changedIds for pos in block], dtype=bool)
+            if not isChanged.any():
+                continue
+
+            changedBlock = block[isChanged]
+            changedSimilarities = similarities[isChanged]
+
+            for column in numpy.nonzero(changedSimilarities.max(axis=0) > thresholds)[0]:
+                postId = ids[column]
+                if column in dirty:
+                    continue
+
+                candidates = related[postId] + [[ids[pos], float(score)] for pos, score in zip(changedBlock, changedSimilarities[:, column]) if score > 0]
+                candidates.sort(key=lambda entry: -entry[1])
+                related[postId] = candidates[:self.__count]
+
+                if len(related[postId]) >= self.__count:
+                    thresholds[column] = related[postId][-1][1]
+
+                merged += 1
+
+        Console.info("Related posts: recomputed %s posts, updated %s lists", len(dirty), merged)
+        return related
@@ -0,0 +1,152 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["SearchIndex", "tokenize", "getShardName"]
+
+import os
+import re
+import json
+import html
+import hashlib
+
+import jasy.core.Console as Console
+import konstrukteur.Util as Util
+
+TAG_REGEX = re.compile(r"<[^>]*>")
+WORD_REGEX = re.compile(r"\w+", re.UNICODE)
+SHARD_REGEX = re.compile(r"^[a-z0-9_]+$")
+
+# Weights of the indexed fields
+FIELDS = (("title", 5), ("summary", 2), ("content", 1))
+
+
+def tokenize(text, minLength=2):
+    """{List} Returns the lower case words of @text {String} (HTML is stripped) with at least @minLength {Integer} characters."""
+
+    text = html.unescape(TAG_REGEX.sub(" ", text)).lower()
+    return [word for word in WORD_REGEX.findall(text) if len(word) >= minLength and not word.isdigit()]
+
+
+def getShardName(prefix):
+    """
+    {String} Returns the file name of the shard holding all terms starting with @prefix {String}.
+    Prefixes with other than ASCII letters, digits and underscores are hex encoded (UTF-8) after `x-`.
+    """
+
+    if SHARD_REGEX.match(prefix):
+        return prefix
+
+    return "x-" + "".join(["%02x" % char for char in prefix.encode("utf-8")])
+
+
+class SearchIndex:
+
+    """
+    Builds an inverted index (term => weighted document numbers) for client side search.
+
+    Output per language in @path {String} (`{{language}}` is replaced):
+
+    - `documents.json`: list of [url, title] of all indexed items, the document number is the position
+    - `shards.json`: prefix length and list of available shards
+    - `<prefix>.json`: terms starting with the prefix mapped to lists of [document, weight], see {getShardName}
+
+    Weighted terms per document are cached by the checksum of the indexed fields (see {#getCache})
+    so unchanged documents are not tokenized again.
+    """
+
+    def __init__(self, writer, destinationPath, path="search/{{language}}", prefixLength=2, minLength=2, cache=None):
+        self.__writer = writer
+        self.__destinationPath = destinationPath
+        self.__path = path
+        self.__prefixLength = max(1, prefixLength)
+        self.__minLength = minLength
+
+        self.__previousCache = cache or {}
+        self.__cache = {}
+        self.__documents = {}
+        self.__tokenized = 0
+
+
+    def getCache(self):
+        """{Map} Returns the weighted terms of all indexed documents keyed by item ID and language (translations share their ID)."""
+
+        return self.__cache
+
+
+    def add(self, item, url):
+        """Adds @item {Map} available at @url {String} to the index of its language."""
+
+        checksum = hashlib.sha1()
+        for field, weight in FIELDS:
+            checksum.update(("%s\n" % item.get(field, "")).encode("utf-8"))
+
+        checksum = checksum.hexdigest()
+        key = (item["id"], item["language"])
+        cached = self.__previousCache.get(key)
+
+        if cached is not None and cached[0] == checksum:
+            weights = cached[1]
+        else:
+            weights = {}
+            for field, weight in FIELDS:
+                value = item.get(field)
+                if value:
+                    for token in tokenize(str(value), self.__minLength):
+                        weights[token] = weights.get(token, 0) + weight
+
+            self.__tokenized += 1
+
+        self.__cache[key] = (checksum, weights)
+
+        documents = self.__documents.get(item["language"])
+        if documents is None:
+            documents = self.__documents[item["language"]] = []
+
+        documents.append((url, item.get("title", ""), weights))
+
+
+    def close(self):
+        """Writes the index files of all languages."""
+
+        for language in sorted(self.__documents):
+            documents = self.__documents[language]
+            basePath = os.path.join(self.__destinationPath, Util.replaceFields(self.__path, {"language" : language}))
+
+            # Invert document => terms into prefix => term => postings
+            shards = {}
+            for number, (url, title, weights) in enumerate(documents):
+                for term, weight in weights.items():
+                    prefix = term[:self.__prefixLength]
+                    shard = shards.get(prefix)
+                    if shard is None:
+                        shard = shards[prefix] = {}
+
+                    postings = shard.get(term)
+                    if postings is None:
+                        shard[term] = [[number, weight]]
+                    else:
+                        postings.append([number, weight])
+
+            shardNames = []
+            for prefix in sorted(shards):
+                shardName = getShardName(prefix)
+                shardNames.append(shardName)
+                self.__writeJson(os.path.join(basePath, "%s.json" % shardName), shards[prefix])
+
+            self.__writeJson(os.path.join(basePath, "documents.json"), [[url, title] for url, title, weights in documents])
+            self.__writeJson(os.path.join(basePath, "shards.json"), {
+                "prefixLength" : self.__prefixLength,
+                "minLength" : self.__minLength,
+                "shards" : shardNames
+            })
+
+            Console.info("Search index %s: %s documents, %s shards", language, len(documents), len(shardNames))
+
+        Console.info("Tokenized %s documents, %s from cache", self.__tokenized, len(self.__cache) - self.__tokenized)
+
+
+    def __writeJson(self, fileName, data):
+        self.__writer.write(fileName, json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")))
@@ -0,0 +1,110 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["Sitemap"]
+
+import os
+import time
+import urllib.parse
+
+from xml.sax.saxutils import escape
+
+# Limit of URLs per sitemap file defined by sitemaps.org
+MAX_ENTRIES = 50000
+
+HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+NAMESPACE = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def formatTime(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+class Sitemap:
+
+    """
+    Streaming sitemap generator. Entries are collected while the output is generated and
+    every shard is handed over to the @writer {OutputWriter} as soon as it is full.
+    Sites with more entries than fit into one file get numbered shards (`sitemap-1.xml`, ...)
+    together with a sitemap index under @fileName {String}.
+
+    Shards are only rewritten by the writer when their content changed, so entries should
+    be added in a stable order.
+    """
+
+    def __init__(self, writer, baseUrl, destinationPath, fileName="sitemap.xml", shardSize=MAX_ENTRIES):
+        self.__writer = writer
+        self.__baseUrl = baseUrl.rstrip("/") + "/"
+        self.__destinationPath = destinationPath
+        self.__fileName = fileName
+        self.__shardSize = min(shardSize, MAX_ENTRIES)
+
+        self.__entries = []
+        self.__lastmod = None
+        self.__shards = []
+
+
+    def getUrl(self, relativePath):
+        """{String} Returns the absolute URL of the given @relativePath {String} inside the destination folder."""
+
+        return self.__baseUrl + urllib.parse.quote(relativePath.replace(os.sep, "/"))
+
+
+    def add(self, relativePath, mtime=None):
+        """Adds the page at @relativePath {String} with the modification time @mtime {Number?null}."""
+
+        entry = "<url><loc>%s</loc>" % escape(self.getUrl(relativePath))
+        if mtime:
+            entry += "<lastmod>%s</lastmod>" % formatTime(mtime)
+            self.__lastmod = max(self.__lastmod or 0, mtime)
+
+        self.__entries.append(entry + "</url>\n")
+
+        if len(self.__entries) >= self.__shardSize:
+            self.__flushShard()
+
+
+    def __getShardName(self, number):
+        base, extension = os.path.splitext(self.__fileName)
+        return "%s-%s%s" % (base, number, extension)
+
+
+    def __flushShard(self):
+        if not self.__entries:
+            return
+
+        number = len(self.__shards) + 1
+        shardName = self.__getShardName(number)
+        content = "%s<urlset %s>\n%s</urlset>\n" % (HEADER, NAMESPACE, "".join(self.__entries))
+
+        self.__writer.write(os.path.join(self.__destinationPath, shardName), content)
+        self.__shards.append((shardName, self.__lastmod))
+
+        self.__entries = []
+        self.__lastmod = None
+
+
+    def close(self):
+        """Writes the remaining entries and the sitemap index."""
+
+        # Everything fits into one file
+        if not self.__shards:
+            content = "%s<urlset %s>\n%s</urlset>\n" % (HEADER, NAMESPACE, "".join(self.__entries))
+            self.__writer.write(os.path.join(self.__destinationPath, self.__fileName), content)
+            return
+
+        self.__flushShard()
+
+        index = []
+        for shardName, lastmod in self.__shards:
+            entry = "<sitemap><loc>%s</loc>" % escape(self.getUrl(shardName))
+            if lastmod:
+                entry += "<lastmod>%s</lastmod>" % formatTime(lastmod)
+
+            index.append(entry + "</sitemap>\n")
+
+        content = "%s<sitemapindex %s>\n%s</sitemapindex>\n" % (HEADER, NAMESPACE, "".join(index))
+        self.__writer.write(os.path.join(self.__destinationPath, self.__fileName), content)
@@ -0,0 +1,89 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["TaxonomyIndex", "getTerms"]
+
+import konstrukteur.Util as Util
+
+
+def getTerms(item, field):
+    """
+    {List} Returns the terms of @item {Map} for the given @field {String}. Lists are used as is,
+    strings are split at commas (e.g. `tags: python, web` inside front matter).
+    """
+
+    value = item.get(field)
+    if value is None:
+        return []
+
+    if isinstance(value, (list, tuple, set)):
+        terms = [str(term).strip() for term in value]
+    else:
+        terms = [term.strip() for term in str(value).split(",")]
+
+    return [term for term in terms if term]
+
+
+class TaxonomyIndex:
+
+    """
+    Inverted index of taxonomy terms (tags, categories, date buckets, ...) to items.
+
+    @taxonomies {Map} maps every taxonomy name to the item field holding its terms. The index is
+    built in a single pass over the items. Items have to be passed in the order which should be
+    used for listings; the per term lists keep that order.
+    """
+
+    def __init__(self, taxonomies):
+        self.__taxonomies = taxonomies
+
+        # taxonomy => language => term slug => (term, items)
+        self.__index = {}
+        for name in taxonomies:
+            self.__index[name] = {}
+
+
+    def build(self, items):
+        """Adds all @items {List} to the index."""
+
+        taxonomies = self.__taxonomies
+        index = self.__index
+
+        for item in items:
+            language = item["language"]
+
+            for name in taxonomies:
+                languageTerms = index[name].get(language)
+                if languageTerms is None:
+                    languageTerms = index[name][language] = {}
+
+                for term in getTerms(item, taxonomies[name]):
+                    slug = Util.fixSlug(term)
+                    entry = languageTerms.get(slug)
+                    if entry is None:
+                        entry = languageTerms[slug] = (term, [])
+
+                    entry[1].append(item)
+
+
+    def getTaxonomies(self):
+        """{List} Returns the names of all taxonomies."""
+
+        return sorted(self.__index)
+
+
+    def getTerms(self, taxonomy, language):
+        """{List} Returns sorted (slug, term, items) tuples of the given @taxonomy {String} and @language {String}."""
+
+        languageTerms = self.__index[taxonomy].get(language, {})
+        return [(slug, languageTerms[slug][0], languageTerms[slug][1]) for slug in sorted(languageTerms)]
+
+
+    def getItems(self, taxonomy, language, slug):
+        """{List} Returns the items tagged with the term @slug {String}."""
+
+        entry = self.__index[taxonomy].get(language, {}).get(slug)
+        return entry[1] if entry else []
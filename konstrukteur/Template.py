@@ -12,23 +12,84 @@
 
 import re
 
+import jasy.core.Console as Console
+import konstrukteur.TemplateProfiler as TemplateProfiler
+
+# Active profiler instance, see enableProfiling()
+profiler = None
+
+def enableProfiling():
+    """{TemplateProfiler} Enables collecting of runtime statistics for all templates compiled afterwards."""
+    global profiler
+    if profiler is None:
+        profiler = TemplateProfiler.TemplateProfiler()
+
+    return profiler
+
+def disableProfiling():
+    global profiler
+    profiler = None
+
 def camelize(string):
-    return re.sub(r"\-+(\S)?", lambda x: x.group(0).upper(), string)
+    return re.sub(r"\-+(\S)?", lambda x: (x.group(1) or "").upper(), string)
 
-def htmlEscape(str):
-    return htmlMap[str]
+def htmlEscape(match):
+    return htmlMap[match.group(0)]
 
-def getter(key, obj):
+def escape(value):
+    """Returns the HTML escaped version of the given @value {String}."""
+    if profiler is not None:
+        profiler.count("escapes")
+
+    return htmlChars.sub(htmlEscape, value)
+
+class Scope:
+
+    """
+    Lightweight render context. Names are resolved against the own @data {Map}
+    first and then by walking up the @parent {Scope?null} chain. This allows sections
+    to access values of outer scopes without copying any data.
+    """
+
+    __slots__ = ["data", "parent"]
+
+    def __init__(self, data, parent=None):
+        self.data = data
+        self.parent = parent
+
+
+def lookup(key, obj):
     if isinstance(obj, dict):
         if key in obj:
             return obj[key]
 
-        camelized = camelize(key)
-        if camelized in obj:
-            return obj[camelized]
+        # Only keys with dashes are affected by camelizing
+        if "-" in key:
+            if profiler is not None:
+                profiler.count("camelize")
+
+            camelized = camelize(key)
+            if camelized in obj:
+                return obj[camelized]
+
+def getter(key, obj):
+    if isinstance(obj, Scope):
+        while obj is not None:
+            value = lookup(key, obj.data)
+            if value is not None:
+                return value
+
+            obj = obj.parent
+
+        return None
+
+    return lookup(key, obj)
 
 
 def plain(key, data):
+    if isinstance(data, Scope):
+        data = data.data
+
     if data is not None:
         return data
 
@@ -47,7 +108,7 @@ accessor = {
     "0": getter
 }
 
-htmlChars = re.compile("/[&<>\"\']")
+htmlChars = re.compile("[&<>\"\']")
 htmlMap = {
     '&': '&amp;',
     '<': '&lt;',
@@ -67,16 +128,29 @@ class Template:
     __name = None
     __text = None
     __render = None
+    __lineMap = None
 
 
     #
     # Creates a template instance with the given @render {Function} method. Best way to work with
     # the template class is to create one using the {core.template.Compiler#compile} method.
+    # The optional @lineMap {Map} maps lines of the generated code to lines of the template text.
     #
-    def __init__(self, render, text, name):
+    def __init__(self, render, text, name, lineMap=None):
         self.__render = render
         self.__text = text
         self.__name = name
+        self.__lineMap = lineMap or {}
+
+
+    def getName(self):
+        return self.__name
+
+
+    def getSourceLine(self, line):
+        """{Integer} Returns the template text line for the given @line {Integer} of the generated code."""
+
+        return self.__lineMap.get(line)
 
 
     def render(self, data, partials=None, labels=None):
@@ -85,12 +159,25 @@ class Template:
         runtime specific @partials {Map?null} and @labels {Map?null}.
         """
 
+        if not isinstance(data, Scope):
+            data = Scope(data)
+
         try:
             # Need to inject self again as the method applied to 'self' is not bound to the instance in the classical way
             return self.__render(self, data, partials, labels)
-        except ex:
+        except Exception:
             Console.error("Unable to render template " + (self.__name or ""))
-            raise ex
+            raise
+        finally:
+            if profiler is not None:
+                profiler.mark(self.__name, None)
+
+
+    def _mark(self, line):
+        """Profiling hook marking the start of template text @line {Integer}."""
+
+        if profiler is not None:
+            profiler.mark(self.__name, line)
 
 
     def _variable(self, key, method, data):
@@ -103,7 +190,7 @@ class Template:
         if value is None:
             return ""
 
-        return htmlChars.sub(htmlEscape, str(value))
+        return escape(str(value))
 
 
     def _data(self, key, method, data):
@@ -151,15 +238,23 @@ class Template:
         """
         Renders a section using the given @data {var}, user
         defined @partials {Map} and @labels {Map} and a @section {Function} specific renderer.
+        Every entry is rendered in its own scope on top of @data so outer values stay accessible.
         """
 
         value = accessor[method](key, data)
         if value is not None:
+            if profiler is not None:
+                started = TemplateProfiler.timer()
+
             if isinstance(value, list):
-                for pos, entry in enumerate(value):
-                    section(self, value[pos], partials, labels)
+                for entry in value:
+                    section(self, Scope(entry, data), partials, labels)
             else:
-                section(self, value, partials, labels)
+                section(self, Scope(value, data), partials, labels)
+
+            if profiler is not None:
+                iterations = len(value) if isinstance(value, list) else 1
+                profiler.section(self.__name, self.getSourceLine(section.__code__.co_firstlineno), key, iterations, TemplateProfiler.timer() - started)
 
 
     def _has(self, key, method, data):
@@ -14,10 +14,15 @@
 # Licensed under the Apache License, Version 2.0
 #
 
-__all__ = ["compile"]
+__all__ = ["compile", "optimize"]
+
+import re
+import builtins
+import linecache
 
 import jasy.template.Parser as Parser
 import konstrukteur.Template as Template
+import konstrukteur.TemplateProfiler as TemplateProfiler
 
 accessTags = [
     "#",     # go into section / loop start
@@ -36,6 +41,15 @@ innerTags = [
 
 indentString = "  "
 innerCounter = 0
+anonymousCounter = 0
+
+# Comment added to generated code to map it back to the template text
+lineComment = "  # line %s"
+lineCommentMatcher = re.compile(r"  # line (\d+)$")
+
+# Templates which must keep their white space as authored
+preservedWhitespace = re.compile(r"<(pre|textarea|script)[\s>]", re.IGNORECASE)
+whitespace = re.compile(r"\s+")
 
 def escapeContent(content):
     return content.replace("\"", "\\\"").replace("\n", "\\n")
@@ -45,7 +59,7 @@ def escapeMatcher(str):
     return str.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\\n").replace("\r", "\\\r")
 
 
-def walk(node, labels, nostrip, indent):
+def walk(node, labels, nostrip, indent, instrument=False):
     global innerCounter
 
     code = ""
@@ -61,6 +75,14 @@ def walk(node, labels, nostrip, indent):
             name = current["name"]
             escaped = escapeMatcher(name)
 
+            # Remember template line for mapping generated code back to the template text
+            line = current.get("line")
+            comment = "" if line is None else lineComment % line
+            start = len(code)
+
+            if instrument and line is not None:
+                code += prefix + "self._mark(%s)\n" % line
+
             if tag in accessTags:
                 if name == ".":
                     accessor = 2
@@ -72,7 +94,7 @@ def walk(node, labels, nostrip, indent):
                 accessorCode = '"' + escaped + '","' + str(accessor) + '",data'
 
                 if tag in innerTags:
-                    innerCode = walk(current["nodes"], labels, nostrip, indent + 1)
+                    innerCode = walk(current["nodes"], labels, nostrip, indent + 1, instrument) or ((indent + 1) * indentString) + "pass\n"
 
                 if tag == "?":
                     code += prefix + 'if self._has(' + accessorCode + '):\n' + innerCode + '\n'
@@ -83,7 +105,7 @@ def walk(node, labels, nostrip, indent):
                     # Let 'buf' be nonlocal for sharing parent scope's variable
                     nonlocalCode = ((indent + 1) * indentString) + "nonlocal buf\n"
                     code += prefix + ('def inner%s(self, data, partials, labels):\n' % innerCounter) + nonlocalCode + innerCode + '\n'
-                    code += prefix + 'self._section(' + accessorCode + ', partials, labels, inner%s)\n' % innerCounter
+                    code += prefix + 'self._section(' + accessorCode + ', partials, labels, inner%s)' % innerCounter + comment + '\n'
                 elif tag == "=":
                     code += prefix + 'buf += self._data(' + accessorCode + ')\n'
                 elif tag == "$":
@@ -97,20 +119,186 @@ def walk(node, labels, nostrip, indent):
                 else:
                     code += prefix + 'buf += self._label("' + escaped + '", data, partials, labels)\n'
 
+            if comment and len(code) > start:
+                end = code.index("\n", start)
+                code = code[:end] + comment + code[end:]
+
     return code
 
 
-def compile(text, labels=None, nostrip=False, name=None):
+def annotateLines(node, text):
+    """
+    Stores the line number of every tag inside the parsed tree @node {List} based on the
+    original template @text {String}. Tags are matched in order of appearance which
+    is identical to a pre-order traversal of the tree skipping closing and comment tags.
+    """
+
+    positions = []
+    for match in re.finditer(Parser.tagSplitter, text):
+        matched = re.match(Parser.tagMatcher, match.group(0))
+        if matched and matched.group(1) not in ("/", "!"):
+            positions.append(text.count("\n", 0, match.start()) + 1)
+
+    positions.reverse()
+
+    def traverse(node):
+        for current in node:
+            if isinstance(current, str) or current["tag"] == "\n":
+                continue
+
+            if not positions:
+                return
+
+            current["line"] = positions.pop()
+            if "nodes" in current:
+                traverse(current["nodes"])
+
+    traverse(node)
+
+
+def getLineMap(code):
+    """{Map} Returns the mapping of generated code lines to template lines for the given @code {String}."""
+
+    lineMap = {}
+    current = None
+    for pos, line in enumerate(code.split("\n")):
+        matched = lineCommentMatcher.search(line)
+        if matched:
+            current = int(matched.group(1))
+
+        if current is not None:
+            lineMap[pos + 1] = current
+
+    return lineMap
+
+
+def isConstant(name, constants):
+    """Whether the variable @name {String} is fully defined by the build time @constants {Map}."""
+
+    return constants is not None and name != "." and name.split(".", 1)[0] in constants
+
+
+def appendText(nodes, text):
+    """Appends @text {String} to @nodes {List}, merging it into a directly preceding text node."""
+
+    if not text:
+        return
+
+    if nodes and isinstance(nodes[-1], str):
+        nodes[-1] += text
+    else:
+        nodes.append(text)
+
+
+def optimize(node, constants=None, compact=False, commands=None, depth=0):
+    """
+    {List} Returns a specialized copy of the parsed template @node {List}. Adjacent
+    text nodes are merged and variables or conditions only depending on the build time
+    @constants {Map} are folded into static text. Folding is limited to the top level
+    scope (@depth {Integer} of zero) because sections change the lookup context.
+    With @compact {Boolean} enabled white space in static text is collapsed.
+    Jasy commands like `{{@asset.url ...}}` are resolved through @commands {Function?null}
+    and baked into the result as they only have constant arguments.
+    """
+
+    result = []
+
+    for current in node:
+        if isinstance(current, str):
+            appendText(result, current)
+            continue
+
+        tag = current["tag"]
+        if tag == "\n":
+            appendText(result, "\n")
+            continue
+
+        name = current["name"]
+        if commands is not None and tag in ("$", "=") and name.startswith("@"):
+            value = commands(name[1:])
+            appendText(result, Template.escape(value) if tag == "$" else value)
+            continue
+
+        if depth == 0 and tag in accessTags and isConstant(name, constants):
+            value = Template.structure(name, constants)
+
+            if tag == "$":
+                appendText(result, "" if value is None else Template.escape(str(value)))
+                continue
+            elif tag == "=":
+                appendText(result, "" if value is None else str(value))
+                continue
+            elif tag in ("?", "^"):
+                if bool(value) == (tag == "?"):
+                    for child in optimize(current["nodes"], constants, compact, commands, depth):
+                        if isinstance(child, str):
+                            appendText(result, child)
+                        else:
+                            result.append(child)
+
+                continue
+
+        if tag in innerTags:
+            current = dict(current)
+            current["nodes"] = optimize(current["nodes"], constants, compact, commands, depth + 1 if tag == "#" else depth)
+
+        result.append(current)
+
+    if compact:
+        result = [whitespace.sub(" ", current) if isinstance(current, str) else current for current in result]
+
+    return result
+
+
+def compile(text, labels=None, nostrip=False, name=None, constants=None, compact=False, commands=None, instrument=None):
+    """
+    {Template} Compiles the given template @text {String} into a template instance.
+
+    All values available through the build time @constants {Map} (e.g. the site
+    configuration) are folded into the generated render function. Enabling @compact {Boolean}
+    collapses insignificant white space as long as the template does not contain
+    elements which need their white space preserved. Jasy commands are expanded
+    using the @commands {Function?null} resolver.
+
+    The generated code is registered under a synthetic file name like `<template mysite.Page>`
+    so profiler output and tracebacks can be mapped back to the template text. Profiling
+    markers are added with @instrument {Boolean?null} which defaults to whether
+    template profiling is enabled.
+    """
+
+    global anonymousCounter
+
+    if instrument is None:
+        instrument = Template.profiler is not None
+
+    if name is None:
+        anonymousCounter += 1
+        fileName = "<template #%s>" % anonymousCounter
+    else:
+        fileName = "<template %s>" % name
+
     # Parse text into a tree
     tree = Parser.parse(text, nostrip)
+    annotateLines(tree, text)
+
+    # Specialize tree for the current build
+    if compact and preservedWhitespace.search(text):
+        compact = False
+
+    tree = optimize(tree, constants, compact, commands)
 
     # Generate code for render function
-    wrapped = indentString + 'buf = ""\n' + walk(tree, labels, nostrip, 1) + "\n" + indentString + 'return buf'
+    wrapped = indentString + 'buf = ""\n' + walk(tree, labels, nostrip, 1, instrument) + "\n" + indentString + 'return buf'
     code = "def render(self, data, partials=None, labels=None):\n%s" % wrapped
 
+    # Make generated code available for tracebacks and profilers
+    linecache.cache[fileName] = (len(code), None, code.splitlines(True), fileName)
+    lineMap = getLineMap(code)
+    TemplateProfiler.registerLineMap(fileName, lineMap)
+
     # Execute in an sandboxes environment
     export = {}
-    exec(code, None, export)
+    exec(builtins.compile(code, fileName, "exec"), None, export)
 
     # Create new template instance based on "compiled" exported render method
-    return Template.Template(export["render"], text, name)
+    return Template.Template(export["render"], text, name, lineMap)
@@ -0,0 +1,184 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+__all__ = ["TemplateProfiler"]
+
+import time
+import pstats
+import threading
+
+import jasy.core.Console as Console
+
+# Prefer high resolution timer when available (Python 3.3+)
+timer = getattr(time, "perf_counter", time.time)
+
+# Maps of generated code lines to template lines by synthetic file name, see registerLineMap()
+lineMaps = {}
+
+
+def registerLineMap(fileName, lineMap):
+    """Registers the @lineMap {Map} of the template compiled under the synthetic @fileName {String}."""
+
+    lineMaps[fileName] = lineMap
+
+
+def translateStats(stats):
+    """
+    Replaces the line numbers of generated template code inside the cProfile @stats {pstats.Stats}
+    by the matching lines of the template text. Entries which end up on the same line are merged.
+    """
+
+    def translate(func):
+        fileName, line, name = func
+        lineMap = lineMaps.get(fileName)
+        if lineMap is None or line not in lineMap:
+            return func
+
+        return (fileName, lineMap[line], name)
+
+    translated = {}
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        mappedCallers = {}
+        for caller, value in callers.items():
+            mappedCallers = pstats.add_callers(mappedCallers, {translate(caller) : value})
+
+        func = translate(func)
+        if func in translated:
+            translated[func] = pstats.add_func_stats(translated[func], (cc, nc, tt, ct, mappedCallers))
+        else:
+            translated[func] = (cc, nc, tt, ct, mappedCallers)
+
+    stats.stats = translated
+
+    # Sorted function list is cached by pstats
+    stats.fcn_list = None
+    return stats
+
+
+class TemplateProfiler:
+
+    """
+    Collects timing information per template source line and per section together
+    with runtime counters like camelize fallbacks, escapes and section iterations.
+
+    Time is attributed to the line of the last executed marker until the next
+    marker is reached, so every line accounts for its own code and the static
+    text which follows it.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+
+        self.__lines = {}
+        self.__sections = {}
+        self.__counters = {
+            "camelize" : 0,
+            "escapes" : 0,
+            "iterations" : 0
+        }
+
+
+    def count(self, counter, amount=1):
+        """Increments the given @counter {String} by @amount {Integer}."""
+
+        with self.__lock:
+            self.__counters[counter] += amount
+
+
+    def mark(self, template, line):
+        """
+        Marks the start of @line {Integer} of the given @template {String}. Passing
+        `None` as line closes the currently measured segment.
+        """
+
+        now = timer()
+        local = self.__local
+        previous = getattr(local, "current", None)
+
+        with self.__lock:
+            lines = self.__lines
+            if previous is not None:
+                lines[previous][0] += now - local.started
+
+            if line is not None:
+                current = (template, line)
+                if current in lines:
+                    lines[current][1] += 1
+                else:
+                    lines[current] = [0.0, 1]
+            else:
+                current = None
+
+        local.current = current
+        local.started = now
+
+
+    def section(self, template, line, key, iterations, elapsed):
+        """Records a rendered section @key {String} starting at @line {Integer?null} of @template {String}."""
+
+        with self.__lock:
+            self.__counters["iterations"] += iterations
+
+            entry = (template, line, key)
+            if entry in self.__sections:
+                stats = self.__sections[entry]
+                stats[0] += elapsed
+                stats[1] += 1
+                stats[2] += iterations
+            else:
+                self.__sections[entry] = [elapsed, 1, iterations]
+
+
+    def getLines(self):
+        """{List} Returns (template, line, seconds, calls) tuples sorted by time."""
+
+        with self.__lock:
+            result = [(key[0], key[1], value[0], value[1]) for key, value in self.__lines.items()]
+
+        return sorted(result, key=lambda entry: entry[2], reverse=True)
+
+
+    def getSections(self):
+        """{List} Returns (template, line, section, seconds, calls, iterations) tuples sorted by time."""
+
+        with self.__lock:
+            result = [(key[0], key[1], key[2], value[0], value[1], value[2]) for key, value in self.__sections.items()]
+
+        return sorted(result, key=lambda entry: entry[3], reverse=True)
+
+
+    def getCounters(self):
+        """{Map} Returns a copy of all runtime counters."""
+
+        with self.__lock:
+            return dict(self.__counters)
+
+
+    def report(self, limit=20):
+        """Prints the top @limit {Integer} lines and sections to the console."""
+
+        Console.info("Template profile:")
+        Console.indent()
+
+        Console.info("Lines:")
+        Console.indent()
+        for template, line, seconds, calls in self.getLines()[:limit]:
+            Console.info("%s:%s - %.2fms in %s calls", template, line, seconds * 1000, calls)
+        Console.outdent()
+
+        Console.info("Sections:")
+        Console.indent()
+        for template, line, key, seconds, calls, iterations in self.getSections()[:limit]:
+            Console.info("%s:%s#%s - %.2fms in %s calls, %s iterations", template, line, key, seconds * 1000, calls, iterations)
+        Console.outdent()
+
+        counters = self.getCounters()
+        Console.info("Accessor misses (camelize): %s", counters["camelize"])
+        Console.info("Escapes performed: %s", counters["escapes"])
+        Console.info("Section iterations: %s", counters["iterations"])
+
+        Console.outdent()
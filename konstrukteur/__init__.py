@@ -29,3 +29,9 @@ class UserError(Exception):
     """Standard Konstrukteur error class raised whenever something happens which the system understands (somehow
     excepected)"""
     pass
+
+
+class BuildCancelled(Exception):
+
+    """Raised inside a running build at the next item boundary when newer file changes arrived while watching"""
+    pass
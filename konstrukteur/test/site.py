@@ -0,0 +1,215 @@
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+"""
+Temporary website projects for tests. Konstrukteur runs on top of small stand-ins for
+the Jasy session, main project and profile which only offer what Konstrukteur uses.
+"""
+
+import os
+import shutil
+import tempfile
+
+import konstrukteur.Konstrukteur as Konstrukteur
+
+TEMPLATES = {
+    "Page" : "<html><body><h1>{{title}}</h1>{{=content}}</body></html>",
+    "Post" : "<html><body><h1>{{title}}</h1>{{=content}}</body></html>",
+    "Archive" : "<html><body><h1>{{title}}</h1>{{#posts}}<a href=\"{{relativeUrl}}\">{{title}}</a>{{/posts}}</body></html>"
+}
+
+
+class Item:
+
+    def __init__(self, path):
+        self.__path = path
+
+    def getPath(self):
+        return self.__path
+
+    def getText(self):
+        with open(self.__path, "r", encoding="utf-8") as handle:
+            return handle.read()
+
+
+class Cache:
+
+    def __init__(self):
+        self.data = {}
+
+    def read(self, key):
+        return self.data.get(key)
+
+    def store(self, key, value):
+        self.data[key] = value
+
+
+class Project:
+
+    def __init__(self, root, config):
+        self.root = root
+        self.config = {"konstrukteur" : config}
+        self.cache = Cache()
+        self.revision = "r1"
+
+    def getConfigValue(self, key, default=None):
+        value = self.config
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return default
+
+            value = value[part]
+
+        return value
+
+    def getCache(self):
+        return self.cache
+
+    def getName(self):
+        return "site"
+
+    def getPath(self):
+        return self.root
+
+    def getRevision(self):
+        return self.revision
+
+    def getItems(self, itemType):
+        templatePath = os.path.join(self.root, "source", "template")
+        return dict(("site.%s" % os.path.splitext(fileName)[0], Item(os.path.join(templatePath, fileName))) for fileName in os.listdir(templatePath))
+
+
+class Session:
+
+    def __init__(self, main):
+        self.main = main
+
+    def getMain(self):
+        return self.main
+
+    def getProjects(self):
+        return [self.main]
+
+    def getProjectByName(self, name):
+        return self.main if name == self.main.getName() else None
+
+
+class Profile:
+
+    def __init__(self, session):
+        self.session = session
+        self.id = "profile1"
+        self.commands = []
+
+    def getSession(self):
+        return self.session
+
+    def getDestinationPath(self):
+        return "build"
+
+    def expandFileName(self, fileName):
+        return fileName
+
+    def getId(self):
+        return self.id
+
+    def getHashAssets(self):
+        return False
+
+    def executeCommand(self, command, params):
+        self.commands.append((command, params))
+        return "/%s/%s" % (self.id, "/".join(params)), "url"
+
+
+class Site:
+
+    """
+    Website project inside a temporary folder with the given Konstrukteur @config {Map}.
+    Templates default to {#TEMPLATES} and can be replaced through @templates {Map}.
+    """
+
+    def __init__(self, config=None, templates=None):
+        self.root = tempfile.mkdtemp()
+        self.previousPath = os.getcwd()
+
+        for path in ("page", "post"):
+            os.makedirs(os.path.join(self.root, "source", "content", path))
+
+        os.makedirs(os.path.join(self.root, "source", "template"))
+        for name, text in (templates or TEMPLATES).items():
+            self.writeTemplate(name, text)
+
+        config = dict(config or {})
+        config.setdefault("theme", "site")
+        config.setdefault("sitemap", {"enabled" : False})
+
+        self.project = Project(self.root, config)
+        self.session = Session(self.project)
+        self.profile = Profile(self.session)
+
+
+    def writeTemplate(self, name, text):
+        self.write(os.path.join("source", "template", "%s.html" % name), text)
+
+
+    def writePage(self, fileName, title, body="", **meta):
+        """Writes a HTML page like `about.en.html` with the given @meta {Map} fields."""
+
+        self.write(os.path.join("source", "content", "page", fileName), self.__html(title, body, meta))
+
+
+    def writePost(self, fileName, title, body="", **meta):
+        self.write(os.path.join("source", "content", "post", fileName), self.__html(title, body, meta))
+
+
+    def write(self, relativePath, text):
+        with open(os.path.join(self.root, relativePath), "w", encoding="utf-8") as handle:
+            handle.write(text)
+
+
+    def read(self, relativePath):
+        """Returns the content of the generated file at @relativePath {String} or `None` when missing."""
+
+        fileName = os.path.join(self.root, "build", relativePath)
+        if not os.path.exists(fileName):
+            return None
+
+        with open(fileName, "r", encoding="utf-8") as handle:
+            return handle.read()
+
+
+    def listOutput(self):
+        """Returns the sorted relative file names of all generated files."""
+
+        result = []
+        destination = os.path.join(self.root, "build")
+        for path, dirs, files in os.walk(destination):
+            for fileName in files:
+                result.append(os.path.relpath(os.path.join(path, fileName), destination))
+
+        return sorted(result)
+
+
+    def create(self):
+        """Returns a Konstrukteur instance working on this site, changes into the site folder."""
+
+        os.chdir(self.root)
+        self.previousSession = Konstrukteur.session
+        Konstrukteur.session = self.session
+        return Konstrukteur.Konstrukteur(self.profile)
+
+
+    def close(self):
+        if hasattr(self, "previousSession"):
+            Konstrukteur.session = self.previousSession
+
+        os.chdir(self.previousPath)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+    def __html(self, title, body, meta):
+        fields = "".join(['<meta name="%s" content="%s"/>' % (name, value) for name, value in sorted(meta.items())])
+        return "<html><head><title>%s</title>%s</head><body>%s</body></html>" % (title, fields, body)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.Archive as Archive
+import konstrukteur.test.site as site
+
+
+def createPost(number):
+    return {"id" : "post.%s" % number, "hash" : str(number), "relativeUrl" : "post-%s.html" % number}
+
+
+class Tests(unittest.TestCase):
+
+    def tearDown(self):
+        if hasattr(self, "site"):
+            self.site.close()
+
+    def test_paginate(self):
+
+        posts = [createPost(number) for number in range(5, 0, -1)]
+        pages = Archive.paginate(posts, 2, "Index {{pageno}}", "en")
+
+        self.assertEqual([page["slug"] for page in pages], ["archive-1", "archive-2", "archive-3"])
+        self.assertEqual([page["title"] for page in pages], ["Index 1", "Index 2", "Index 3"])
+        self.assertEqual([[post["id"] for post in page["posts"]] for page in pages], [["post.5", "post.4"], ["post.3", "post.2"], ["post.1"]])
+        self.assertEqual(pages[0]["pagecount"], 3)
+
+    def test_paginate_stable(self):
+
+        posts = [createPost(number) for number in range(1, 6)]
+        pages = Archive.paginate(posts, 2, "Index {{pageno}}", "en", {"latestUrl" : "latest.html"}, stable=True)
+
+        # Anchored at the oldest post, newest first on every page
+        self.assertEqual([[post["id"] for post in page["posts"]] for page in pages], [["post.2", "post.1"], ["post.4", "post.3"], ["post.5"]])
+        self.assertNotIn("pagecount", pages[0])
+        self.assertEqual(pages[0]["latestUrl"], "latest.html")
+
+        # A new post only changes the last page
+        newer = Archive.paginate(posts + [createPost(6)], 2, "Index {{pageno}}", "en", {"latestUrl" : "latest.html"}, stable=True)
+        self.assertEqual([Archive.getSignature(page) for page in newer[:2]], [Archive.getSignature(page) for page in pages[:2]])
+        self.assertNotEqual(Archive.getSignature(newer[2]), Archive.getSignature(pages[2]))
+
+    def test_signature(self):
+
+        page = Archive.paginate([createPost(1), createPost(2)], 10, "Index {{pageno}}", "en")[0]
+        signature = Archive.getSignature(page, "salt")
+
+        self.assertEqual(Archive.getSignature(dict(page), "salt"), signature)
+        self.assertNotEqual(Archive.getSignature(page, "other"), signature)
+        self.assertNotEqual(Archive.getSignature(dict(page, title="Other"), "salt"), signature)
+
+        changed = dict(page, posts=[createPost(1), dict(createPost(2), hash="changed")])
+        self.assertNotEqual(Archive.getSignature(changed, "salt"), signature)
+
+    def createSite(self, template):
+        self.site = site.Site({"blog" : {"taxonomies" : {"tags" : {}}}})
+        self.site.writeTemplate("Archive", template)
+        self.site.writePost("hello.en.html", "Hello", date="2014-01-01", tags="python")
+
+        return self.site.create()
+
+    def test_blog(self):
+
+        self.site = site.Site({
+            "sitemap" : {"enabled" : True},
+            "blog" : {"archiveItemsPerPage" : 2, "archive" : {"stable" : True}}
+        })
+
+        for number in range(1, 4):
+            self.site.writePost("post%s.en.html" % number, "Post %s" % number, date="2014-01-0%s" % number)
+
+        self.site.create().build()
+
+        self.assertIn("Post 1", self.site.read("blog/14-01/post-1.en.html"))
+        self.assertEqual(self.site.read("blog/archive-1.en.html"), "<html><body><h1>Index 1</h1><a href=\"blog/14-01/post-2.en.html\">Post 2</a><a href=\"blog/14-01/post-1.en.html\">Post 1</a></body></html>")
+        self.assertEqual(self.site.read("blog/archive-latest.en.html"), self.site.read("blog/archive-2.en.html"))
+
+        # The alias of the newest archive page is no separate page for search engines
+        sitemap = self.site.read("sitemap.xml")
+        self.assertIn("blog/archive-2.en.html", sitemap)
+        self.assertIn("blog/14-01/post-3.en.html", sitemap)
+        self.assertNotIn("archive-latest", sitemap)
+
+    def test_command_results(self):
+
+        konstrukteur = self.createSite("<img src=\"{{@asset.url logo.png}}\">{{#posts}}{{title}}{{/posts}}")
+        konstrukteur.build()
+        self.assertEqual(self.site.read("blog/tags/python-1.en.html"), "<img src=\"/profile1/logo.png\">Hello")
+
+        # Same templates and posts but different asset URLs
+        self.site.profile.id = "profile2"
+        konstrukteur.build()
+        self.assertEqual(self.site.read("blog/tags/python-1.en.html"), "<img src=\"/profile2/logo.png\">Hello")
+
+    def test_languages(self):
+
+        konstrukteur = self.createSite("{{languages}}")
+        konstrukteur.build()
+        self.assertNotIn("de", self.site.read("blog/tags/python-1.en.html"))
+
+        self.site.writePage("about.de.html", "Ueber")
+        konstrukteur.build()
+        self.assertIn("de", self.site.read("blog/tags/python-1.en.html"))
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, shutil, importlib.machinery, types
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+scriptName = os.path.join(konstrukteurroot, "bin", "konstrukteur")
+
+
+def loadScript(*args):
+    """Loads bin/konstrukteur as a module with the given command line @args {String...} without running it."""
+
+    previousArgv = sys.argv
+    sys.argv = [scriptName] + list(args)
+    try:
+        loader = importlib.machinery.SourceFileLoader("konstrukteurcli", scriptName)
+        module = types.ModuleType(loader.name)
+        module.__file__ = scriptName
+        loader.exec_module(module)
+        return module
+
+    finally:
+        sys.argv = previousArgv
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.previousPath = os.getcwd()
+
+        # The script configures logging when loaded
+        self.previousLevel = logging.getLogger().level
+
+    def tearDown(self):
+        os.chdir(self.previousPath)
+        logging.getLogger().setLevel(self.previousLevel)
+
+    def main(self, *args):
+        """Runs main() of the script with task execution recorded instead of performed."""
+
+        script = loadScript(*args)
+        script.runInProcess = lambda task, params: self.calls.append(("process", task, params)) or 0
+        script.runJasy = lambda task, params: self.calls.append(("jasy", task, params)) or 0
+        self.assertEqual(script.main(), 0)
+        return self.calls[-1]
+
+    def test_build(self):
+        self.assertEqual(self.main(), ("process", "build", {}))
+
+    def test_regenerate(self):
+        self.assertEqual(self.main("-r"), ("process", "build", {"regenerate" : True}))
+
+    def test_serve(self):
+        self.assertEqual(self.main("serve", "--port=9000"), ("process", "serve", {"port" : "9000"}))
+
+    def test_create(self):
+        self.assertEqual(self.main("create", "--name=site"), ("jasy", "create", {
+            "name" : "site",
+            "origin" : "https://github.com/fastner/konstrukteur.git",
+            "skeleton" : "website"
+        }))
+
+    def test_in_process(self):
+        script = loadScript("--fast")
+        executed = []
+
+        class Task:
+            @staticmethod
+            def executeTask(task, **params):
+                executed.append((os.getpid(), task, params))
+
+        script.init = lambda: None
+        script.Task = Task
+
+        self.assertEqual(script.runInProcess("build", {"regenerate" : True}), 0)
+        self.assertEqual(executed, [(os.getpid(), "build", {"regenerate" : True})])
+
+    def test_find_jasyscript(self):
+        root = os.path.realpath(tempfile.mkdtemp())
+        try:
+            os.makedirs(os.path.join(root, "source", "content"))
+            with open(os.path.join(root, "jasyscript.py"), "w") as handle:
+                handle.write("")
+
+            script = loadScript()
+            os.chdir(os.path.join(root, "source", "content"))
+            self.assertEqual(script.findJasyscript(), os.path.join(root, "jasyscript.py"))
+
+        finally:
+            os.chdir(self.previousPath)
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur
+import konstrukteur.CollectionIndex as CollectionIndex
+import konstrukteur.test.site as site
+
+
+def createItem(id, language, date, status="published"):
+    return {"id" : id, "language" : language, "date" : date, "status" : status}
+
+
+def ids(items):
+    return [item["id"] for item in items]
+
+
+class Tests(unittest.TestCase):
+
+    def createIndex(self):
+        return CollectionIndex.CollectionIndex(lambda item: item["date"], [
+            createItem("post.c", "en", 3),
+            createItem("post.a", "en", 1),
+            createItem("post.b", "en", 2, "draft"),
+            createItem("post.a", "de", 1),
+            createItem("post.c", "de", 3)
+        ])
+
+    def test_sorted(self):
+
+        index = self.createIndex()
+        self.assertEqual(ids(index.get("en")), ["post.a", "post.b", "post.c"])
+        self.assertEqual(ids(index.get("en", "published")), ["post.a", "post.c"])
+        self.assertEqual(ids(index.select("en", exclude=["draft"])), ["post.a", "post.c"])
+        self.assertEqual(ids(index.select("en", ["draft", "published"])), ["post.a", "post.b", "post.c"])
+
+    def test_translations(self):
+
+        index = self.createIndex()
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.getLanguages(), set(["en", "de"]))
+        self.assertEqual(ids(index.get("de")), ["post.a", "post.c"])
+        self.assertEqual([item["language"] for item in index.get("de")], ["de", "de"])
+        self.assertIn(createItem("post.a", "de", 1), index)
+        self.assertNotIn(createItem("post.b", "de", 2), index)
+
+    def test_remove_translation(self):
+
+        index = self.createIndex()
+        self.assertTrue(index.remove(createItem("post.a", "de", 1)))
+        self.assertFalse(index.remove(createItem("post.a", "de", 1)))
+
+        self.assertEqual(ids(index.get("de")), ["post.c"])
+        self.assertEqual(ids(index.get("en")), ["post.a", "post.b", "post.c"])
+
+    def test_update(self):
+
+        index = self.createIndex()
+        item = index.get("de")[0]
+        item["date"] = 4
+        index.update(item)
+
+        self.assertEqual(ids(index.get("de")), ["post.c", "post.a"])
+        self.assertEqual(ids(index.get("en")), ["post.a", "post.b", "post.c"])
+
+    def test_neighbors(self):
+
+        index = self.createIndex()
+        item = index.get("en")[1]
+
+        self.assertEqual(index.getPosition(item), 1)
+        self.assertEqual(index.getPosition(item, "published"), -1)
+        self.assertEqual(ids(index.getNeighbors(item)), ["post.a", "post.c"])
+
+        previous, following = index.getNeighbors(index.get("de")[0])
+        self.assertIsNone(previous)
+        self.assertEqual((following["id"], following["language"]), ("post.c", "de"))
+
+    def test_translated_pages(self):
+
+        website = site.Site()
+        try:
+            website.writePage("about.en.html", "About", slug="about")
+            website.writePage("about.de.html", "Ueber", slug="about")
+            website.create().build()
+
+            self.assertIn("About", website.read("about.en.html"))
+            self.assertIn("Ueber", website.read("about.de.html"))
+        finally:
+            website.close()
+
+    def test_post_without_date(self):
+
+        website = site.Site()
+        try:
+            website.writePost("hello.en.html", "Hello")
+
+            with self.assertRaises(konstrukteur.UserError) as context:
+                website.create().build()
+
+            self.assertIn("hello.en.html", str(context.exception))
+        finally:
+            website.close()
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
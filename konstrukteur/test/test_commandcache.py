@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, shutil
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.CommandCache as CommandCache
+
+
+class FakeAsset:
+
+    def __init__(self, path):
+        self.path = path
+
+    def getPath(self):
+        return self.path
+
+
+class FakeProject:
+
+    def __init__(self):
+        self.revision = "r1"
+        self.assets = {}
+
+    def getRevision(self):
+        return self.revision
+
+    def getAssets(self):
+        return self.assets
+
+
+class FakeSession:
+
+    def __init__(self):
+        self.main = FakeProject()
+
+    def getMain(self):
+        return self.main
+
+    def getProjects(self):
+        return [self.main]
+
+
+class FakeProfile:
+
+    def __init__(self):
+        self.session = FakeSession()
+        self.id = "p1"
+        self.hashAssets = True
+        self.calls = []
+
+    def getSession(self):
+        return self.session
+
+    def getId(self):
+        return self.id
+
+    def getHashAssets(self):
+        return self.hashAssets
+
+    def executeCommand(self, command, params):
+        self.calls.append((command, params))
+        return "%s:%s@%s" % (command, ",".join(params), self.id), "url"
+
+
+class Tests(unittest.TestCase):
+
+    def test_execute_once(self):
+
+        profile = FakeProfile()
+        cache = CommandCache.CommandCache(profile)
+
+        self.assertEqual(cache.execute("asset.url logo.png"), "asset.url:logo.png@p1")
+        self.assertEqual(cache.execute("asset.url logo.png"), "asset.url:logo.png@p1")
+        self.assertEqual(len(profile.calls), 1)
+
+    def test_expand(self):
+
+        cache = CommandCache.CommandCache(FakeProfile())
+        self.assertEqual(cache.expand('<img src="{{@asset.url logo.png}}"> {{title}}'), '<img src="asset.url:logo.png@p1"> {{title}}')
+
+    def test_profile_change(self):
+
+        profile = FakeProfile()
+        cache = CommandCache.CommandCache(profile)
+        cache.execute("asset.url logo.png")
+
+        profile.id = "p2"
+        self.assertEqual(cache.execute("asset.url logo.png"), "asset.url:logo.png@p2")
+        self.assertEqual(len(profile.calls), 2)
+
+    def test_revision_change(self):
+
+        profile = FakeProfile()
+        cache = CommandCache.CommandCache(profile)
+        cache.execute("asset.url logo.png")
+        fingerprint = cache.getFingerprint()
+
+        # Revision is only read again when refreshed
+        profile.session.main.revision = "r2"
+        self.assertEqual(cache.getFingerprint(), fingerprint)
+
+        cache.refresh()
+        self.assertNotEqual(cache.getFingerprint(), fingerprint)
+
+        cache.execute("asset.url logo.png")
+        self.assertEqual(len(profile.calls), 2)
+
+    def test_asset_change(self):
+
+        path = tempfile.mkdtemp()
+        try:
+            fileName = os.path.join(path, "logo.png")
+            with open(fileName, "wb") as handle:
+                handle.write(b"logo")
+
+            profile = FakeProfile()
+            profile.session.main.assets["site/logo.png"] = FakeAsset(fileName)
+            cache = CommandCache.CommandCache(profile)
+            cache.execute("asset.url logo.png")
+            fingerprint = cache.getFingerprint()
+
+            # Hashed asset URLs change with the content
+            with open(fileName, "wb") as handle:
+                handle.write(b"new logo")
+
+            cache.refresh()
+            self.assertNotEqual(cache.getFingerprint(), fingerprint)
+
+            cache.execute("asset.url logo.png")
+            self.assertEqual(len(profile.calls), 2)
+
+            # Without hashing assets do not influence the results
+            profile.hashAssets = False
+            cache.refresh()
+            fingerprint = cache.getFingerprint()
+            with open(fileName, "wb") as handle:
+                handle.write(b"newest logo")
+
+            cache.refresh()
+            self.assertEqual(cache.getFingerprint(), fingerprint)
+
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
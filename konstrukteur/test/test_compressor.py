@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, shutil, gzip
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.OutputWriter as OutputWriter
+import konstrukteur.Compressor as Compressor
+
+CONTENT = "<html><body>%s</body></html>" % ("Konstrukteur " * 100)
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.fileName = os.path.join(self.path, "index.html")
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def build(self, content=CONTENT, state=None, keep=False, **options):
+        writer = OutputWriter.OutputWriter(state=state)
+        writer.addStage(Compressor.Compressor(**options).process)
+
+        if keep:
+            self.assertTrue(writer.keep(self.fileName))
+        else:
+            writer.write(self.fileName, content)
+
+        writer.close()
+        return writer
+
+    def sidecar(self):
+        with gzip.open(self.fileName + ".gz", "rb") as handle:
+            return handle.read().decode("utf-8")
+
+    def test_compress(self):
+
+        writer = self.build()
+        self.assertEqual(self.sidecar(), CONTENT)
+        self.assertIn(self.fileName + ".gz", writer.getChanges())
+
+    def test_min_size(self):
+
+        self.build("<html></html>")
+        self.assertFalse(os.path.exists(self.fileName + ".gz"))
+
+    def test_shrunk(self):
+
+        state = self.build().getState()
+        self.build("<html></html>", state=state)
+        self.assertFalse(os.path.exists(self.fileName + ".gz"))
+
+    def test_skip_unchanged(self):
+
+        state = self.build().getState()
+        writer = self.build(state=state)
+        self.assertEqual(writer.getChanges(), {})
+
+        writer = self.build(CONTENT + "!", state=writer.getState())
+        self.assertEqual(sorted(writer.getChanges()), [self.fileName, self.fileName + ".gz"])
+        self.assertEqual(self.sidecar(), CONTENT + "!")
+
+    def test_level_change(self):
+
+        state = self.build(level=1).getState()
+        writer = self.build(state=state, level=9)
+
+        # The original is unchanged, the sidecar is compressed again
+        self.assertEqual(writer.getChanges(), {self.fileName + ".gz" : "modified"})
+
+    def test_missing_sidecar(self):
+
+        state = self.build().getState()
+        os.remove(self.fileName + ".gz")
+
+        writer = self.build(state=state)
+        self.assertEqual(writer.getChanges(), {self.fileName + ".gz" : "created"})
+
+    def test_keep(self):
+
+        state = self.build().getState()
+        state = self.build(state=state, keep=True).getState()
+
+        # Sidecars of kept files remain known to the next build
+        writer = self.build(state=state)
+        self.assertEqual(writer.getChanges(), {})
+
+    def test_disabled_codec(self):
+
+        with open(self.fileName + ".br", "wb") as handle:
+            handle.write(b"outdated")
+
+        self.build(codecs=["gzip"])
+        self.assertFalse(os.path.exists(self.fileName + ".br"))
+
+    @unittest.skipIf(Compressor.brotli is None, "brotli is not installed")
+    def test_codec_change(self):
+
+        state = self.build(codecs=["gzip"]).getState()
+        writer = self.build(state=state, codecs=["gzip", "brotli"])
+        self.assertEqual(writer.getChanges(), {self.fileName + ".br" : "created"})
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, shutil, http.client
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.DevServer as DevServer
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.realpath(tempfile.mkdtemp())
+        self.rendered = {}
+        self.requested = []
+
+        for folder in ("blog", "empty"):
+            os.makedirs(os.path.join(self.path, folder))
+
+        self.write("index.html", "<html><body>home</body></html>")
+        self.write("blog/index.html", "<html><body>old blog</body></html>")
+        self.write("style.css", "body{}")
+
+        self.server = DevServer.DevServer(self.path, self.render, port=0)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def write(self, relativePath, text):
+        with open(os.path.join(self.path, relativePath), "w", encoding="utf-8") as handle:
+            handle.write(text)
+
+    def render(self, relativePath):
+        self.requested.append(relativePath)
+        return self.rendered.get(relativePath)
+
+    def get(self, path):
+        port = int(self.server.getUrl().rstrip("/").rsplit(":", 1)[1])
+        connection = http.client.HTTPConnection("localhost", port, timeout=5)
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            return response.status, response.getheader("Location"), response.read().decode("utf-8")
+        finally:
+            connection.close()
+
+    def test_inject(self):
+        self.assertEqual(DevServer.injectReloadScript(b"<p>x</p></BODY>"), b"<p>x</p>" + DevServer.RELOAD_SCRIPT + b"</BODY>")
+        self.assertEqual(DevServer.injectReloadScript(b"<p>x</p>"), b"<p>x</p>" + DevServer.RELOAD_SCRIPT)
+
+    def test_resolve(self):
+        self.assertEqual(DevServer.resolvePath(self.path, "/blog/index.html?x=1"), os.path.join(self.path, "blog", "index.html"))
+        self.assertEqual(DevServer.resolvePath(self.path, "/"), self.path)
+        self.assertIsNone(DevServer.resolvePath(self.path, "/../secret"))
+
+    def test_file(self):
+        status, location, body = self.get("/blog/index.html")
+        self.assertEqual(status, 200)
+        self.assertIn("old blog", body)
+        self.assertIn(DevServer.EVENTS_PATH, body)
+
+    def test_rendered(self):
+        self.rendered["blog/index.html"] = "<html><body>new blog</body></html>"
+
+        status, location, body = self.get("/blog/index.html")
+        self.assertIn("new blog", body)
+        self.assertIn(DevServer.EVENTS_PATH, body)
+
+    def test_root_index(self):
+        status, location, body = self.get("/")
+        self.assertEqual(status, 200)
+        self.assertIn("home", body)
+        self.assertIn(DevServer.EVENTS_PATH, body)
+        self.assertEqual(self.requested, ["index.html"])
+
+    def test_directory_index_rendered(self):
+        self.rendered["blog/index.html"] = "<html><body>new blog</body></html>"
+
+        status, location, body = self.get("/blog/")
+        self.assertEqual(status, 200)
+        self.assertIn("new blog", body)
+        self.assertIn(DevServer.EVENTS_PATH, body)
+
+    def test_directory_index_in_memory(self):
+        self.rendered["news/index.html"] = "<html><body>news</body></html>"
+
+        status, location, body = self.get("/news/")
+        self.assertEqual(status, 200)
+        self.assertIn("news", body)
+        self.assertIn(DevServer.EVENTS_PATH, body)
+
+    def test_directory_redirect(self):
+        status, location, body = self.get("/blog")
+        self.assertEqual(status, 301)
+        self.assertTrue(location.endswith("/blog/"))
+
+    def test_directory_listing(self):
+        status, location, body = self.get("/empty/")
+        self.assertEqual(status, 200)
+        self.assertNotIn(DevServer.EVENTS_PATH, body)
+
+    def test_static(self):
+        status, location, body = self.get("/style.css")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, "body{}")
+
+    def test_outside(self):
+        status, location, body = self.get("/../../etc/passwd")
+        self.assertIn(status, (403, 404))
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
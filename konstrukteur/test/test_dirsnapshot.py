@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, shutil, time
+
+# Extend PYTHONPATH with local Konstrukteur folder and the bundled watchdog library
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+sys.path.insert(0, os.path.join(konstrukteurroot, "konstrukteurlibs", "watchdog", "src"))
+
+from watchdog.utils.dirsnapshot import DirectorySnapshot, DirectorySnapshotDiff, RACY_INTERVAL
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.realpath(tempfile.mkdtemp())
+        os.makedirs(os.path.join(self.path, "content", "post"))
+        self.write("content/page.html", "page")
+        self.write("content/post/first.html", "first")
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def join(self, relativePath):
+        return os.path.join(self.path, *relativePath.split("/"))
+
+    def write(self, relativePath, text):
+        with open(self.join(relativePath), "w") as handle:
+            handle.write(text)
+
+    def diff(self, change):
+        ref = DirectorySnapshot(self.path)
+        change()
+        return DirectorySnapshotDiff(ref, DirectorySnapshot(self.path))
+
+    def relative(self, paths):
+        return [os.path.relpath(path, self.path) if isinstance(path, str) else tuple(self.relative(path)) for path in paths]
+
+    def test_snapshot(self):
+        snapshot = DirectorySnapshot(self.path)
+
+        self.assertEqual(self.relative(snapshot.paths), [".", "content", "content/page.html", "content/post", "content/post/first.html"])
+        self.assertEqual(len(snapshot), 5)
+        self.assertIn(self.join("content/page.html"), snapshot)
+        self.assertNotIn(self.join("content/missing.html"), snapshot)
+
+        info = snapshot.stat_info(self.join("content/page.html"))
+        self.assertEqual(info.st_size, 4)
+        self.assertEqual(info.st_ino, os.stat(self.join("content/page.html")).st_ino)
+        self.assertEqual(snapshot.path_for_inode(info.st_ino), self.join("content/page.html"))
+        self.assertTrue(snapshot.has_inode(info.st_ino))
+
+    def test_non_recursive(self):
+        snapshot = DirectorySnapshot(os.path.join(self.path, "content"), recursive=False)
+        self.assertEqual(self.relative(snapshot.paths), ["content", "content/page.html", "content/post"])
+
+    def test_unchanged(self):
+        diff = self.diff(lambda: None)
+
+        for name in ("files_created", "files_deleted", "files_modified", "files_moved", "dirs_created", "dirs_deleted", "dirs_modified", "dirs_moved"):
+            self.assertEqual(getattr(diff, name), [], name)
+
+    def test_created(self):
+        def change():
+            os.makedirs(self.join("content/news"))
+            self.write("content/news/today.html", "today")
+
+        diff = self.diff(change)
+        self.assertEqual(self.relative(diff.files_created), ["content/news/today.html"])
+        self.assertEqual(self.relative(diff.dirs_created), ["content/news"])
+        self.assertEqual(self.relative(diff.dirs_modified), ["content"])
+
+    def test_deleted(self):
+        def change():
+            os.remove(self.join("content/page.html"))
+            shutil.rmtree(self.join("content/post"))
+
+        diff = self.diff(change)
+        self.assertEqual(self.relative(diff.files_deleted), ["content/page.html", "content/post/first.html"])
+        self.assertEqual(self.relative(diff.dirs_deleted), ["content/post"])
+
+    def test_modified(self):
+        diff = self.diff(lambda: self.write("content/page.html", "changed page"))
+        self.assertEqual(self.relative(diff.files_modified), ["content/page.html"])
+        self.assertEqual(diff.files_created, [])
+
+    def test_moved(self):
+        def change():
+            os.rename(self.join("content/page.html"), self.join("content/post/page.html"))
+            os.rename(self.join("content/post"), self.join("content/blog"))
+
+        diff = self.diff(change)
+        self.assertEqual(self.relative(diff.files_moved), [("content/post/first.html", "content/blog/first.html"), ("content/page.html", "content/blog/page.html")])
+        self.assertEqual(self.relative(diff.dirs_moved), [("content/post", "content/blog")])
+        self.assertEqual(diff.files_created, [])
+        self.assertEqual(diff.files_deleted, [])
+
+    def test_replaced(self):
+        def change():
+            self.write("content/draft.html", "draft")
+            os.rename(self.join("content/draft.html"), self.join("content/page.html"))
+
+        diff = self.diff(change)
+        self.assertEqual(diff.files_moved, [])
+        self.assertEqual(self.relative(diff.files_deleted), ["content/page.html"])
+        self.assertEqual(self.relative(diff.files_created), ["content/page.html"])
+
+    def test_incremental(self):
+        past = time.time() - RACY_INTERVAL - 10
+        for relativePath in ("", "content", "content/post"):
+            os.utime(self.join(relativePath), (past, past))
+
+        previous = DirectorySnapshot(self.path)
+
+        self.write("content/page.html", "changed page")
+        self.write("content/post/second.html", "second")
+
+        incremental = DirectorySnapshot(self.path, previous=previous)
+        full = DirectorySnapshot(self.path)
+
+        self.assertEqual(incremental.paths, full.paths)
+        for path in full.paths:
+            self.assertEqual(incremental.stat_info(path), full.stat_info(path))
+
+        diff = DirectorySnapshotDiff(previous, incremental)
+        self.assertEqual(self.relative(diff.files_modified), ["content/page.html"])
+        self.assertEqual(self.relative(diff.files_created), ["content/post/second.html"])
+
+    def test_incremental_reuses_listing(self):
+        past = time.time() - RACY_INTERVAL - 10
+        os.utime(self.join("content"), (past, past))
+        previous = DirectorySnapshot(self.path)
+
+        # Restoring the folder time hides the new entry from an incremental snapshot
+        self.write("content/hidden.html", "hidden")
+        os.utime(self.join("content"), (past, past))
+
+        self.assertNotIn(self.join("content/hidden.html"), DirectorySnapshot(self.path, previous=previous))
+        self.assertIn(self.join("content/hidden.html"), DirectorySnapshot(self.path))
+
+    def test_incremental_racy(self):
+        previous = DirectorySnapshot(self.path)
+
+        # Folders changed shortly before the previous snapshot are always listed again
+        self.write("content/fresh.html", "fresh")
+        os.utime(self.join("content"), ns=(previous.stat_info(self.join("content")).st_mtime_ns,) * 2)
+
+        self.assertIn(self.join("content/fresh.html"), DirectorySnapshot(self.path, previous=previous))
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local Konstrukteur folder and the bundled watchdog library
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+sys.path.insert(0, os.path.join(konstrukteurroot, "konstrukteurlibs", "watchdog", "src"))
+
+import watchdog.events as events
+
+try:
+    import watchdog.observers.inotify_c as inotify_c
+except ImportError:
+    inotify_c = None
+
+EVENT_CLASSES = [
+    events.FileCreatedEvent, events.FileModifiedEvent, events.FileDeletedEvent,
+    events.DirCreatedEvent, events.DirModifiedEvent, events.DirDeletedEvent
+]
+
+MOVED_EVENT_CLASSES = [events.FileMovedEvent, events.DirMovedEvent]
+
+
+class Tests(unittest.TestCase):
+
+    def createEvents(self):
+        return [eventClass("/site/a") for eventClass in EVENT_CLASSES] + [eventClass("/site/a", "/site/b") for eventClass in MOVED_EVENT_CLASSES]
+
+    def test_slots(self):
+
+        for event in self.createEvents():
+            self.assertFalse(hasattr(event, "__dict__"), event)
+
+            with self.assertRaises(AttributeError):
+                event.custom = True
+
+    def test_properties(self):
+
+        event = events.DirMovedEvent("/site/a", "/site/b")
+        self.assertEqual((event.event_type, event.src_path, event.dest_path, event.is_directory), (events.EVENT_TYPE_MOVED, "/site/a", "/site/b", True))
+        self.assertEqual(event.key, (events.EVENT_TYPE_MOVED, "/site/a", "/site/b", True))
+
+        event = events.FileCreatedEvent("/site/a")
+        self.assertEqual(event.key, (events.EVENT_TYPE_CREATED, "/site/a", False))
+
+    def test_equality(self):
+
+        self.assertEqual(events.FileModifiedEvent("/site/a"), events.FileModifiedEvent("/site/a"))
+        self.assertNotEqual(events.FileModifiedEvent("/site/a"), events.FileModifiedEvent("/site/b"))
+        self.assertNotEqual(events.FileModifiedEvent("/site/a"), events.DirModifiedEvent("/site/a"))
+
+        # Events can be used as keys
+        self.assertEqual(len(set(self.createEvents() + self.createEvents())), len(EVENT_CLASSES) + len(MOVED_EVENT_CLASSES))
+
+    @unittest.skipIf(inotify_c is None, "inotify is not available")
+    def test_inotify_event(self):
+
+        event = inotify_c.InotifyEvent(1, inotify_c.InotifyConstants.IN_CREATE, 0, b"a", b"/site/a")
+        same = inotify_c.InotifyEvent(1, inotify_c.InotifyConstants.IN_CREATE, 0, b"a", b"/site/a")
+        other = inotify_c.InotifyEvent(1, inotify_c.InotifyConstants.IN_DELETE, 0, b"a", b"/site/a")
+
+        self.assertFalse(hasattr(event, "__dict__"))
+        self.assertTrue(event == same)
+        self.assertFalse(event != same)
+        self.assertTrue(event != other)
+        self.assertEqual(hash(event), hash(same))
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
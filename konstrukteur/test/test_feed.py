@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, datetime
+import xml.etree.ElementTree as ElementTree
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.Feed as Feed
+import konstrukteur.test.site as site
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+class Writer:
+
+    def __init__(self, existing=()):
+        self.files = {}
+        self.existing = existing
+
+    def write(self, fileName, content):
+        self.files[fileName] = content
+
+    def keep(self, fileName):
+        return fileName in self.existing
+
+
+def createPost(id, day, **fields):
+    post = {"id" : id, "language" : "en", "hash" : id, "title" : id.title(), "mtime" : 0}
+    if day:
+        post["date"] = datetime.datetime(2014, 1, day, tzinfo=datetime.timezone.utc)
+
+    post.update(fields)
+    return post
+
+
+class Tests(unittest.TestCase):
+
+    def parse(self, content):
+        return ElementTree.fromstring(content.encode("utf-8"))
+
+    def test_render(self):
+
+        feed = Feed.Feed(Writer(), "http://example.com", "Example", "Jane")
+        root = self.parse(feed.render("feed.en.xml", [(createPost("b", 2), "b.html"), (createPost("a", 1, summary="<A>"), "a.html")]))
+
+        self.assertEqual(root.find(ATOM + "id").text, "http://example.com/feed.en.xml")
+        self.assertEqual(root.find(ATOM + "updated").text, "2014-01-02T00:00:00+00:00")
+        self.assertEqual(root.find(ATOM + "author/" + ATOM + "name").text, "Jane")
+
+        entries = root.findall(ATOM + "entry")
+        self.assertEqual([entry.find(ATOM + "id").text for entry in entries], ["http://example.com/b.html", "http://example.com/a.html"])
+        self.assertEqual(entries[1].find(ATOM + "summary").text, "<A>")
+
+    def test_language_ids(self):
+
+        feed = Feed.Feed(Writer(), "http://example.com/", "Example")
+        english = self.parse(feed.render("feed.en.xml", [(createPost("a", 1), "a.html")]))
+        german = self.parse(feed.render("feed.de.xml", [(createPost("a", 1, language="de"), "a.de.html")]))
+
+        self.assertNotEqual(english.find(ATOM + "id").text, german.find(ATOM + "id").text)
+
+    def test_required_elements(self):
+
+        # Without default author and post date
+        feed = Feed.Feed(Writer(), "http://example.com", "Example")
+        root = self.parse(feed.render("feed.en.xml", [(createPost("a", None, mtime=86400), "a.html")]))
+
+        self.assertEqual(root.find(ATOM + "author/" + ATOM + "name").text, "Example")
+        self.assertEqual(root.find(ATOM + "updated").text, "1970-01-02T00:00:00+00:00")
+        self.assertEqual(root.find(ATOM + "entry/" + ATOM + "updated").text, "1970-01-02T00:00:00+00:00")
+
+    def test_unchanged(self):
+
+        feeds = [("build/feed.en.xml", "feed.en.xml", [(createPost("a", 1), "a.html")])]
+
+        feed = Feed.Feed(Writer(), "http://example.com", "Example")
+        feed.generate(feeds)
+
+        writer = Writer(["build/feed.en.xml"])
+        Feed.Feed(writer, "http://example.com", "Example", state=feed.getState()).generate(feeds)
+        self.assertEqual(writer.files, {})
+
+        # Changed template or settings
+        Feed.Feed(writer, "http://example.com", "Example", state=feed.getState(), salt="other").generate(feeds)
+        self.assertEqual(list(writer.files), ["build/feed.en.xml"])
+
+    def test_theme_template(self):
+
+        website = site.Site()
+        try:
+            website.writeTemplate("Feed", "<feed><id>{{feedUrl}}</id><t>{{site.name}}</t>{{#posts}}<e>{{absoluteUrl}} {{title}}</e>{{/posts}}</feed>")
+            website.writePost("hello.en.html", "Hello", date="2014-01-01")
+            website.create().build()
+
+            content = website.read("feed.en.xml")
+            self.assertIn("<id>http://localhost/feed.en.xml</id>", content)
+            self.assertIn("<t>Test website</t>", content)
+            self.assertIn("<e>http://localhost/blog/14-01/hello.en.html Hello</e>", content)
+        finally:
+            website.close()
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, time, threading
+
+# Extend PYTHONPATH with local Konstrukteur folder and the bundled watchdog library
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+sys.path.insert(0, os.path.join(konstrukteurroot, "konstrukteurlibs", "watchdog", "src"))
+
+import watchdog.events
+import watchdog.observers.api
+
+import konstrukteur.FileWatcher as FileWatcher
+
+CREATED = FileWatcher.CREATED
+MODIFIED = FileWatcher.MODIFIED
+DELETED = FileWatcher.DELETED
+
+
+class Tests(unittest.TestCase):
+
+    def test_merge_kind(self):
+
+        self.assertEqual(FileWatcher.mergeKind(None, MODIFIED), MODIFIED)
+        self.assertEqual(FileWatcher.mergeKind(CREATED, MODIFIED), CREATED)
+        self.assertEqual(FileWatcher.mergeKind(CREATED, DELETED), None)
+        self.assertEqual(FileWatcher.mergeKind(DELETED, CREATED), MODIFIED)
+        self.assertEqual(FileWatcher.mergeKind(DELETED, DELETED), DELETED)
+        self.assertEqual(FileWatcher.mergeKind(MODIFIED, DELETED), DELETED)
+
+    def test_merge_changes(self):
+
+        changes = {"a" : CREATED, "b" : MODIFIED, "c" : DELETED}
+        result = FileWatcher.mergeChanges(changes, {"a" : DELETED, "b" : MODIFIED, "c" : CREATED, "d" : CREATED})
+
+        self.assertIs(result, changes)
+        self.assertEqual(changes, {"b" : MODIFIED, "c" : MODIFIED, "d" : CREATED})
+
+    def test_collector_batch(self):
+
+        collector = FileWatcher.ChangeCollector(debounce=0.05)
+        collector.add("a", CREATED)
+        collector.add("a", MODIFIED)
+        collector.add("b", CREATED)
+        collector.add("b", DELETED)
+
+        self.assertEqual(collector.pending(), 1)
+        self.assertEqual(collector.wait(1.0), {"a" : CREATED})
+        self.assertEqual(collector.pending(), 0)
+        self.assertIsNone(collector.wait(0.05))
+
+    def test_collector_debounce(self):
+
+        collector = FileWatcher.ChangeCollector(debounce=0.2, maxDelay=5.0)
+
+        def addLater():
+            time.sleep(0.1)
+            collector.add("b", MODIFIED)
+
+        collector.add("a", MODIFIED)
+        thread = threading.Thread(target=addLater)
+        thread.start()
+
+        # The second change arrives within the debounce time and joins the batch
+        self.assertEqual(collector.wait(2.0), {"a" : MODIFIED, "b" : MODIFIED})
+        thread.join()
+
+    def test_collector_max_delay(self):
+
+        collector = FileWatcher.ChangeCollector(debounce=0.2, maxDelay=0.3)
+        stop = threading.Event()
+
+        def addContinuously():
+            while not stop.is_set():
+                collector.add("a", MODIFIED)
+                time.sleep(0.02)
+
+        thread = threading.Thread(target=addContinuously)
+        thread.start()
+
+        try:
+            started = time.time()
+            self.assertEqual(collector.wait(5.0), {"a" : MODIFIED})
+            self.assertLess(time.time() - started, 1.0)
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_collector_close(self):
+
+        collector = FileWatcher.ChangeCollector()
+        collector.add("a", MODIFIED)
+        collector.close()
+
+        self.assertIsNone(collector.wait())
+
+    def test_handler(self):
+
+        collector = FileWatcher.ChangeCollector(debounce=0)
+        handler = FileWatcher.FileChangeEventHandler(collector)
+
+        handler.dispatch(watchdog.events.FileCreatedEvent("/site/new.html"))
+        handler.dispatch(watchdog.events.FileModifiedEvent(b"/site/changed.html"))
+        handler.dispatch(watchdog.events.FileMovedEvent("/site/old.html", "/site/moved.html"))
+        handler.dispatch(watchdog.events.FileDeletedEvent("/site/deleted.html"))
+        handler.dispatch(watchdog.events.DirModifiedEvent("/site"))
+
+        self.assertEqual(collector.wait(1.0), {
+            "/site/new.html" : CREATED,
+            "/site/changed.html" : MODIFIED,
+            "/site/old.html" : DELETED,
+            "/site/moved.html" : CREATED,
+            "/site/deleted.html" : DELETED
+        })
+
+    def test_ignore_patterns(self):
+
+        collector = FileWatcher.ChangeCollector(debounce=0)
+        handler = FileWatcher.FileChangeEventHandler(collector, ignorePatterns=FileWatcher.getIgnorePatterns(["build"]))
+
+        for path in ("/site/.page.html.swp", "/site/page.html~", "/site/4913", "/site/.git/index", "/site/.#page.html", os.path.abspath("build/index.html")):
+            self.assertFalse(handler.match_event(watchdog.events.FileModifiedEvent(path)), path)
+            handler.dispatch(watchdog.events.FileModifiedEvent(path))
+
+        self.assertTrue(handler.match_event(watchdog.events.FileModifiedEvent("/site/page.html")))
+        self.assertEqual(collector.pending(), 0)
+
+        # Moves are handled as soon as one of both paths is not ignored, e.g. editors saving through a backup file
+        handler.dispatch(watchdog.events.FileMovedEvent("/site/page.html~", "/site/page.html"))
+        self.assertEqual(collector.wait(1.0), {"/site/page.html~" : DELETED, "/site/page.html" : CREATED})
+
+    def test_patterns(self):
+
+        handler = FileWatcher.FileChangeEventHandler(FileWatcher.ChangeCollector(), patterns=["*.html"])
+        self.assertTrue(handler.match_event(watchdog.events.FileCreatedEvent("/site/page.html")))
+        self.assertFalse(handler.match_event(watchdog.events.FileCreatedEvent("/site/page.css")))
+
+    def test_event_filter(self):
+
+        queue = watchdog.observers.api.EventQueue()
+        watch = watchdog.observers.api.ObservedWatch("/site", True)
+        emitter = watchdog.observers.api.EventEmitter(queue, watch)
+
+        handler = FileWatcher.FileChangeEventHandler(FileWatcher.ChangeCollector(), ignorePatterns=FileWatcher.IGNORE_PATTERNS)
+        emitter.set_event_filter(handler.match_event)
+
+        # Ignored events never reach the queue
+        emitter.queue_event(watchdog.events.FileModifiedEvent("/site/page.html.swp"))
+        emitter.queue_event(watchdog.events.FileModifiedEvent("/site/page.html"))
+
+        event, eventWatch = queue.get_nowait()
+        self.assertEqual(event.src_path, "/site/page.html")
+        self.assertTrue(queue.empty())
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.HtmlBeautifier as HtmlBeautifier
+
+
+class Tests(unittest.TestCase):
+
+    def test_tokenize(self):
+
+        tokens = list(HtmlBeautifier.tokenize("<!DOCTYPE html><p class='a'>Hi<br/></p><!-- x -->"))
+        self.assertEqual([(kind, name) for kind, name, text in tokens], [
+            ("doctype", "!doctype"), ("open", "p"), ("text", None), ("open", "br"), ("close", "p"), ("comment", None)
+        ])
+
+    def test_tokenize_raw(self):
+
+        tokens = list(HtmlBeautifier.tokenize("<script>if (a<b) {}</SCRIPT><p>"))
+        self.assertEqual(tokens, [("raw", "script", "<script>if (a<b) {}</SCRIPT>"), ("open", "p", "<p>")])
+
+    def test_minify(self):
+
+        self.assertEqual(HtmlBeautifier.minify("<div>\n  <p  class=\"a  b\" >Hello\n   World</p>\n</div>"), "<div><p class=\"a  b\">Hello World</p></div>")
+
+    def test_minify_inline(self):
+
+        # White space between inline elements is significant
+        self.assertEqual(HtmlBeautifier.minify("<p><b>Hello</b>  <i>World</i></p>"), "<p><b>Hello</b> <i>World</i></p>")
+
+    def test_minify_self_closing(self):
+
+        self.assertEqual(HtmlBeautifier.minify("<br  />"), "<br/>")
+        self.assertEqual(HtmlBeautifier.minify("<img src=\"a.png\"  />"), "<img src=\"a.png\"/>")
+
+        # The slash must not become part of unquoted attribute values
+        self.assertEqual(HtmlBeautifier.minify("<input type=text value=x />"), "<input type=text value=x />")
+
+    def test_minify_comments(self):
+
+        self.assertEqual(HtmlBeautifier.minify("<p>a<!-- comment -->b</p>"), "<p>ab</p>")
+        self.assertEqual(HtmlBeautifier.minify("<!--[if IE]><p><![endif]-->"), "<!--[if IE]><p><![endif]-->")
+
+    def test_minify_raw(self):
+
+        html = "<pre>  keep\n   this  </pre>"
+        self.assertEqual(HtmlBeautifier.minify(html), html)
+
+    def test_beautify(self):
+
+        self.assertEqual(HtmlBeautifier.beautify("<div><p>Hello</p><br><img src=\"a\"/></div>"),
+            "<div>\n  <p>\n    Hello\n  </p>\n  <br>\n  <img src=\"a\"/>\n</div>\n")
+
+    def test_formatter(self):
+
+        formatter = HtmlBeautifier.Formatter("minify")
+        self.assertEqual(formatter.process("index.html", "<p>\n a </p>"), "<p> a </p>")
+        self.assertEqual(formatter.process("index", " <div> </div>"), "<div></div>")
+
+        # Other file types are not touched
+        self.assertEqual(formatter.process("feed.xml", "<feed>\n</feed>"), "<feed>\n</feed>")
+        self.assertEqual(formatter.process("index.html", "plain  text"), "plain  text")
+
+    def test_formatter_mode(self):
+
+        self.assertRaises(ValueError, HtmlBeautifier.Formatter, "ugly")
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
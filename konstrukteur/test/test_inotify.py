@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, shutil, time, threading, struct
+
+# Extend PYTHONPATH with local Konstrukteur folder and the bundled watchdog library
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+sys.path.insert(0, os.path.join(konstrukteurroot, "konstrukteurlibs", "watchdog", "src"))
+
+import watchdog.events
+
+from watchdog.utils.unicode_paths import decode
+
+try:
+    import watchdog.observers.inotify as inotify
+    import watchdog.observers.inotify_c as inotify_c
+except ImportError:
+    inotify = None
+
+
+class Recorder(watchdog.events.FileSystemEventHandler):
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def on_any_event(self, event):
+        with self.lock:
+            self.events.append((event.event_type, os.path.basename(decode(event.src_path))))
+
+    def count(self, eventType, name):
+        with self.lock:
+            return len([entry for entry in self.events if entry == (eventType, name)])
+
+
+@unittest.skipIf(inotify is None, "inotify is not available")
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def observe(self, eventMask, action):
+        recorder = Recorder()
+        observer = inotify.InotifyObserver(event_mask=eventMask)
+        observer.schedule(recorder, self.path, recursive=True)
+        observer.start()
+
+        try:
+            action()
+
+            # Wait for the emitter thread to deliver all events
+            time.sleep(0.5)
+        finally:
+            observer.stop()
+            observer.join()
+
+        return recorder
+
+    def writeChunks(self):
+        with open(os.path.join(self.path, "page.html"), "w") as handle:
+            for chunk in range(5):
+                handle.write("x" * 1000)
+                handle.flush()
+
+                # Identical events are merged by the kernel as long as they are not read
+                time.sleep(0.05)
+
+    def test_presets(self):
+
+        self.assertEqual(inotify_c.EVENT_MASK_PRESETS["all"], inotify_c.WATCHDOG_ALL_EVENTS)
+        self.assertFalse(inotify_c.WATCHDOG_SETTLED_EVENTS & inotify_c.InotifyConstants.IN_MODIFY)
+        self.assertTrue(inotify_c.WATCHDOG_SETTLED_EVENTS & inotify_c.InotifyConstants.IN_CLOSE_WRITE)
+
+    def test_settled(self):
+
+        recorder = self.observe("settled", self.writeChunks)
+
+        # Reported once when closed after writing
+        self.assertEqual(recorder.count(watchdog.events.EVENT_TYPE_CREATED, "page.html"), 1)
+        self.assertEqual(recorder.count(watchdog.events.EVENT_TYPE_MODIFIED, "page.html"), 1)
+
+    def test_all(self):
+
+        recorder = self.observe(inotify_c.WATCHDOG_ALL_EVENTS, self.writeChunks)
+        self.assertGreater(recorder.count(watchdog.events.EVENT_TYPE_MODIFIED, "page.html"), 1)
+
+    def test_settled_moves_and_deletes(self):
+
+        def action():
+            with open(os.path.join(self.path, "a.html"), "w") as handle:
+                handle.write("a")
+
+            os.rename(os.path.join(self.path, "a.html"), os.path.join(self.path, "b.html"))
+            os.remove(os.path.join(self.path, "b.html"))
+
+        recorder = self.observe("settled", action)
+        self.assertEqual(recorder.count(watchdog.events.EVENT_TYPE_MOVED, "a.html"), 1)
+        self.assertEqual(recorder.count(watchdog.events.EVENT_TYPE_DELETED, "b.html"), 1)
+
+    def packEvent(self, wd, mask, cookie, name, padding=16):
+        name = name + b"\0" * (padding - len(name) % padding) if name else b""
+        return struct.pack("iIII", wd, mask, cookie, len(name)) + name
+
+    def test_parse_event_buffer(self):
+
+        data = self.packEvent(1, 2, 0, b"page.html") + self.packEvent(2, 4, 7, b"") + self.packEvent(3, 8, 7, b"x" * 16)
+        events = list(inotify_c.Inotify._parse_event_buffer(data))
+
+        # Names lose their null padding, events without name (e.g. for the watched folder) are kept at the end
+        self.assertEqual(events, [(1, 2, 0, b"page.html"), (2, 4, 7, b""), (3, 8, 7, b"x" * 16)])
+
+    def test_parse_event_buffer_length(self):
+
+        # Only the valid part of a reused buffer is parsed
+        first = self.packEvent(1, 2, 0, b"a.html")
+        buffer = bytearray(1024)
+        buffer[:len(first)] = first
+        buffer[len(first):len(first) + 16] = self.packEvent(9, 9, 9, b"")
+
+        self.assertEqual(list(inotify_c.Inotify._parse_event_buffer(buffer, len(first))), [(1, 2, 0, b"a.html")])
+
+        # Names are copied, the buffer can be overwritten afterwards
+        events = list(inotify_c.Inotify._parse_event_buffer(buffer, len(first)))
+        buffer[:] = bytes(len(buffer))
+        self.assertEqual(events[0][3], b"a.html")
+
+    def test_event_path(self):
+
+        event = inotify_c.InotifyEvent(1, inotify_c.InotifyConstants.IN_CREATE, 0, b"page.html", wd_path="/site")
+        self.assertEqual(event.src_path, b"/site/page.html")
+        self.assertTrue(event.is_create)
+
+        event = inotify_c.InotifyEvent(1, inotify_c.InotifyConstants.IN_DELETE_SELF, 0, b"", wd_path="/site")
+        self.assertEqual(event.src_path, b"/site")
+
+    def test_adaptive_buffer(self):
+
+        watcher = inotify_c.Inotify(self.path.encode("utf-8"))
+        try:
+            default = inotify_c.DEFAULT_EVENT_BUFFER_SIZE
+            self.assertEqual(watcher.event_buffer_size, default)
+
+            # Grows while reads fill the buffer
+            for read in range(10):
+                watcher._adapt_event_buffer(watcher.event_buffer_size)
+
+            self.assertEqual(watcher.event_buffer_size, inotify_c.MAX_EVENT_BUFFER_SIZE)
+
+            # Shrinks step by step after quiet reads
+            for read in range(inotify_c.SHRINK_AFTER_READS):
+                watcher._adapt_event_buffer(0)
+
+            self.assertEqual(watcher.event_buffer_size, inotify_c.MAX_EVENT_BUFFER_SIZE // 2)
+
+            for read in range(100 * inotify_c.SHRINK_AFTER_READS):
+                watcher._adapt_event_buffer(0)
+
+            self.assertEqual(watcher.event_buffer_size, default)
+        finally:
+            watcher.close()
+
+    def test_read_events(self):
+
+        watcher = inotify_c.Inotify(self.path.encode("utf-8"), False, inotify_c.WATCHDOG_SETTLED_EVENTS)
+        try:
+            for number in range(3):
+                with open(os.path.join(self.path, "page%s.html" % number), "w") as handle:
+                    handle.write("x")
+
+            events = watcher.read_events()
+            self.assertEqual([os.path.basename(event.src_path) for event in events if event.is_close_write], [b"page0.html", b"page1.html", b"page2.html"])
+        finally:
+            watcher.close()
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, time, asyncio, threading, concurrent.futures
+
+# Extend PYTHONPATH with local Konstrukteur folder and the bundled watchdog library
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+sys.path.insert(0, os.path.join(konstrukteurroot, "konstrukteurlibs", "watchdog", "src"))
+
+from konstrukteur import BuildCancelled
+import konstrukteur.FileWatcher as FileWatcher
+import konstrukteur.test.site as site
+
+
+class CancelAfter:
+
+    """Cancel flag which reports newer changes after @checks {Integer} checks."""
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    def is_set(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.site = site.Site()
+
+    def tearDown(self):
+        self.site.close()
+
+    def regenerate(self, konstrukteur, *relativePaths):
+        changes = dict((os.path.join(self.site.root, path), "modified") for path in relativePaths)
+        konstrukteur._Konstrukteur__regenerate(changes)
+
+    def test_build(self):
+
+        self.site.writePage("about.en.html", "About", "<p>Hello</p>")
+        self.site.create().build()
+
+        self.assertIn("<h1>About</h1><p>Hello</p>", self.site.read("about.en.html"))
+
+    def test_profile_change_recompiles_templates(self):
+
+        self.site.writeTemplate("Page", "<img src=\"{{@asset.url logo.png}}\">{{title}}")
+        self.site.writePage("about.en.html", "About")
+
+        konstrukteur = self.site.create()
+        konstrukteur.build()
+        self.assertEqual(self.site.read("about.en.html"), "<img src=\"/profile1/logo.png\">About")
+
+        # Only content changed but command results baked into the templates are outdated
+        self.site.profile.id = "profile2"
+        self.site.writePage("about.en.html", "About us", slug="about")
+        self.regenerate(konstrukteur, "source/content/page/about.en.html")
+        self.assertEqual(self.site.read("about.en.html"), "<img src=\"/profile2/logo.png\">About us")
+
+    def test_revision_change_recompiles_templates(self):
+
+        self.site.writeTemplate("Page", "{{@asset.url logo.png}}")
+        self.site.writePage("about.en.html", "About")
+
+        konstrukteur = self.site.create()
+        konstrukteur.build()
+
+        calls = len(self.site.profile.commands)
+        self.site.project.revision = "r2"
+        self.regenerate(konstrukteur, "source/content/page/about.en.html")
+        self.assertEqual(len(self.site.profile.commands), calls + 1)
+
+    def test_template_change_executes_commands_again(self):
+
+        self.site.writeTemplate("Page", "{{@asset.url logo.png}}")
+        self.site.writePage("about.en.html", "About")
+
+        konstrukteur = self.site.create()
+        konstrukteur.build()
+
+        # Command results may depend on state not covered by the profile fingerprint
+        calls = len(self.site.profile.commands)
+        self.site.writeTemplate("Page", "{{@asset.url logo.png}}!")
+        self.regenerate(konstrukteur, "source/template/Page.html")
+        self.assertEqual(len(self.site.profile.commands), calls + 1)
+        self.assertEqual(self.site.read("about.en.html"), "/profile1/logo.png!")
+
+    def test_cancelled_build(self):
+
+        self.site.writePage("about.en.html", "About")
+        self.site.writePage("contact.en.html", "Contact")
+        konstrukteur = self.site.create()
+
+        # Parsing and related posts pass, the first document is rendered
+        konstrukteur._Konstrukteur__cancelled = CancelAfter(3)
+        with self.assertRaises(BuildCancelled):
+            konstrukteur.build()
+
+        written = self.site.listOutput()
+        self.assertEqual(len(written), 1)
+
+        # Already written files are skipped by the restarted build
+        fileName = os.path.join(self.site.root, "build", written[0])
+        past = time.time() - 100
+        os.utime(fileName, (past, past))
+
+        konstrukteur._Konstrukteur__cancelled = threading.Event()
+        self.regenerate(konstrukteur, "source/content/page/contact.en.html")
+
+        self.assertEqual(self.site.listOutput(), ["about.en.html", "contact.en.html"])
+        self.assertEqual(os.stat(fileName).st_mtime, past)
+
+    def test_watch_restarts_cancelled_build(self):
+
+        konstrukteur = self.site.create()
+        cancelled = konstrukteur._Konstrukteur__cancelled
+        started = threading.Event()
+        finished = threading.Event()
+        builds = []
+
+        def regenerate(changes, server=None):
+            builds.append(dict(changes))
+            if len(builds) > 1:
+                finished.set()
+                return
+
+            started.set()
+            cancelled.wait(5)
+            konstrukteur._Konstrukteur__checkCancelled()
+
+        konstrukteur._Konstrukteur__regenerate = regenerate
+        collector = FileWatcher.ChangeCollector(debounce=0.01)
+
+        def change():
+            try:
+                collector.add("a.html", FileWatcher.CREATED)
+                started.wait(5)
+
+                # Creating and deleting cancels out each other in the restarted build
+                collector.add("a.html", FileWatcher.DELETED)
+                collector.add("b.html", FileWatcher.MODIFIED)
+                finished.wait(5)
+            finally:
+                collector.close()
+
+        thread = threading.Thread(target=change)
+        thread.start()
+
+        loop = asyncio.new_event_loop()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        try:
+            loop.run_until_complete(asyncio.wait_for(konstrukteur._Konstrukteur__runWatchLoop(loop, executor, collector, None, False), 10))
+        finally:
+            thread.join()
+            executor.shutdown(wait=True)
+            loop.close()
+
+        self.assertEqual(builds, [{"a.html" : FileWatcher.CREATED}, {"b.html" : FileWatcher.MODIFIED}])
+
+    def test_bridge(self):
+
+        collector = FileWatcher.ChangeCollector(debounce=0.01)
+        loop = asyncio.new_event_loop()
+
+        async def receive():
+            bridge = FileWatcher.ChangeBridge(collector, loop)
+            collector.add("a.html", FileWatcher.MODIFIED)
+            first = await bridge.get()
+            collector.close()
+            return first, await bridge.get()
+
+        try:
+            self.assertEqual(loop.run_until_complete(asyncio.wait_for(receive(), 5)), ({"a.html" : FileWatcher.MODIFIED}, None))
+        finally:
+            loop.close()
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, json
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.test.site as site
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.site = site.Site()
+
+    def tearDown(self):
+        self.site.close()
+
+    def build(self):
+        self.site.create().build()
+
+        with open(os.path.join(self.site.root, "konstrukteur-manifest.json"), "r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def test_created(self):
+
+        self.site.writePage("about.en.html", "About")
+        self.site.writePage("contact.en.html", "Contact")
+
+        manifest = self.build()
+        self.assertEqual(manifest["created"], ["about.en.html", "contact.en.html"])
+        self.assertEqual(manifest["modified"], [])
+        self.assertEqual(manifest["deleted"], [])
+
+    def test_unchanged(self):
+
+        self.site.writePage("about.en.html", "About")
+        self.build()
+
+        manifest = self.build()
+        self.assertEqual(manifest["created"], [])
+        self.assertEqual(manifest["modified"], [])
+
+    def test_modified(self):
+
+        self.site.writePage("about.en.html", "About", "<p>One</p>")
+        self.site.writePage("contact.en.html", "Contact")
+        self.build()
+
+        self.site.writePage("about.en.html", "About", "<p>Two</p>")
+        manifest = self.build()
+        self.assertEqual(manifest["created"], [])
+        self.assertEqual(manifest["modified"], ["about.en.html"])
+
+    def test_removed_item(self):
+
+        self.site.writePage("about.en.html", "About")
+        self.site.writePage("contact.en.html", "Contact")
+        self.build()
+
+        os.remove(os.path.join(self.site.root, "source", "content", "page", "contact.en.html"))
+        manifest = self.build()
+
+        self.assertEqual(manifest["deleted"], ["contact.en.html"])
+        self.assertEqual(manifest["stale"], ["contact.en.html"])
+        self.assertEqual(self.site.listOutput(), ["about.en.html"])
+
+    def test_moved_item(self):
+
+        self.site.writePage("about.en.html", "About")
+        self.build()
+
+        # Renamed output of an existing item is deleted but not stale
+        self.site.writePage("about.en.html", "About", slug="about-us")
+        manifest = self.build()
+
+        self.assertEqual(manifest["created"], ["about-us.en.html"])
+        self.assertEqual(manifest["deleted"], ["about.en.html"])
+        self.assertEqual(manifest["stale"], [])
+        self.assertEqual(self.site.listOutput(), ["about-us.en.html"])
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, shutil
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.OutputWriter as OutputWriter
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+        self.synced = []
+        self.originalSyncFile = OutputWriter.syncFile
+        self.originalSyncDirectory = OutputWriter.syncDirectory
+        OutputWriter.syncFile = lambda fileName: self.synced.append(("file", fileName))
+        OutputWriter.syncDirectory = lambda dirname: self.synced.append(("dir", dirname))
+
+    def tearDown(self):
+        OutputWriter.syncFile = self.originalSyncFile
+        OutputWriter.syncDirectory = self.originalSyncDirectory
+        shutil.rmtree(self.path)
+
+    def build(self, files, state=None, fsync="none"):
+        writer = OutputWriter.OutputWriter(fsync=fsync, state=state)
+        for name, content in files.items():
+            writer.write(os.path.join(self.path, name), content, "item.%s" % name)
+
+        writer.close()
+        return writer
+
+    def read(self, name):
+        with open(os.path.join(self.path, name), "r", encoding="utf-8") as handle:
+            return handle.read()
+
+    def test_write(self):
+
+        writer = self.build({"a.html" : "A", "sub/b.html" : "B"})
+
+        self.assertEqual(self.read("a.html"), "A")
+        self.assertEqual(self.read("sub/b.html"), "B")
+        self.assertEqual(writer.getChanges(), {
+            os.path.join(self.path, "a.html") : "created",
+            os.path.join(self.path, "sub/b.html") : "created"
+        })
+        self.assertEqual(writer.getState()["sources"][os.path.join(self.path, "a.html")], "item.a.html")
+
+        # No temporary files are left behind
+        self.assertEqual(sorted(os.listdir(self.path)), ["a.html", "sub"])
+
+    def test_skip_unchanged(self):
+
+        state = self.build({"a.html" : "A", "b.html" : "B"}).getState()
+        writer = self.build({"a.html" : "A", "b.html" : "B2"}, state)
+
+        self.assertEqual(writer.getChanges(), {os.path.join(self.path, "b.html") : "modified"})
+        self.assertEqual(self.read("b.html"), "B2")
+        self.assertEqual(set(writer.getState()["hashes"]), set(state["hashes"]))
+
+    def test_rewrite_missing(self):
+
+        state = self.build({"a.html" : "A"}).getState()
+        os.remove(os.path.join(self.path, "a.html"))
+
+        writer = self.build({"a.html" : "A"}, state)
+        self.assertEqual(writer.getChanges(), {os.path.join(self.path, "a.html") : "created"})
+        self.assertEqual(self.read("a.html"), "A")
+
+    def test_keep(self):
+
+        state = self.build({"a.html" : "A"}).getState()
+
+        writer = OutputWriter.OutputWriter(state=state)
+        self.assertTrue(writer.keep(os.path.join(self.path, "a.html"), "item.a"))
+        self.assertFalse(writer.keep(os.path.join(self.path, "missing.html")))
+        writer.close()
+
+        self.assertEqual(writer.getState()["hashes"], state["hashes"])
+        self.assertEqual(writer.getChanges(), {})
+
+    def test_filters_and_stages(self):
+
+        calls = []
+        writer = OutputWriter.OutputWriter()
+        writer.addFilter(lambda fileName, content: content.upper())
+        writer.addStage(lambda writer, fileName, data, changed: calls.append((os.path.basename(fileName), data, changed)))
+        writer.write(os.path.join(self.path, "a.html"), "a")
+        writer.close()
+
+        self.assertEqual(self.read("a.html"), "A")
+        self.assertEqual(calls, [("a.html", b"A", True)])
+
+    def test_fsync_build(self):
+
+        self.build({"a.html" : "A", "sub/deep/b.html" : "B"}, fsync="build")
+
+        files = sorted(name for kind, name in self.synced if kind == "file")
+        directories = set(name for kind, name in self.synced if kind == "dir")
+
+        self.assertEqual(files, [os.path.join(self.path, "a.html"), os.path.join(self.path, "sub/deep/b.html")])
+        self.assertEqual(directories, set([self.path, os.path.join(self.path, "sub"), os.path.join(self.path, "sub/deep")]))
+
+        # Files are synced before the folders containing their new names
+        self.assertEqual(self.synced[-1][0], "dir")
+
+    def test_fsync_file(self):
+
+        self.build({"a.html" : "A"}, fsync="file")
+        self.assertEqual(self.synced, [("dir", self.path)])
+
+    def test_fsync_none(self):
+
+        self.build({"a.html" : "A"})
+        self.assertEqual(self.synced, [])
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, shutil, time, queue
+
+# Extend PYTHONPATH with local Konstrukteur folder and the bundled watchdog library
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+sys.path.insert(0, os.path.join(konstrukteurroot, "konstrukteurlibs", "watchdog", "src"))
+
+import watchdog.events
+import watchdog.observers.api
+import watchdog.observers.polling as polling
+import watchdog.utils.dirsnapshot as dirsnapshot
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.realpath(tempfile.mkdtemp())
+        os.makedirs(os.path.join(self.path, "content"))
+        self.write("content/page.html", "page")
+
+        self.queue = watchdog.observers.api.EventQueue()
+        self.watch = watchdog.observers.api.ObservedWatch(self.path, True)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def write(self, relativePath, text):
+        with open(os.path.join(self.path, relativePath), "w") as handle:
+            handle.write(text)
+
+    def age(self, relativePath):
+        """Moves the modification time of a folder out of the racy interval."""
+        past = time.time() - dirsnapshot.RACY_INTERVAL - 10
+        os.utime(os.path.join(self.path, relativePath), (past, past))
+
+    def events(self):
+        result = []
+        while True:
+            try:
+                event, watch = self.queue.get_nowait()
+            except queue.Empty:
+                return result
+            result.append((event.event_type, os.path.relpath(event.src_path, self.path)))
+
+    def test_backoff(self):
+        emitter = polling.PollingEmitter(self.queue, self.watch, timeout=0.01, max_timeout=0.04)
+        self.assertEqual(emitter.interval, 0.01)
+
+        emitter.queue_events(0.01)
+        self.assertEqual(emitter.interval, 0.02)
+        emitter.queue_events(0.01)
+        self.assertEqual(emitter.interval, 0.04)
+        emitter.queue_events(0.01)
+        self.assertEqual(emitter.interval, 0.04)
+
+        self.write("content/about.html", "about")
+        emitter.queue_events(0.01)
+        self.assertEqual(emitter.interval, 0.01)
+        self.assertIn(("created", "content/about.html"), self.events())
+
+    def test_default_backoff_limit(self):
+        emitter = polling.PollingEmitter(self.queue, self.watch, timeout=0.01)
+        for step in range(5):
+            emitter.queue_events(0.01)
+
+        self.assertEqual(emitter.interval, 0.01 * polling.DEFAULT_BACKOFF_LIMIT)
+
+    def test_incremental_modification(self):
+        self.age("content")
+        self.age("")
+
+        emitter = polling.PollingEmitter(self.queue, self.watch, timeout=0.01)
+        self.write("content/page.html", "changed page")
+
+        emitter.queue_events(0.01)
+        self.assertEqual(self.events(), [("modified", "content/page.html")])
+
+    def test_stop(self):
+        emitter = polling.PollingEmitter(self.queue, self.watch, timeout=30)
+        emitter.start()
+
+        start = time.time()
+        emitter.stop()
+        emitter.join(5)
+
+        self.assertFalse(emitter.is_alive())
+        self.assertLess(time.time() - start, 5)
+
+    def test_observer(self):
+        observer = polling.PollingObserver(timeout=0.01, max_timeout=0.05)
+        watch = observer.schedule(watchdog.events.FileSystemEventHandler(), self.path, recursive=True)
+        emitter = observer._emitter_for_watch[watch]
+
+        self.assertIsInstance(emitter, polling.PollingEmitter)
+        self.assertEqual(emitter._max_timeout, 0.05)
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
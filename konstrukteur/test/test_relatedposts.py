@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.RelatedPosts as RelatedPosts
+
+TOPICS = ["python django flask", "javascript react node", "cooking pasta sauce", "travel italy rome"]
+
+
+def createPosts(language="en", count=40):
+    # Every topic is shared by ten posts, the words in between are unique
+    return [{"id" : "post.%s" % number, "language" : language, "title" : "%s word%s" % (TOPICS[number % len(TOPICS)], number)} for number in range(count)]
+
+
+def related(post):
+    return [entry["id"] for entry in post["related"]]
+
+
+@unittest.skipUnless(RelatedPosts.isSupported(), "NumPy is not installed")
+class Tests(unittest.TestCase):
+
+    def test_compute(self):
+
+        posts = createPosts()
+        RelatedPosts.RelatedPosts(count=3).compute("en", posts)
+
+        for number, post in enumerate(posts):
+            self.assertEqual(len(post["related"]), 3)
+            self.assertNotIn(post["id"], related(post))
+            self.assertTrue(all([int(entry["id"].split(".")[1]) % len(TOPICS) == number % len(TOPICS) for entry in post["related"]]))
+
+    def test_incremental(self):
+
+        posts = createPosts()
+        generator = RelatedPosts.RelatedPosts(count=3)
+        generator.compute("en", posts)
+
+        # One post moves to another topic
+        posts = createPosts()
+        posts[0]["title"] = "%s word0" % TOPICS[1]
+
+        incremental = RelatedPosts.RelatedPosts(count=3, state=generator.getState())
+        incremental.compute("en", posts)
+
+        expected = createPosts()
+        expected[0]["title"] = posts[0]["title"]
+        RelatedPosts.RelatedPosts(count=3).compute("en", expected)
+
+        self.assertEqual([len(related(post)) for post in posts], [len(related(post)) for post in expected])
+        self.assertTrue(set(related(posts[0])) <= set([post["id"] for post in posts if post["title"].startswith(TOPICS[1])]))
+
+    def test_translations(self):
+
+        english = createPosts("en")
+        german = createPosts("de")
+        generator = RelatedPosts.RelatedPosts(count=3)
+        generator.compute("en", english)
+        generator.compute("de", german)
+
+        terms = generator.getState()["terms"]
+        self.assertEqual(len(terms), 80)
+        self.assertIn(("post.0", "de"), terms)
+
+        # Related posts link to posts of the same language
+        self.assertEqual(set([entry["language"] for post in german for entry in post["related"]]), set(["de"]))
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, json
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.SearchIndex as SearchIndex
+
+
+class Writer:
+
+    def __init__(self):
+        self.files = {}
+
+    def write(self, fileName, content):
+        self.files[fileName] = json.loads(content)
+
+
+class Tests(unittest.TestCase):
+
+    def test_tokenize(self):
+
+        self.assertEqual(SearchIndex.tokenize("<p>Caf&eacute; &amp; <b>Bar</b> 2014 a</p>"), ["café", "bar"])
+        self.assertEqual(SearchIndex.tokenize("a ab abc", 3), ["abc"])
+
+    def test_shard_name(self):
+
+        self.assertEqual(SearchIndex.getShardName("ab"), "ab")
+        self.assertEqual(SearchIndex.getShardName("ca"), "ca")
+        self.assertEqual(SearchIndex.getShardName("ü"), "x-c3bc")
+
+    def test_index(self):
+
+        writer = Writer()
+        index = SearchIndex.SearchIndex(writer, "build", prefixLength=1)
+        index.add({"id" : "page.a", "language" : "en", "title" : "Python", "content" : "python web"}, "a.html")
+        index.add({"id" : "page.b", "language" : "en", "title" : "Web"}, "b.html")
+        index.close()
+
+        base = os.path.join("build", "search", "en")
+        self.assertEqual(writer.files[os.path.join(base, "documents.json")], [["a.html", "Python"], ["b.html", "Web"]])
+        self.assertEqual(writer.files[os.path.join(base, "shards.json")], {"prefixLength" : 1, "minLength" : 2, "shards" : ["p", "w"]})
+        self.assertEqual(writer.files[os.path.join(base, "p.json")], {"python" : [[0, 6]]})
+        self.assertEqual(writer.files[os.path.join(base, "w.json")], {"web" : [[0, 1], [1, 5]]})
+
+    def test_translations(self):
+
+        english = {"id" : "page.about", "language" : "en", "title" : "About"}
+        german = {"id" : "page.about", "language" : "de", "title" : "Ueber"}
+
+        writer = Writer()
+        index = SearchIndex.SearchIndex(writer, "build")
+        index.add(english, "about.en.html")
+        index.add(german, "about.de.html")
+        index.close()
+
+        cache = index.getCache()
+        self.assertEqual(len(cache), 2)
+
+        # Both translations are taken from the cache of the previous build
+        writer = Writer()
+        index = SearchIndex.SearchIndex(writer, "build", cache=cache)
+        index.add(english, "about.en.html")
+        index.add(german, "about.de.html")
+        self.assertEqual(index._SearchIndex__tokenized, 0)
+
+        index.close()
+        self.assertEqual(writer.files[os.path.join("build", "search", "de", "ue.json")], {"ueber" : [[0, 5]]})
+
+    def test_changed(self):
+
+        item = {"id" : "page.a", "language" : "en", "title" : "One"}
+
+        index = SearchIndex.SearchIndex(Writer(), "build")
+        index.add(item, "a.html")
+
+        writer = Writer()
+        index = SearchIndex.SearchIndex(writer, "build", cache=index.getCache())
+        index.add(dict(item, title="Two"), "a.html")
+        index.close()
+
+        self.assertEqual(index._SearchIndex__tokenized, 1)
+        self.assertEqual(writer.files[os.path.join("build", "search", "en", "tw.json")], {"two" : [[0, 5]]})
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.Sitemap as Sitemap
+
+
+class Writer:
+
+    def __init__(self):
+        self.files = {}
+
+    def write(self, fileName, content):
+        self.files[fileName] = content
+
+
+class Tests(unittest.TestCase):
+
+    def test_single(self):
+
+        writer = Writer()
+        sitemap = Sitemap.Sitemap(writer, "http://example.com", "build")
+        sitemap.add("index.html", 0)
+        sitemap.add(os.path.join("en", "a b"), 86400)
+        sitemap.close()
+
+        self.assertEqual(list(writer.files), [os.path.join("build", "sitemap.xml")])
+
+        content = writer.files[os.path.join("build", "sitemap.xml")]
+        self.assertIn("<urlset", content)
+        self.assertIn("<url><loc>http://example.com/index.html</loc></url>", content)
+        self.assertIn("<url><loc>http://example.com/en/a%20b</loc><lastmod>1970-01-02T00:00:00Z</lastmod></url>", content)
+
+    def test_shards(self):
+
+        writer = Writer()
+        sitemap = Sitemap.Sitemap(writer, "http://example.com/", "build", shardSize=2)
+        for number in range(5):
+            sitemap.add("page%s" % number, 86400 * (number + 1))
+
+        sitemap.close()
+
+        self.assertEqual(sorted(writer.files), [os.path.join("build", name) for name in ("sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml", "sitemap.xml")])
+        self.assertEqual(writer.files[os.path.join("build", "sitemap-3.xml")].count("<url>"), 1)
+        self.assertIn("page2", writer.files[os.path.join("build", "sitemap-2.xml")])
+
+        index = writer.files[os.path.join("build", "sitemap.xml")]
+        self.assertIn("<sitemapindex", index)
+        self.assertEqual(index.count("<sitemap>"), 3)
+
+        # Index entries carry the latest modification time of their shard
+        self.assertIn("<sitemap><loc>http://example.com/sitemap-1.xml</loc><lastmod>1970-01-03T00:00:00Z</lastmod></sitemap>", index)
+
+    def test_shards_streamed(self):
+
+        writer = Writer()
+        sitemap = Sitemap.Sitemap(writer, "http://example.com", "build", shardSize=2)
+        sitemap.add("a")
+        sitemap.add("b")
+
+        # Full shards are written right away
+        self.assertEqual(list(writer.files), [os.path.join("build", "sitemap-1.xml")])
+
+    def test_shard_limit(self):
+
+        writer = Writer()
+        sitemap = Sitemap.Sitemap(writer, "http://example.com", "build", shardSize=Sitemap.MAX_ENTRIES + 1)
+        for number in range(Sitemap.MAX_ENTRIES + 1):
+            sitemap.add("p")
+
+        sitemap.close()
+        self.assertEqual(len(writer.files), 3)
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.Template as Template
+import konstrukteur.TemplateCompiler as TemplateCompiler
+
+
+class Tests(unittest.TestCase):
+
+    def test_scope_lookup(self):
+
+        globalScope = Template.Scope({"title" : "Site", "lang" : "en"})
+        scope = Template.Scope({"title" : "Page"}, globalScope)
+
+        self.assertEqual(Template.getter("title", scope), "Page")
+        self.assertEqual(Template.getter("lang", scope), "en")
+        self.assertEqual(Template.getter("missing", scope), None)
+
+    def test_structure_lookup(self):
+
+        scope = Template.Scope({"page" : {}}, Template.Scope({"site" : {"url" : "/"}}))
+        self.assertEqual(Template.structure("site.url", scope), "/")
+        self.assertEqual(Template.structure("page.url", scope), None)
+
+    def test_camelize(self):
+
+        self.assertEqual(Template.camelize("font-size"), "fontSize")
+        self.assertEqual(Template.getter("font-size", {"fontSize" : 12}), 12)
+
+    def test_sections_see_outer_scope(self):
+
+        template = TemplateCompiler.compile("{{#items}}{{name}}@{{lang}} {{/items}}")
+        item = {"items" : [{"name" : "a"}, {"name" : "b", "lang" : "de"}]}
+
+        self.assertEqual(template.render(Template.Scope(item, Template.Scope({"lang" : "en"}))), "a@en b@de ")
+
+    def test_render_does_not_modify_item(self):
+
+        item = {"name" : "a"}
+        TemplateCompiler.compile("{{name}}{{site}}").render(Template.Scope(item, Template.Scope({"site" : "s"})))
+        self.assertEqual(item, {"name" : "a"})
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import jasy.template.Parser as Parser
+import konstrukteur.TemplateCompiler as TemplateCompiler
+
+
+class Tests(unittest.TestCase):
+
+    def test_fold_constants(self):
+
+        tree = TemplateCompiler.optimize(Parser.parse("{{site.name}} {{title}}"), {"site" : {"name" : "A&B"}})
+        self.assertEqual(tree, ["A&amp;B ", {"tag" : "$", "name" : "title"}])
+
+    def test_fold_raw_constants(self):
+
+        tree = TemplateCompiler.optimize(Parser.parse("{{=site.name}}"), {"site" : {"name" : "<b>"}})
+        self.assertEqual(tree, ["<b>"])
+
+    def test_fold_conditions(self):
+
+        constants = {"site" : {"debug" : False}}
+        self.assertEqual(TemplateCompiler.optimize(Parser.parse("a{{?site.debug}}b{{/site.debug}}c"), constants), ["ac"])
+        self.assertEqual(TemplateCompiler.optimize(Parser.parse("a{{^site.debug}}b{{/site.debug}}c"), constants), ["abc"])
+
+    def test_no_folding_inside_sections(self):
+
+        # Sections change the lookup context, "site" could be a field of every entry
+        tree = TemplateCompiler.optimize(Parser.parse("{{#items}}{{site.name}}{{/items}}"), {"site" : {"name" : "A"}})
+        self.assertEqual(tree[0]["nodes"], [{"tag" : "$", "name" : "site.name"}])
+
+    def test_commands(self):
+
+        tree = TemplateCompiler.optimize(Parser.parse("{{@asset.url logo.png}}"), commands=lambda command: "/%s?" % command)
+        self.assertEqual(tree, ["/asset.url logo.png?"])
+
+    def test_compact(self):
+
+        template = TemplateCompiler.compile("<p>{{title}}   <b>x</b>  </p>", compact=True)
+        self.assertEqual(template.render({"title" : "t"}), "<p>t <b>x</b> </p>")
+
+        # White space of pre formatted elements is kept
+        template = TemplateCompiler.compile("<pre>a   b</pre>", compact=True)
+        self.assertEqual(template.render({}), "<pre>a   b</pre>")
+
+    def test_render_folded(self):
+
+        template = TemplateCompiler.compile("{{site.name}}:{{#items}}[{{name}}|{{title}}]{{/items}}", constants={"site" : {"name" : "S"}})
+        self.assertEqual(template.render({"title" : "x", "items" : [{"name" : 1}, {"name" : 2}]}), "S:[1|x][2|x]")
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, cProfile, pstats
+
+# Extend PYTHONPATH with local Konstrukteur folder
+konstrukteurroot = os.path.normpath(os.path.join(os.path.abspath(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, konstrukteurroot)
+
+import konstrukteur.Template as Template
+import konstrukteur.TemplateCompiler as TemplateCompiler
+import konstrukteur.TemplateProfiler as TemplateProfiler
+
+TEXT = """<h1>{{title}}</h1>
+<ul>
+{{#items}}
+<li>{{name}}</li>
+{{/items}}
+</ul>
+{{#links}}<a>{{name}}</a>{{/links}}
+"""
+
+
+class Tests(unittest.TestCase):
+
+    def tearDown(self):
+        Template.disableProfiling()
+
+    def test_line_map(self):
+
+        template = TemplateCompiler.compile(TEXT, name="test.LineMap", instrument=False)
+        lines = set(template.getSourceLine(line) for line in range(1, 100)) - set([None])
+        self.assertEqual(lines, set([1, 3, 4, 7]))
+
+    def test_profile_sections(self):
+
+        profiler = Template.enableProfiling()
+        template = TemplateCompiler.compile(TEXT, name="test.Sections")
+        template.render({"title" : "t", "items" : [{"name" : "a"}, {"name" : "b"}], "links" : [{"name" : "c"}]})
+
+        sections = dict(((entry[1], entry[2]), entry[5]) for entry in profiler.getSections() if entry[0] == "test.Sections")
+        self.assertEqual(sections, {(3, "items") : 2, (7, "links") : 1})
+
+        lines = set(entry[1] for entry in profiler.getLines() if entry[0] == "test.Sections")
+        self.assertTrue(lines <= set([1, 3, 4, 7]))
+        self.assertIn(4, lines)
+
+        counters = profiler.getCounters()
+        self.assertEqual(counters["iterations"], 3)
+        self.assertTrue(counters["escapes"] >= 4)
+
+    def test_translate_stats(self):
+
+        template = TemplateCompiler.compile(TEXT, name="test.Stats", instrument=False)
+
+        profile = cProfile.Profile()
+        profile.runcall(template.render, {"items" : [{"name" : "a"}], "links" : [{"name" : "c"}]})
+        stats = TemplateProfiler.translateStats(pstats.Stats(profile))
+
+        lines = dict((name, line) for fileName, line, name in stats.stats if fileName == "<template test.Stats>")
+        self.assertEqual(sorted(lines.values())[1:], [3, 7])
+        self.assertEqual(lines["render"], 1)
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
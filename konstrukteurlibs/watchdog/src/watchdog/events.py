@@ -109,8 +109,13 @@ class FileSystemEvent(object):
 
     All FileSystemEvent objects are required to be immutable and hence
     can be used as keys in dictionaries or be added to sets.
+
+    Events are slotted: large bursts of them wait in the event queue, an
+    instance dictionary per event would multiply their size.
     """
 
+    __slots__ = ('_event_type', '_src_path', '_is_directory')
+
     def __init__(self, event_type, src_path, is_directory=False):
         self._src_path = src_path
         self._is_directory = is_directory
@@ -165,6 +170,8 @@ class FileSystemMovedEvent(FileSystemEvent):
     File system event representing any kind of file system movement.
     """
 
+    __slots__ = ('_dest_path',)
+
     def __init__(self, src_path, dest_path, is_directory):
         super(FileSystemMovedEvent, self).__init__(event_type=EVENT_TYPE_MOVED,
                                                    src_path=src_path,
@@ -199,6 +206,8 @@ class FileDeletedEvent(FileSystemEvent):
 
     """File system event representing file deletion on the file system."""
 
+    __slots__ = ()
+
     def __init__(self, src_path):
         super(FileDeletedEvent, self).__init__(event_type=EVENT_TYPE_DELETED,
                                                src_path=src_path)
@@ -213,6 +222,8 @@ class FileModifiedEvent(FileSystemEvent):
 
     """File system event representing file modification on the file system."""
 
+    __slots__ = ()
+
     def __init__(self, src_path):
         super(FileModifiedEvent, self).__init__(event_type=EVENT_TYPE_MODIFIED,
                                                 src_path=src_path)
@@ -227,6 +238,8 @@ class FileCreatedEvent(FileSystemEvent):
 
     """File system event representing file creation on the file system."""
 
+    __slots__ = ()
+
     def __init__(self, src_path):
         super(FileCreatedEvent, self).__init__(event_type=EVENT_TYPE_CREATED,
                                                src_path=src_path)
@@ -241,6 +254,8 @@ class FileMovedEvent(FileSystemMovedEvent):
 
     """File system event representing file movement on the file system."""
 
+    __slots__ = ()
+
     def __init__(self, src_path, dest_path):
         super(FileMovedEvent, self).__init__(src_path=src_path,
                                              dest_path=dest_path,
@@ -261,6 +276,8 @@ class DirDeletedEvent(FileSystemEvent):
 
     """File system event representing directory deletion on the file system."""
 
+    __slots__ = ()
+
     def __init__(self, src_path):
         super(DirDeletedEvent, self).__init__(event_type=EVENT_TYPE_DELETED,
                                               src_path=src_path,
@@ -278,6 +295,8 @@ class DirModifiedEvent(FileSystemEvent):
     File system event representing directory modification on the file system.
     """
 
+    __slots__ = ()
+
     def __init__(self, src_path):
         super(DirModifiedEvent, self).__init__(event_type=EVENT_TYPE_MODIFIED,
                                                src_path=src_path,
@@ -293,6 +312,8 @@ class DirCreatedEvent(FileSystemEvent):
 
     """File system event representing directory creation on the file system."""
 
+    __slots__ = ()
+
     def __init__(self, src_path):
         super(DirCreatedEvent, self).__init__(event_type=EVENT_TYPE_CREATED,
                                               src_path=src_path,
@@ -308,6 +329,8 @@ class DirMovedEvent(FileSystemMovedEvent):
 
     """File system event representing directory movement on the file system."""
 
+    __slots__ = ()
+
     def __init__(self, src_path, dest_path):
         super(DirMovedEvent, self).__init__(src_path=src_path,
                                             dest_path=dest_path,
@@ -454,16 +477,20 @@ class PatternMatchingEventHandler(FileSystemEventHandler):
         """
         return self._case_sensitive
 
-    def dispatch(self, event):
-        """Dispatches events to the appropriate methods.
+    def match_event(self, event):
+        """Determines whether the event matches the patterns of this handler.
+        Can be passed as ``event_filter`` when scheduling a watch to drop
+        non-matching events before they are queued.
 
         :param event:
             The event object representing the file system event.
         :type event:
             :class:`FileSystemEvent`
+        :returns:
+            ``True`` if the event should be handled; ``False`` otherwise.
         """
         if self.ignore_directories and event.is_directory:
-            return
+            return False
 
         paths = []
         if has_attribute(event, 'dest_path'):
@@ -471,10 +498,20 @@ class PatternMatchingEventHandler(FileSystemEventHandler):
         if event.src_path:
             paths.append(unicode_paths.decode(event.src_path))
 
-        if match_any_paths(paths,
-                           included_patterns=self.patterns,
-                           excluded_patterns=self.ignore_patterns,
-                           case_sensitive=self.case_sensitive):
+        return match_any_paths(paths,
+                               included_patterns=self.patterns,
+                               excluded_patterns=self.ignore_patterns,
+                               case_sensitive=self.case_sensitive)
+
+    def dispatch(self, event):
+        """Dispatches events to the appropriate methods.
+
+        :param event:
+            The event object representing the file system event.
+        :type event:
+            :class:`FileSystemEvent`
+        """
+        if self.match_event(event):
             self.on_any_event(event)
             _method_map = {
                 EVENT_TYPE_MODIFIED: self.on_modified,
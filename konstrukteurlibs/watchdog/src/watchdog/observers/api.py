@@ -143,6 +143,7 @@ class EventEmitter(DaemonThread):
         self._event_queue = event_queue
         self._watch = watch
         self._timeout = timeout
+        self._event_filter = None
 
     @property
     def timeout(self):
@@ -158,6 +159,23 @@ class EventEmitter(DaemonThread):
         """
         return self._watch
 
+    @property
+    def event_filter(self):
+        """
+        Callable deciding whether an event is queued at all or ``None``.
+        """
+        return self._event_filter
+
+    def set_event_filter(self, event_filter):
+        """
+        Sets a callable which is called with every event before it is queued.
+        Events for which it returns ``False`` are dropped right away.
+
+        :param event_filter:
+            Callable accepting an event or ``None`` to queue all events.
+        """
+        self._event_filter = event_filter
+
     def queue_event(self, event):
         """
         Queues a single event.
@@ -168,6 +186,8 @@ class EventEmitter(DaemonThread):
             An instance of :class:`watchdog.events.FileSystemEvent`
             or a subclass.
         """
+        if self._event_filter is not None and not self._event_filter(event):
+            return
         self._event_queue.put((event, self.watch))
 
     def queue_events(self, timeout):
@@ -290,7 +310,7 @@ class BaseObserver(EventDispatcher):
         handlers = self._get_handlers_for_watch(watch)
         handlers.remove(handler)
 
-    def schedule(self, event_handler, path, recursive=False):
+    def schedule(self, event_handler, path, recursive=False, event_filter=None):
         """
         Schedules watching a path and calls appropriate methods specified
         in the given event handler in response to file system events.
@@ -310,6 +330,10 @@ class BaseObserver(EventDispatcher):
             traversed recursively; ``False`` otherwise.
         :type recursive:
             ``bool``
+        :param event_filter:
+            Optional callable which is called with every event of a newly
+            created emitter before the event is queued. Events for which it
+            returns ``False`` are dropped without being dispatched.
         :return:
             An :class:`ObservedWatch` object instance representing
             a watch.
@@ -327,6 +351,7 @@ class BaseObserver(EventDispatcher):
                 emitter = self._emitter_class(event_queue=self.event_queue,
                                               watch=watch,
                                               timeout=self.timeout)
+                emitter.set_event_filter(event_filter)
                 self._add_emitter(emitter)
                 emitter.start()
             self._watches.add(watch)
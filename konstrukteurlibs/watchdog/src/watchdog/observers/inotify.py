@@ -74,7 +74,13 @@ if not platform.is_linux():
     raise ImportError
 
 import threading
-from inotify_c import Inotify
+from functools import partial
+from watchdog.observers.inotify_c import (
+    Inotify,
+    InotifyConstants,
+    WATCHDOG_ALL_EVENTS,
+    EVENT_MASK_PRESETS
+)
 
 from watchdog.observers.api import (
     EventEmitter,
@@ -124,12 +130,28 @@ class InotifyEmitter(EventEmitter):
         Read events blocking timeout (in seconds).
     :type timeout:
         ``float``
+    :param event_mask:
+        inotify event mask registered for all watches. Either a bit mask
+        or the name of a preset (``'all'`` or ``'settled'``). Without
+        ``IN_MODIFY`` file modifications are reported on ``IN_CLOSE_WRITE``.
+    :type event_mask:
+        ``int`` or ``str``
     """
 
-    def __init__(self, event_queue, watch, timeout=DEFAULT_EMITTER_TIMEOUT):
+    def __init__(self, event_queue, watch, timeout=DEFAULT_EMITTER_TIMEOUT,
+                 event_mask=WATCHDOG_ALL_EVENTS):
         EventEmitter.__init__(self, event_queue, watch, timeout)
+        if not isinstance(event_mask, int):
+            event_mask = EVENT_MASK_PRESETS[event_mask]
         self._lock = threading.Lock()
-        self._inotify = Inotify(watch.path, watch.is_recursive)
+        self._event_mask = event_mask
+        self._modify_on_close = not event_mask & InotifyConstants.IN_MODIFY
+        self._inotify = Inotify(watch.path, watch.is_recursive, event_mask)
+
+    @property
+    def event_mask(self):
+        """The inotify event mask of this emitter."""
+        return self._event_mask
 
     def on_thread_stop(self):
         self._inotify.close()
@@ -137,7 +159,7 @@ class InotifyEmitter(EventEmitter):
     def queue_events(self, timeout):
         with self._lock:
             inotify_events = self._inotify.read_events()
-            if not any([event.is_moved_from or event.is_moved_to for event in inotify_events]):
+            if not any(event.is_moved_from or event.is_moved_to for event in inotify_events):
                 self._inotify.clear_move_records()
             for event in inotify_events:
                 if event.is_moved_to:
@@ -167,6 +189,9 @@ class InotifyEmitter(EventEmitter):
                 elif event.is_modify:
                     klass = ACTION_EVENT_MAP[(event.is_directory, EVENT_TYPE_MODIFIED)]
                     self.queue_event(klass(event.src_path))
+                elif event.is_close_write and self._modify_on_close:
+                    klass = ACTION_EVENT_MAP[(event.is_directory, EVENT_TYPE_MODIFIED)]
+                    self.queue_event(klass(event.src_path))
                 elif event.is_delete or event.is_delete_self:
                     klass = ACTION_EVENT_MAP[(event.is_directory, EVENT_TYPE_DELETED)]
                     self.queue_event(klass(event.src_path))
@@ -181,6 +206,7 @@ class InotifyObserver(BaseObserver):
     calls to event handlers.
     """
 
-    def __init__(self, timeout=DEFAULT_OBSERVER_TIMEOUT):
-        BaseObserver.__init__(self, emitter_class=InotifyEmitter,
+    def __init__(self, timeout=DEFAULT_OBSERVER_TIMEOUT,
+                 event_mask=WATCHDOG_ALL_EVENTS):
+        BaseObserver.__init__(self, emitter_class=partial(InotifyEmitter, event_mask=event_mask),
                               timeout=timeout)
@@ -136,6 +136,26 @@ WATCHDOG_ALL_EVENTS = reduce(
         InotifyConstants.IN_DONT_FOLLOW,
     ])
 
+# Only events of settled changes: files are reported once they are closed after
+# writing instead of on every single write. Lets the kernel drop the stream of
+# IN_MODIFY events produced while large files are written.
+WATCHDOG_SETTLED_EVENTS = reduce(
+    lambda x, y: x | y, [
+        InotifyConstants.IN_CLOSE_WRITE,
+        InotifyConstants.IN_MOVED_FROM,
+        InotifyConstants.IN_MOVED_TO,
+        InotifyConstants.IN_CREATE,
+        InotifyConstants.IN_DELETE,
+        InotifyConstants.IN_DELETE_SELF,
+        InotifyConstants.IN_DONT_FOLLOW,
+    ])
+
+# Named event mask presets.
+EVENT_MASK_PRESETS = {
+    'all': WATCHDOG_ALL_EVENTS,
+    'settled': WATCHDOG_SETTLED_EVENTS,
+}
+
 
 class inotify_event_struct(ctypes.Structure):
     """
@@ -161,6 +181,29 @@ EVENT_SIZE = ctypes.sizeof(inotify_event_struct)
 DEFAULT_NUM_EVENTS = 2048
 DEFAULT_EVENT_BUFFER_SIZE = DEFAULT_NUM_EVENTS * (EVENT_SIZE + 16)
 
+# Upper bound of the adaptive read buffer used under load.
+MAX_EVENT_BUFFER_SIZE = 16 * DEFAULT_EVENT_BUFFER_SIZE
+
+# Fixed size header of ``struct inotify_event`` (without the name).
+EVENT_HEADER = struct.Struct('iIII')
+
+# Size of the largest possible single event (header, NAME_MAX and null).
+MAX_EVENT_SIZE = EVENT_HEADER.size + 255 + 1
+
+# Number of consecutive reads using less than a quarter of the buffer
+# after which the buffer is shrunk again.
+SHRINK_AFTER_READS = 8
+
+
+if hasattr(os, 'readv'):
+    def _read_into(fd, buf):
+        return os.readv(fd, [buf])
+else:
+    def _read_into(fd, buf):
+        data = os.read(fd, len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
 
 class Inotify(object):
     """
@@ -202,6 +245,10 @@ class Inotify(object):
         self._add_dir_watch(path, recursive, event_mask)
         self._moved_from_events = dict()
 
+        # Read buffer, reused between reads and resized depending on load.
+        self._event_buffer = bytearray(DEFAULT_EVENT_BUFFER_SIZE)
+        self._quiet_reads = 0
+
     @property
     def event_mask(self):
         """The event mask for this inotify instance."""
@@ -227,6 +274,11 @@ class Inotify(object):
         """The file descriptor associated with the inotify instance."""
         return self._inotify_fd
 
+    @property
+    def event_buffer_size(self):
+        """The current size of the adaptive read buffer."""
+        return len(self._event_buffer)
+
     def clear_move_records(self):
         """Clear cached records of MOVED_FROM events"""
         self._moved_from_events = dict()
@@ -276,9 +328,14 @@ class Inotify(object):
         with self._lock:
             os.close(self._inotify_fd)
 
-    def read_events(self, event_buffer_size=DEFAULT_EVENT_BUFFER_SIZE):
+    def read_events(self, event_buffer_size=None):
         """
         Reads events from inotify and yields them.
+
+        :param event_buffer_size:
+            Size of the read buffer. By default a reused buffer is used
+            which grows up to ``MAX_EVENT_BUFFER_SIZE`` while reads fill it
+            and shrinks back after a couple of quiet reads.
         """
         # HACK: We need to traverse the directory path
         # recursively and simulate events for newly
@@ -305,39 +362,46 @@ class Inotify(object):
                     events.append(e)
             return events
 
+        if event_buffer_size is None:
+            event_buffer = self._event_buffer
+        else:
+            event_buffer = bytearray(event_buffer_size)
+
         while True:
             try:
-                event_buffer = os.read(self._inotify_fd, event_buffer_size)
+                length = _read_into(self._inotify_fd, event_buffer)
             except OSError as e:
                 if e.errno == errno.EINTR:
                     continue
+                raise
             break
 
+        if event_buffer_size is None:
+            self._adapt_event_buffer(length)
+
         with self._lock:
             event_list = []
-            for wd, mask, cookie, name in Inotify._parse_event_buffer(event_buffer):
+            path_for_wd = self._path_for_wd
+            for wd, mask, cookie, name in Inotify._parse_event_buffer(event_buffer, length):
                 if wd == -1:
                     continue
-                wd_path = unicode_paths.encode(self._path_for_wd[wd])
-                src_path = absolute_path(os.path.join(wd_path, name))
+
+                # The source path is only joined when it is accessed.
                 inotify_event = InotifyEvent(
-                    wd, mask, cookie, name, src_path)
+                    wd, mask, cookie, name, wd_path=path_for_wd[wd])
 
                 if inotify_event.is_moved_from:
                     self.remember_move_from_event(inotify_event)
                 elif inotify_event.is_moved_to:
                     move_src_path = self.source_for_move(inotify_event)
                     if move_src_path in self._wd_for_path:
-                        moved_wd = self._wd_for_path[move_src_path]
-                        del self._wd_for_path[move_src_path]
+                        moved_wd = self._wd_for_path.pop(move_src_path)
                         self._wd_for_path[inotify_event.src_path] = moved_wd
-                        self._path_for_wd[moved_wd] = inotify_event.src_path
-                    src_path = absolute_path(os.path.join(wd_path, name))
-                    inotify_event = InotifyEvent(wd, mask, cookie, name, src_path)
+                        path_for_wd[moved_wd] = inotify_event.src_path
 
                 if inotify_event.is_ignored:
                     # Clean up book-keeping for deleted watches.
-                    self._remove_watch_bookkeeping(src_path)
+                    self._remove_watch_bookkeeping(inotify_event.src_path)
                     continue
 
                 event_list.append(inotify_event)
@@ -353,6 +417,7 @@ class Inotify(object):
                     # IN_MOVED_TO events which don't pair up with
                     # IN_MOVED_FROM events should be marked IN_CREATE
                     # instead relative to this directory.
+                    src_path = inotify_event.src_path
                     try:
                         self._add_watch(src_path, self._event_mask)
                     except OSError:
@@ -362,6 +427,27 @@ class Inotify(object):
 
         return event_list
 
+    def _adapt_event_buffer(self, length):
+        """
+        Grows the read buffer when a read (almost) filled it, as more events
+        are likely pending, and shrinks it again after several quiet reads.
+
+        :param length:
+            Number of bytes returned by the last read.
+        """
+        size = len(self._event_buffer)
+        if length > size - MAX_EVENT_SIZE:
+            self._quiet_reads = 0
+            if size < MAX_EVENT_BUFFER_SIZE:
+                self._event_buffer = bytearray(min(size * 2, MAX_EVENT_BUFFER_SIZE))
+        elif length < size // 4 and size > DEFAULT_EVENT_BUFFER_SIZE:
+            self._quiet_reads += 1
+            if self._quiet_reads >= SHRINK_AFTER_READS:
+                self._quiet_reads = 0
+                self._event_buffer = bytearray(max(size // 2, DEFAULT_EVENT_BUFFER_SIZE))
+        else:
+            self._quiet_reads = 0
+
     # Non-synchronized methods.
     def _add_dir_watch(self, path, recursive, mask):
         """
@@ -429,7 +515,7 @@ class Inotify(object):
         raise OSError(os.strerror(_errnum))
 
     @staticmethod
-    def _parse_event_buffer(event_buffer):
+    def _parse_event_buffer(event_buffer, length=None):
         """
         Parses an event buffer of ``inotify_event`` structs returned by
         inotify::
@@ -445,13 +531,35 @@ class Inotify(object):
         The ``cookie`` member of this struct is used to pair two related
         events, for example, it pairs an IN_MOVED_FROM event with an
         IN_MOVED_TO event.
+
+        Headers are decoded in place and only the names (without the null
+        padding) are copied out of the buffer, so the buffer can be reused
+        for the next read.
+
+        :param event_buffer:
+            ``bytes`` or ``bytearray`` holding the events.
+        :param length:
+            Number of valid bytes in the buffer, defaults to its length.
         """
-        i = 0
-        while i + 16 < len(event_buffer):
-            wd, mask, cookie, length = struct.unpack_from('iIII', event_buffer, i)
-            name = event_buffer[i + 16:i + 16 + length].rstrip(b'\0')
-            i += 16 + length
-            yield wd, mask, cookie, name
+        if length is None:
+            length = len(event_buffer)
+        unpack_from = EVENT_HEADER.unpack_from
+        header_size = EVENT_HEADER.size
+        view = memoryview(event_buffer)
+        try:
+            i = 0
+            while i + header_size <= length:
+                wd, mask, cookie, name_length = unpack_from(event_buffer, i)
+                start = i + header_size
+                i = start + name_length
+                if name_length:
+                    end = event_buffer.find(b'\0', start, i)
+                    name = bytes(view[start:i if end == -1 else end])
+                else:
+                    name = b''
+                yield wd, mask, cookie, name
+        finally:
+            view.release()
 
 
 class InotifyEvent(object):
@@ -468,17 +576,28 @@ class InotifyEvent(object):
         Event name.
     :param src_path:
         Event source path
+    :param wd_path:
+        Path of the watched directory. When given instead of ``src_path``
+        the source path is joined on first access.
     """
 
-    def __init__(self, wd, mask, cookie, name, src_path):
+    __slots__ = ('_wd', '_mask', '_cookie', '_name', '_src_path', '_wd_path')
+
+    def __init__(self, wd, mask, cookie, name, src_path=None, wd_path=None):
         self._wd = wd
         self._mask = mask
         self._cookie = cookie
         self._name = name
         self._src_path = src_path
+        self._wd_path = wd_path
 
     @property
     def src_path(self):
+        if self._src_path is None:
+            # Watched paths are absolute and normalized and names never
+            # contain separators, joining is enough.
+            wd_path = unicode_paths.encode(self._wd_path)
+            self._src_path = os.path.join(wd_path, self._name) if self._name else wd_path
         return self._src_path
 
     @property
@@ -562,7 +681,7 @@ class InotifyEvent(object):
     # Python-specific functionality.
     @property
     def key(self):
-        return (self._src_path,
+        return (self.src_path,
                 self._wd,
                 self._mask,
                 self._cookie,
@@ -572,7 +691,7 @@ class InotifyEvent(object):
         return self.key == inotify_event.key
 
     def __ne__(self, inotify_event):
-        return self.key == inotify_event.key
+        return self.key != inotify_event.key
 
     def __hash__(self):
         return hash(self.key)
@@ -31,8 +31,8 @@ Classes
 
 from __future__ import with_statement
 
-import time
 import threading
+from functools import partial
 
 from watchdog.utils.dirsnapshot import DirectorySnapshot, DirectorySnapshotDiff
 from watchdog.observers.api import (
@@ -53,27 +53,53 @@ from watchdog.events import (
     FileModifiedEvent
 )
 
+# Factor by which the polling interval grows after polls without changes
+# and the default limit of the interval relative to the configured one.
+BACKOFF_FACTOR = 2
+DEFAULT_BACKOFF_LIMIT = 4
+
 
 class PollingEmitter(EventEmitter):
 
     """
     Platform-independent emitter that polls a directory to detect file
     system changes.
+
+    :param max_timeout:
+        Upper limit of the polling interval. While polls find no changes
+        the interval grows from ``timeout`` up to this limit and drops back
+        after the next change. Defaults to ``DEFAULT_BACKOFF_LIMIT`` times
+        ``timeout``.
+    :param incremental:
+        ``True`` to only list directories again whose modification time
+        changed since the previous snapshot.
     """
 
-    def __init__(self, event_queue, watch, timeout=DEFAULT_EMITTER_TIMEOUT):
+    def __init__(self, event_queue, watch, timeout=DEFAULT_EMITTER_TIMEOUT,
+                 max_timeout=None, incremental=True):
         EventEmitter.__init__(self, event_queue, watch, timeout)
         self._snapshot = DirectorySnapshot(watch.path, watch.is_recursive)
         self._lock = threading.Lock()
+        self._incremental = incremental
+        self._interval = timeout
+        if max_timeout is None:
+            max_timeout = timeout * DEFAULT_BACKOFF_LIMIT
+        self._max_timeout = max(timeout, max_timeout)
+
+    @property
+    def interval(self):
+        """The current polling interval."""
+        return self._interval
 
     def on_thread_stop(self):
         with self._lock:
             self._snapshot = None
 
     def queue_events(self, timeout):
-    # We don't want to hit the disk continuously.
-    # timeout behaves like an interval for polling emitters.
-        time.sleep(timeout)
+        # We don't want to hit the disk continuously.
+        # timeout behaves like an interval for polling emitters.
+        if self.stopped_event.wait(self._interval):
+            return
 
         with self._lock:
 
@@ -82,10 +108,19 @@ class PollingEmitter(EventEmitter):
 
             # Get event diff between fresh snapshot and previous snapshot.
             # Update snapshot.
-            new_snapshot = DirectorySnapshot(self.watch.path, self.watch.is_recursive)
+            new_snapshot = DirectorySnapshot(self.watch.path, self.watch.is_recursive,
+                                             previous=self._snapshot if self._incremental else None)
             events = DirectorySnapshotDiff(self._snapshot, new_snapshot)
             self._snapshot = new_snapshot
 
+            if (events.files_deleted or events.files_modified or
+                    events.files_created or events.files_moved or
+                    events.dirs_deleted or events.dirs_modified or
+                    events.dirs_created or events.dirs_moved):
+                self._interval = timeout
+            else:
+                self._interval = min(self._interval * BACKOFF_FACTOR, self._max_timeout)
+
             # Files.
             for src_path in events.files_deleted:
                 self.queue_event(FileDeletedEvent(src_path))
@@ -114,5 +149,6 @@ class PollingObserver(BaseObserver):
     calls to event handlers.
     """
 
-    def __init__(self, timeout=DEFAULT_OBSERVER_TIMEOUT):
-        BaseObserver.__init__(self, emitter_class=PollingEmitter, timeout=timeout)
+    def __init__(self, timeout=DEFAULT_OBSERVER_TIMEOUT, max_timeout=None):
+        BaseObserver.__init__(self, emitter_class=partial(PollingEmitter, max_timeout=max_timeout),
+                              timeout=timeout)
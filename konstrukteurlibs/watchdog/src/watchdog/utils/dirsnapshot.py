@@ -55,12 +55,64 @@ Classes
 import os
 import sys
 import stat
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
 
-from pathtools.path import walk as path_walk, absolute_path
+from pathtools.path import absolute_path
 
 if sys.version_info >= (2, 6, 0):
     from watchdog.utils.bricks import OrderedSet as set
 
+# Directories modified less than this many seconds before the previous
+# snapshot was taken are listed again: further changes within the same
+# mtime tick (or hidden by a slightly skewed clock of a network file
+# system) would not be visible otherwise.
+RACY_INTERVAL = 2.0
+
+_STAT_DIR_FD = os.stat in getattr(os, 'supports_dir_fd', ())
+_DIRECTORY_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+
+#: Stat information kept by a snapshot for every path.
+SnapshotStat = namedtuple('SnapshotStat', 'st_mode st_ino st_size st_mtime st_mtime_ns')
+
+
+def _mtime_ns(stat_info):
+    mtime_ns = getattr(stat_info, 'st_mtime_ns', None)
+    if mtime_ns is None:
+        mtime_ns = int(stat_info.st_mtime * 1e9)
+    return mtime_ns
+
+
+def _scan_directory(path):
+    """
+    Yields ``(name, stat_info, is_link)`` of all entries of a directory
+    using :func:`os.scandir` where available. Entries vanishing while
+    scanning are skipped.
+    """
+    if hasattr(os, 'scandir'):
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                yield entry.name, entry.stat(), entry.is_symlink()
+            except OSError:
+                continue
+    else:
+        try:
+            names = os.listdir(path)
+        except OSError:
+            return
+        for name in names:
+            entry_path = os.path.join(path, name)
+            try:
+                yield name, os.stat(entry_path), os.path.islink(entry_path)
+            except OSError:
+                continue
+
 
 class DirectorySnapshotDiff(object):
 
@@ -68,6 +120,10 @@ class DirectorySnapshotDiff(object):
     Compares two directory snapshots and creates an object that represents
     the difference between the two snapshots.
 
+    Both snapshots keep their paths sorted, so the comparison is a single
+    merge over the paths and their parallel stat arrays. Paths are listed
+    in sorted order.
+
     :param ref_dirsnap:
         The reference directory snapshot.
     :type ref_dirsnap:
@@ -92,69 +148,107 @@ class DirectorySnapshotDiff(object):
         self._dirs_deleted = list()
         self._dirs_created = list()
 
-        paths_moved_from_not_deleted = []
-        paths_deleted = set()
-        paths_created = set()
-
-        # Detect modifications and distinguish modifications that are actually
-        # renames of files on top of existing file names (OS X/Linux only)
-        for path, stat_info in list(dirsnap.stat_snapshot.items()):
-            if path in ref_dirsnap.stat_snapshot:
-                ref_stat_info = ref_dirsnap.stat_info(path)
-                if stat_info.st_ino == ref_stat_info.st_ino and stat_info.st_mtime != ref_stat_info.st_mtime:
-                    if stat.S_ISDIR(stat_info.st_mode):
-                        self._dirs_modified.append(path)
-                    else:
-                        self._files_modified.append(path)
-                elif stat_info.st_ino != ref_stat_info.st_ino:
-                    # Same path exists... but different inode
-                    if ref_dirsnap.has_inode(stat_info.st_ino):
-                        old_path = ref_dirsnap.path_for_inode(stat_info.st_ino)
-                        paths_moved_from_not_deleted.append(old_path)
-                        if stat.S_ISDIR(stat_info.st_mode):
-                            self._dirs_moved.append((old_path, path))
+        ref_paths = ref_dirsnap._paths
+        ref_inodes = ref_dirsnap._inodes
+        ref_mtimes = ref_dirsnap._mtimes
+        ref_sizes = ref_dirsnap._sizes
+        ref_modes = ref_dirsnap._modes
+
+        paths = dirsnap._paths
+        inodes = dirsnap._inodes
+        mtimes = dirsnap._mtimes
+        sizes = dirsnap._sizes
+        modes = dirsnap._modes
+
+        # Positions of removed paths (reference) and added paths (new) and
+        # of paths which exist in both but refer to a different inode.
+        removed = []
+        added = []
+        replaced = []
+        moved_from_not_deleted = set()
+        ref_path_for_inode = None
+
+        i = j = 0
+        ref_count = len(ref_paths)
+        count = len(paths)
+        while i < ref_count and j < count:
+            ref_path = ref_paths[i]
+            path = paths[j]
+            if ref_path == path:
+                if inodes[j] == ref_inodes[i]:
+                    if mtimes[j] != ref_mtimes[i] or sizes[j] != ref_sizes[i]:
+                        if stat.S_ISDIR(modes[j]):
+                            self._dirs_modified.append(path)
                         else:
-                            self._files_moved.append((old_path, path))
+                            self._files_modified.append(path)
+                else:
+                    # Same path exists... but different inode, either an
+                    # atomic rename on top of it (OS X/Linux only) or a
+                    # newly created item with an existing name.
+                    if ref_path_for_inode is None:
+                        ref_path_for_inode = ref_dirsnap._inode_index()
+                    old = ref_path_for_inode.get(inodes[j])
+                    if old is not None:
+                        moved_from_not_deleted.add(old)
+                        if stat.S_ISDIR(modes[j]):
+                            self._dirs_moved.append((ref_paths[old], path))
+                        else:
+                            self._files_moved.append((ref_paths[old], path))
                     else:
-                        # we have a newly created item with existing name, but different inode
-                        paths_deleted.add(path)
-                        paths_created.add(path)
+                        replaced.append((i, j))
+                i += 1
+                j += 1
+            elif ref_path < path:
+                removed.append(i)
+                i += 1
+            else:
+                added.append(j)
+                j += 1
+
+        removed.extend(range(i, ref_count))
+        added.extend(range(j, count))
 
-        paths_deleted = paths_deleted | (
-            (ref_dirsnap.paths - dirsnap.paths) - set(paths_moved_from_not_deleted))
-        paths_created = paths_created | (dirsnap.paths - ref_dirsnap.paths)
+        deleted = [pos for pos in removed if pos not in moved_from_not_deleted]
+        deleted.extend(pos for pos, _ in replaced)
+        created = added + [pos for _, pos in replaced]
 
         # Detect all the moves/renames except for atomic renames on top of existing files
-        # that are handled in the file modification check for-loop above
+        # that are handled in the merge above.
         # Doesn't work on Windows since st_ino is always 0, so exclude on Windows.
-        if not sys.platform.startswith('win'):
-            for created_path in paths_created:
-                created_stat_info = dirsnap.stat_info(created_path)
-                for deleted_path in paths_deleted:
-                    deleted_stat_info = ref_dirsnap.stat_info(deleted_path)
-                    if created_stat_info.st_ino == deleted_stat_info.st_ino:
-                        paths_deleted.remove(deleted_path)
-                        paths_created.remove(created_path)
-                        if stat.S_ISDIR(created_stat_info.st_mode):
-                            self._dirs_moved.append((deleted_path, created_path))
-                        else:
-                            self._files_moved.append((deleted_path, created_path))
+        if not sys.platform.startswith('win') and deleted and created:
+            deleted_for_inode = dict()
+            for pos in reversed(deleted):
+                deleted_for_inode[ref_inodes[pos]] = pos
+
+            moved_from = set()
+            still_created = []
+            for pos in created:
+                old = deleted_for_inode.pop(inodes[pos], None)
+                if old is None:
+                    still_created.append(pos)
+                    continue
+                moved_from.add(old)
+                if stat.S_ISDIR(modes[pos]):
+                    self._dirs_moved.append((ref_paths[old], paths[pos]))
+                else:
+                    self._files_moved.append((ref_paths[old], paths[pos]))
+
+            deleted = [pos for pos in deleted if pos not in moved_from]
+            created = still_created
 
         # Now that we have renames out of the way, enlist the deleted and
         # created files/directories.
-        for path in paths_deleted:
-            stat_info = ref_dirsnap.stat_info(path)
-            if stat.S_ISDIR(stat_info.st_mode):
-                self._dirs_deleted.append(path)
+        for pos in deleted:
+            if stat.S_ISDIR(ref_modes[pos]):
+                self._dirs_deleted.append(ref_paths[pos])
             else:
-                self._files_deleted.append(path)
+                self._files_deleted.append(ref_paths[pos])
 
-        for path in paths_created:
-            stat_info = dirsnap.stat_info(path)
-            if stat.S_ISDIR(stat_info.st_mode):
-                self._dirs_created.append(path)
+        for pos in created:
+            if stat.S_ISDIR(modes[pos]):
+                self._dirs_created.append(paths[pos])
             else:
-                self._files_created.append(path)
+                self._files_created.append(paths[pos])
 
     @property
     def files_created(self):
@@ -218,6 +312,10 @@ class DirectorySnapshot(object):
     """
     A snapshot of stat information of files in a directory.
 
+    Paths are kept in a sorted list with parallel arrays of inode number,
+    modification time (nanoseconds), size and mode, instead of a full stat
+    result and an inode dictionary per path.
+
     :param path:
         The directory path for which a snapshot should be taken.
     :type path:
@@ -230,44 +328,184 @@ class DirectorySnapshot(object):
     :param walker_callback:
         A function with the signature ``walker_callback(path, stat_info)``
         which will be called for every entry in the directory tree.
+    :param previous:
+        An earlier snapshot of the same directory tree. Directories whose
+        inode and modification time did not change since then are not
+        listed again, their entries are only stat'ed to detect
+        modifications.
+    :type previous:
+        :class:`DirectorySnapshot`
     """
 
     def __init__(self,
                  path,
                  recursive=True,
                  walker_callback=(lambda p, s: None),
-                 _copying=False):
+                 _copying=False,
+                 previous=None):
         self._path = absolute_path(path)
-        self._stat_snapshot = {}
-        self._inode_to_path = {}
+        self._paths = []
+        self._inodes = array('Q')
+        self._mtimes = array('q')
+        self._sizes = array('q')
+        self._modes = array('L')
+
+        # Symbolic links to directories, they are not descended into.
+        self._links = frozenset()
+        self._inode_to_path = None
+        self._time = time.time()
         self.is_recursive = recursive
 
         if not _copying:
-            stat_info = os.stat(self._path)
-            self._stat_snapshot[self._path] = stat_info
-            self._inode_to_path[stat_info.st_ino] = self._path
-            walker_callback(self._path, stat_info)
+            if previous is not None and (previous._path != self._path or
+                                         previous.is_recursive != recursive):
+                previous = None
+            self._take(walker_callback, previous)
 
-            for root, directories, files in path_walk(self._path, recursive):
-                for directory_name in directories:
-                    try:
-                        directory_path = os.path.join(root, directory_name)
-                        stat_info = os.stat(directory_path)
-                        self._stat_snapshot[directory_path] = stat_info
-                        self._inode_to_path[stat_info.st_ino] = directory_path
-                        walker_callback(directory_path, stat_info)
-                    except OSError:
-                        continue
+    def _take(self, walker_callback, previous):
+        """
+        Walks the directory tree (top-down, symbolic links to directories
+        are not followed) and records the stat information of all entries.
+        """
+        entries = []
+        links = []
+
+        def add(path, stat_info):
+            entries.append((path, stat_info.st_ino, _mtime_ns(stat_info),
+                            stat_info.st_size, stat_info.st_mode))
+            walker_callback(path, stat_info)
+
+        children = previous._children() if previous is not None else {}
+
+        stat_info = os.stat(self._path)
+        add(self._path, stat_info)
+
+        pending = [(self._path, stat_info)]
+        while pending:
+            directory, directory_stat_info = pending.pop()
+            listing = None
+            if directory in children:
+                listing = previous._reusable_listing(directory, directory_stat_info, children)
+
+            if listing is None:
+                files, directories, linked = [], [], []
+                for name, stat_info, is_link in _scan_directory(directory):
+                    add(os.path.join(directory, name), stat_info)
+                    if not stat.S_ISDIR(stat_info.st_mode):
+                        files.append(name)
+                    elif is_link:
+                        linked.append(name)
+                    else:
+                        directories.append((name, stat_info))
+            else:
+                directories = self._stat_listing(directory, listing, add)
+                linked = listing[2]
+
+            links.extend(os.path.join(directory, name) for name in linked)
+
+            if self.is_recursive:
+                for name, stat_info in reversed(directories):
+                    pending.append((os.path.join(directory, name), stat_info))
+
+        entries.sort()
+        self._paths = [entry[0] for entry in entries]
+        self._inodes = array('Q', [entry[1] for entry in entries])
+        self._mtimes = array('q', [entry[2] for entry in entries])
+        self._sizes = array('q', [entry[3] for entry in entries])
+        self._modes = array('L', [entry[4] for entry in entries])
+        self._links = frozenset(links)
 
-                for file_name in files:
+    def _stat_listing(self, directory, listing, add):
+        """
+        Records the stat information of all entries of an unchanged
+        directory and returns ``(name, stat_info)`` of its subdirectories.
+        Names are resolved relative to a descriptor of the directory where
+        supported, which saves looking up the full path for every entry.
+        """
+        directories = []
+        dir_fd = None
+        if _STAT_DIR_FD:
+            try:
+                dir_fd = os.open(directory, _DIRECTORY_FLAGS)
+            except OSError:
+                dir_fd = None
+        try:
+            for kind, names in enumerate(listing):
+                for name in names:
                     try:
-                        file_path = os.path.join(root, file_name)
-                        stat_info = os.stat(file_path)
-                        self._stat_snapshot[file_path] = stat_info
-                        self._inode_to_path[stat_info.st_ino] = file_path
-                        walker_callback(file_path, stat_info)
+                        if dir_fd is None:
+                            stat_info = os.stat(os.path.join(directory, name))
+                        else:
+                            stat_info = os.stat(name, dir_fd=dir_fd)
                     except OSError:
                         continue
+                    add(os.path.join(directory, name), stat_info)
+                    if kind == 1:
+                        directories.append((name, stat_info))
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+        return directories
+
+    def _children(self):
+        """
+        Returns a dictionary of directory path to the names of its files,
+        directories and symbolic links to directories, derived from the
+        sorted paths in one pass.
+        """
+        sep = os.sep if isinstance(self._path, str) else os.sep.encode()
+        children = dict()
+        modes = self._modes
+        links = self._links
+        for pos, path in enumerate(self._paths):
+            parent, _, name = path.rpartition(sep)
+            if not name:
+                continue
+            listing = children.get(parent or sep)
+            if listing is None:
+                listing = children[parent or sep] = ([], [], [])
+            if path in links:
+                listing[2].append(name)
+            elif stat.S_ISDIR(modes[pos]):
+                listing[1].append(name)
+            else:
+                listing[0].append(name)
+
+        # Only directories actually listed by this snapshot are reusable.
+        if not self.is_recursive:
+            children = dict((path, listing) for path, listing in children.items() if path == self._path)
+        return children
+
+    def _reusable_listing(self, directory, stat_info, children):
+        """
+        Returns the entry names of the directory recorded by this snapshot
+        if the directory is known to be unchanged since, ``None`` otherwise.
+        """
+        pos = self._index(directory)
+        if pos is None:
+            return None
+        mtime = self._mtimes[pos]
+        if (stat_info.st_ino != self._inodes[pos] or
+                _mtime_ns(stat_info) != mtime or
+                mtime >= (self._time - RACY_INTERVAL) * 1e9):
+            return None
+        return children[directory]
+
+    def _index(self, path):
+        """Returns the position of the path or ``None``."""
+        pos = bisect_left(self._paths, path)
+        if pos < len(self._paths) and self._paths[pos] == path:
+            return pos
+        return None
+
+    def _inode_index(self):
+        """Returns a dictionary of inode to the position of its (last) path."""
+        return dict(zip(self._inodes, range(len(self._paths))))
+
+    def _stat(self, pos):
+        mtime_ns = self._mtimes[pos]
+        return SnapshotStat(self._modes[pos], self._inodes[pos], self._sizes[pos],
+                            mtime_ns / 1e9, mtime_ns)
 
     def __sub__(self, previous_dirsnap):
         """Allow subtracting a DirectorySnapshot object instance from
@@ -282,13 +520,37 @@ class DirectorySnapshot(object):
     #    self._stat_snapshot.update(new_dirsnap._stat_snapshot)
 
     def copy(self, from_pathname=None):
+        """
+        Returns a snapshot of the given path and everything below it, or of
+        all paths when no path is given.
+        """
+        if from_pathname is None:
+            from_pathname = self._path
         snapshot = DirectorySnapshot(path=from_pathname,
                                      recursive=self.is_recursive,
                                      _copying=True)
-        for pathname, stat_info in list(self._stat_snapshot.items()):
-            if pathname.starts_with(from_pathname):
-                snapshot._stat_snapshot[pathname] = stat_info
-                snapshot._inode_to_path[stat_info.st_ino] = pathname
+        from_pathname = snapshot._path
+        sep = os.sep if isinstance(from_pathname, str) else os.sep.encode()
+        prefix = from_pathname.rstrip(sep) + sep
+
+        # All paths below it form a contiguous range of the sorted paths.
+        positions = []
+        pos = self._index(from_pathname)
+        if pos is not None:
+            positions.append(pos)
+        start = end = bisect_left(self._paths, prefix)
+        while end < len(self._paths) and self._paths[end].startswith(prefix):
+            end += 1
+        positions.extend(range(start, end))
+
+        snapshot._paths = [self._paths[pos] for pos in positions]
+        snapshot._inodes = array('Q', [self._inodes[pos] for pos in positions])
+        snapshot._mtimes = array('q', [self._mtimes[pos] for pos in positions])
+        snapshot._sizes = array('q', [self._sizes[pos] for pos in positions])
+        snapshot._modes = array('L', [self._modes[pos] for pos in positions])
+        snapshot._links = frozenset(path for path in self._links
+                                    if path.startswith(prefix))
+        snapshot._time = self._time
         return snapshot
 
     @property
@@ -296,7 +558,7 @@ class DirectorySnapshot(object):
         """
         Returns a dictionary of stat information with file paths being keys.
         """
-        return self._stat_snapshot
+        return dict((path, self._stat(pos)) for pos, path in enumerate(self._paths))
 
     def stat_info(self, path):
         """
@@ -306,8 +568,13 @@ class DirectorySnapshot(object):
         :param path:
             The path for which stat information should be obtained
             from a snapshot.
+        :returns:
+            A :class:`SnapshotStat` tuple.
         """
-        return self._stat_snapshot[path]
+        pos = self._index(path)
+        if pos is None:
+            raise KeyError(path)
+        return self._stat(pos)
 
     def path_for_inode(self, inode):
         """
@@ -316,6 +583,8 @@ class DirectorySnapshot(object):
         :param inode:
             inode number.
         """
+        if self._inode_to_path is None:
+            self._inode_to_path = dict(zip(self._inodes, self._paths))
         return self._inode_to_path[inode]
 
     def has_inode(self, inode):
@@ -325,6 +594,8 @@ class DirectorySnapshot(object):
         :param inode:
             inode number.
         """
+        if self._inode_to_path is None:
+            self._inode_to_path = dict(zip(self._inodes, self._paths))
         return inode in self._inode_to_path
 
     def stat_info_for_inode(self, inode):
@@ -341,10 +612,16 @@ class DirectorySnapshot(object):
         """
         List of file/directory paths in the snapshot.
         """
-        return set(self._stat_snapshot)
+        return set(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, path):
+        return self._index(path) is not None
 
     def __str__(self):
         return self.__repr__()
 
     def __repr__(self):
-        return str(self._stat_snapshot)
+        return str(self.stat_snapshot)
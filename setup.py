@@ -7,8 +7,8 @@
 
 import sys
 
-if sys.version < "3.2":
-	print("Konstrukteur requires Python 3.2 or higher")
+if sys.version_info < (3, 7):
+	print("Konstrukteur requires Python 3.7 or higher")
 	sys.exit(1)
 
 # Prefer setuptools (aka distribute) over distutils
@@ -28,7 +28,8 @@ if uses == "distribute":
 
 	extra = {
 
-		#"test_suite" : "jasy.test",
+		"test_suite" : "konstrukteur.test",
+		"python_requires" : ">=3.7",
 
 		"install_requires" : [
 			"jasy==1.5-beta7",
@@ -42,7 +43,14 @@ if uses == "distribute":
 			"argh>=0.8.1",
 			"unidecode>=0.4.14",
 			"python-dateutil>=2.2"
-		]
+		],
+
+		"extras_require" : {
+			# Related posts, SciPy is optional for sparse matrices
+			"related" : [
+				"numpy>=1.15"
+			]
+		}
 
 	}
 
@@ -90,9 +98,7 @@ setup(
 		'Operating System :: OS Independent',
 		'Programming Language :: Python',
 		'Programming Language :: Python :: 3',
-		'Programming Language :: Python :: 3.2',
-		'Programming Language :: Python :: 3.3',
-		'Programming Language :: Python :: 3.4',
+		'Programming Language :: Python :: 3.7',
 		'Topic :: Software Development :: Code Generators',
 		'Topic :: Software Development :: Internationalization',
 		"Topic :: Internet :: WWW/HTTP"
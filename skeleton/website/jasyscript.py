@@ -15,3 +15,16 @@ def build(regenerate = False):
 
 	fileManager = FileManager(profile)
 	fileManager.updateFile("source/apache.htaccess", "{{destination}}/.htaccess")
+
+
+@task
+def serve(host = "localhost", port = 8000):
+	"""Serve pages for local editing"""
+
+	profile = Profile(session)
+	profile.registerPart("$${name}", styleName="$${name}.Main")
+	profile.setCopyAssets(True)
+
+	Build.run(profile)
+
+	konstrukteur.serve(profile, host, port)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+"""
+Measures the memory held by a burst of queued file system events (like a `git checkout`
+inside the content folder): inotify events as returned by one read and the watchdog events
+waiting in the observer queue. Dictionary backed copies of the event classes are measured
+for comparison.
+"""
+
+import os
+import sys
+import argparse
+import tracemalloc
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(root, "konstrukteurlibs", "watchdog", "src"))
+
+from watchdog.events import FileModifiedEvent, FileMovedEvent, EVENT_TYPE_MODIFIED
+from watchdog.observers.api import EventQueue, ObservedWatch
+from watchdog.observers.inotify_c import InotifyEvent, InotifyConstants
+
+
+class DictEvent(object):
+    """Event with an instance dictionary like the classes before slotting."""
+
+    def __init__(self, event_type, src_path, is_directory=False):
+        self._src_path = src_path
+        self._is_directory = is_directory
+        self._event_type = event_type
+
+
+class DictMovedEvent(DictEvent):
+    def __init__(self, src_path, dest_path):
+        super(DictMovedEvent, self).__init__("moved", src_path)
+        self._dest_path = dest_path
+
+
+class DictInotifyEvent(object):
+    def __init__(self, wd, mask, cookie, name, src_path=None, wd_path=None):
+        self._wd = wd
+        self._mask = mask
+        self._cookie = cookie
+        self._name = name
+        self._src_path = src_path
+        self._wd_path = wd_path
+
+
+def generatePaths(count):
+    """Returns (directory, name, path) of @count distinct files, paths are shared by all measured variants."""
+
+    paths = []
+    for pos in range(count):
+        directory = b"/home/user/site/content/posts/%d" % (pos % 64)
+        name = b"post-%d.md" % pos
+        paths.append((directory, name, directory + b"/" + name))
+
+    return paths
+
+
+def measure(label, count, func):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print("%-32s %10.1f KiB %8.1f bytes/event" % (label, used / 1024.0, used / float(count)))
+    return result
+
+
+def queueEvents(paths, modified, moved):
+    # Every tenth event is a move, the rest are modifications; the queue holds (event, watch) tuples
+    queue = EventQueue()
+    watch = ObservedWatch("/home/user/site/content", True)
+    for pos, (directory, name, path) in enumerate(paths):
+        if pos % 10:
+            queue.put((modified(path), watch))
+        else:
+            queue.put((moved(path + b".tmp", path), watch))
+
+    return queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the memory of queued file system events")
+    parser.add_argument("--events", type=int, default=100000, help="Number of events in the burst")
+    args = parser.parse_args()
+
+    paths = generatePaths(args.events)
+    mask = InotifyConstants.IN_CLOSE_WRITE
+
+    measure("InotifyEvent (dict)", args.events, lambda: [DictInotifyEvent(1, mask, 0, name, wd_path=directory) for directory, name, path in paths])
+    measure("InotifyEvent (slots)", args.events, lambda: [InotifyEvent(1, mask, 0, name, wd_path=directory) for directory, name, path in paths])
+
+    measure("Queued events (dict)", args.events, lambda: queueEvents(paths, lambda path: DictEvent(EVENT_TYPE_MODIFIED, path), DictMovedEvent))
+    measure("Queued events (slots)", args.events, lambda: queueEvents(paths, FileModifiedEvent, FileMovedEvent))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
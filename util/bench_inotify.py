@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+#
+# Konstrukteur - Static Site Generator
+# Copyright 2013-2014 Sebastian Fastner
+# Copyright 2014 Sebastian Werner
+#
+
+"""
+Replays a burst of inotify events (like a `git checkout` inside the content folder) through
+the inotify event parsing of the bundled watchdog and compares it with the previous per event
+slicing approach.
+
+The burst is generated with a fixed seed or loaded from a raw dump (`--load`) of kernel event
+buffers. Use `--save` to write the generated burst for comparisons across versions.
+"""
+
+import os
+import sys
+import time
+import random
+import struct
+import argparse
+import tempfile
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(root, "konstrukteurlibs", "watchdog", "src"))
+
+from pathtools.path import absolute_path
+from watchdog.utils import unicode_paths
+import watchdog.observers.inotify_c as inotify_c
+
+from watchdog.observers.inotify_c import Inotify, InotifyEvent, InotifyConstants
+
+# Number of watched directories referenced by the burst
+DIRECTORIES = 64
+
+
+def generateBurst(count, seed=42):
+    """Returns @count events in kernel format: mostly writes, some creations, deletions and move pairs."""
+
+    rand = random.Random(seed)
+    chunks = []
+    cookie = 0
+    generated = 0
+
+    def pack(wd, mask, cookie, name):
+        # Names are null terminated and padded to a multiple of 16 bytes by the kernel
+        padded = (len(name) // 16 + 1) * 16 if name else 0
+        return struct.pack("iIII", wd, mask, cookie, padded) + name.ljust(padded, b"\0")
+
+    while generated < count:
+        wd = rand.randint(1, DIRECTORIES)
+        name = ("post-%d-%s.md" % (rand.randint(0, 5000), "x" * rand.randint(0, 40))).encode("ascii")
+        kind = rand.random()
+
+        if kind < 0.6:
+            chunks.append(pack(wd, InotifyConstants.IN_MODIFY, 0, name))
+            chunks.append(pack(wd, InotifyConstants.IN_CLOSE_WRITE, 0, name))
+            generated += 2
+        elif kind < 0.8:
+            chunks.append(pack(wd, InotifyConstants.IN_CREATE, 0, name))
+            generated += 1
+        elif kind < 0.9:
+            chunks.append(pack(wd, InotifyConstants.IN_DELETE, 0, name))
+            generated += 1
+        else:
+            cookie += 1
+            chunks.append(pack(wd, InotifyConstants.IN_MOVED_FROM, cookie, name + b".tmp"))
+            chunks.append(pack(rand.randint(1, DIRECTORIES), InotifyConstants.IN_MOVED_TO, cookie, name))
+            generated += 2
+
+    return b"".join(chunks)
+
+
+def legacyParse(burst, pathForWd):
+    """Previous implementation: slices every name, joins and normalizes every source path."""
+
+    events = []
+    i = 0
+    while i + 16 < len(burst):
+        wd, mask, cookie, length = struct.unpack_from("iIII", burst, i)
+        name = burst[i + 16:i + 16 + length].rstrip(b"\0")
+        i += 16 + length
+
+        wdPath = unicode_paths.encode(pathForWd[wd])
+        event = InotifyEvent(wd, mask, cookie, name, absolute_path(os.path.join(wdPath, name)))
+        if event.is_moved_to:
+            event = InotifyEvent(wd, mask, cookie, name, absolute_path(os.path.join(wdPath, name)))
+
+        events.append(event)
+
+    return events
+
+
+def parse(burst, pathForWd):
+    return [InotifyEvent(wd, mask, cookie, name, wd_path=pathForWd[wd]) for wd, mask, cookie, name in Inotify._parse_event_buffer(burst)]
+
+
+def replay(burst, inotify, pathForWd):
+    """
+    Feeds the burst into `Inotify.read_events` and returns (events, reads, buffer size). Like the
+    kernel, every read returns as many whole pending events as fit into the read buffer.
+    """
+
+    inotify._path_for_wd.update(pathForWd)
+    pending = {"pos" : 0}
+
+    def readInto(fd, buf):
+        start = end = pending["pos"]
+        while end < len(burst):
+            size = 16 + struct.unpack_from("iIII", burst, end)[3]
+            if end + size - start > len(buf):
+                break
+            end += size
+
+        buf[:end - start] = burst[start:end]
+        pending["pos"] = end
+        return end - start
+
+    original = inotify_c._read_into
+    inotify_c._read_into = readInto
+
+    events = 0
+    reads = 0
+    try:
+        while True:
+            batch = inotify.read_events()
+            if not batch:
+                break
+
+            reads += 1
+            for event in batch:
+                event.src_path
+                events += 1
+    finally:
+        inotify_c._read_into = original
+
+    return events, reads, inotify.event_buffer_size
+
+
+def measure(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print("%-28s %8.1f ms" % (label, (time.perf_counter() - start) * 1000))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays a burst of inotify events")
+    parser.add_argument("--events", type=int, default=100000, help="Number of generated events")
+    parser.add_argument("--load", help="Raw dump of inotify event buffers to replay")
+    parser.add_argument("--save", help="Write the generated burst to this file")
+    args = parser.parse_args()
+
+    if args.load:
+        with open(args.load, "rb") as handle:
+            burst = handle.read()
+    else:
+        burst = generateBurst(args.events)
+
+    if args.save:
+        with open(args.save, "wb") as handle:
+            handle.write(burst)
+
+    tempDir = tempfile.mkdtemp()
+    inotify = Inotify(tempDir)
+    pathForWd = {}
+    for wd in set(wd for wd, mask, cookie, name in Inotify._parse_event_buffer(burst)):
+        pathForWd[wd] = os.path.join(tempDir.encode("utf-8"), b"dir-%d" % wd)
+
+    print("Burst: %d bytes" % len(burst))
+
+    legacy = measure("Legacy parsing", legacyParse, burst, pathForWd)
+    current = measure("Current parsing (lazy)", parse, burst, pathForWd)
+    measure("Current parsing + paths", lambda: [event.src_path for event in parse(burst, pathForWd)])
+
+    if [event.key for event in legacy] != [event.key for event in current]:
+        print("Parsed events differ!")
+        return 1
+
+    events, reads, bufferSize = measure("Replay through read_events", replay, burst, inotify, pathForWd)
+    print("Replayed %d events in %d reads, final buffer size %d bytes" % (events, reads, bufferSize))
+
+    inotify.close()
+    os.rmdir(tempDir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())